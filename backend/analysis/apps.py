@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analysis'
+
+    def ready(self):
+        # Connects the signals that keep the player aggregates up to date when map analyses are deleted
+        from analysis import signals  # noqa: F401
@@ -0,0 +1,113 @@
+"""
+Map, series and custom analyses don't change after they are created, so the unfiltered detail response of each one is
+built once and stored on the analysis as serialised JSON, along with the version stamp it was built for (see
+response_versions.py). A snapshot is only served while its version is current, so anything that changes the response
+(an edit, the map being linked to or unlinked from a series, a team or player being renamed) invalidates it, and it
+is deleted along with the analysis. The team and player filters are applied in memory over the snapshot.
+
+The snapshot is kept as text rather than a JSON column because MySQL reorders the keys of JSON columns, and the
+player performance data is ordered by team.
+"""
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger('gunicorn.error')
+
+def build_snapshot(response: Dict[str, Any], player_teams: Dict[str, Optional[str]]) -> str:
+    """
+    This serialises an unfiltered detail response into a snapshot.
+
+    args:
+        - response [Dict]: The unfiltered detail response
+        - player_teams [Dict]: The current team code of each player in the response, keyed by gamertag, which the
+        team filter is applied with
+    returns:
+        - snapshot [Str]: The serialised snapshot
+    """
+    return json.dumps({"response": response, "player_teams": player_teams}, cls=DjangoJSONEncoder)
+
+def get_analysis_snapshot(
+    model,
+    analysis_id: int,
+    get_version: Callable[..., Optional[str]],
+    generate_snapshot: Callable[[int], str]
+) -> Dict[str, Any]:
+    """
+    This returns the snapshot of an analysis, building and storing it if the stored one is missing or out of date.
+
+    args:
+        - model [Model]: The analysis model (MapAnalysis, SeriesAnalysis or CustomAnalysis)
+        - analysis_id [Int]: The id of the analysis
+        - get_version [Callable]: Returns the current version stamp of the analysis' response
+        - generate_snapshot [Callable]: Builds the serialised snapshot of the analysis from the database
+    returns:
+        - snapshot [Dict]: The unfiltered response and the team of each player
+    raises:
+        - ObjectDoesNotExist: If the analysis does not exist (raised by generate_snapshot)
+    """
+    version = get_version(SimpleNamespace(id=analysis_id))
+    if version is None:
+        return json.loads(generate_snapshot(analysis_id))
+
+    snapshot = model.objects.filter(id=analysis_id, snapshot_version=version).values_list(
+        'snapshot', flat=True
+    ).first()
+    if snapshot is None:
+        snapshot = generate_snapshot(analysis_id)
+        # update() leaves last_modified alone, which the version is built from
+        model.objects.filter(id=analysis_id).update(snapshot=snapshot, snapshot_version=version)
+
+    return json.loads(snapshot)
+
+def store_analysis_snapshot(
+    model,
+    analysis_id: int,
+    get_version: Callable[..., Optional[str]],
+    generate_snapshot: Callable[[int], str]
+) -> None:
+    """
+    This builds and stores the snapshot of a newly created analysis, so the first request for it doesn't have to.
+    Failing to store it never fails the creation, the snapshot is then built on the first request instead.
+
+    args:
+        - model [Model]: The analysis model (MapAnalysis, SeriesAnalysis or CustomAnalysis)
+        - analysis_id [Int]: The id of the analysis
+        - get_version [Callable]: Returns the current version stamp of the analysis' response
+        - generate_snapshot [Callable]: Builds the serialised snapshot of the analysis from the database
+    """
+    try:
+        get_analysis_snapshot(model, analysis_id, get_version, generate_snapshot)
+    except Exception as e:
+        logger.error(f"Error storing snapshot of {model.__name__} {analysis_id}: {str(e)}")
+
+def apply_snapshot_filters(snapshot: Dict[str, Any], filter_payload) -> Dict[str, Any]:
+    """
+    This applies the team and player filters to a snapshot, adding the filtered player performance data to the
+    response when either is set. The unfiltered data is already in order, so the filtered data keeps it.
+
+    args:
+        - snapshot [Dict]: The unfiltered response and the team of each player
+        - filter_payload [ninja.Schema]: A payload object containing the filter data (team, players)
+    returns:
+        - response [Dict]: The detail response
+    """
+    response = snapshot["response"]
+
+    if filter_payload.team or filter_payload.players:
+        # Matched case insensitively, like the database filters they replace
+        team = filter_payload.team.lower() if filter_payload.team else None
+        players = {player.lower() for player in filter_payload.players or []}
+        player_teams = snapshot["player_teams"]
+
+        response["filtered_player_performance_data"] = {
+            gamertag: performance
+            for gamertag, performance in response["player_performance_data"].items()
+            if (not team or player_teams[gamertag].lower() == team)
+            and (not players or gamertag.lower() in players)
+        }
+
+    return response
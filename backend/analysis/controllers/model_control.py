@@ -1,10 +1,13 @@
 from typing import Dict, Any
 
 import logging
+from analysis.controllers.response_generation import store_snapshot_on_commit
 from analysis.models import (
     CustomAnalysis,
     CustomAnalysisMapAnalysis,
     MapAnalysis,
+    MapTeamParticipation,
+    PlayerAggregate,
     PlayerCustomAnalysisPerformance,
     PlayerMapPerformance,
     PlayerMapPerformanceHP,
@@ -14,10 +17,12 @@ from analysis.models import (
     SeriesAnalysis
 )
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Q, Sum
 from django.utils import timezone
 from general.models import GameMode, Map, Player, Team, Tournament
 from utils.analysis_handling import parse_kd, parse_time_to_seconds
+from utils.s3_handling import mark_objects_exist
 
 logger = logging.getLogger('gunicorn.error')
 
@@ -61,12 +66,26 @@ def create_map_analysis(payload: Dict[str, Any]) -> int:
             raise ValidationError("Scores can not be equal")
         winner = team_one if payload.team_one_score > payload.team_two_score else team_two
 
+        # OCR lowercases every name, gamertags are matched ignoring case like the per player lookups they replace
+        player_names = [player_stat.name.lower() for player_stat in payload.player_stats]
+        duplicate_names = sorted({player_name for player_name in player_names if player_names.count(player_name) > 1})
+        if duplicate_names:
+            raise ValidationError(f"Players {duplicate_names} appear more than once in the scoreboard")
+
         player_objects = {}
-        for player_stat in payload.player_stats:
-            player_name = player_stat.name
-            try:
-                player_objects[player_name] = Player.objects.get(gamertag_dirty=player_name)
-            except ObjectDoesNotExist:
+        player_filter = Q(pk__in=[])
+        for player_name in player_names:
+            player_filter |= Q(gamertag_dirty__iexact=player_name)
+        for player in Player.objects.filter(player_filter):
+            player_name = player.gamertag_dirty.lower()
+            if player_name in player_objects:
+                raise ValidationError(
+                    f"Gamertag {player_name} matches more than one player ({player_objects[player_name].gamertag_dirty}"
+                    f" and {player.gamertag_dirty}) ignoring case"
+                )
+            player_objects[player_name] = player
+        for player_name in player_names:
+            if player_name not in player_objects:
                 raise ObjectDoesNotExist(f"Player {player_name} does not exist. Are you sure that's their gamer tag?")
 
         thumbnail = f"{map_object.name.lower()}_{team_one.code.lower()}_{team_two.code.lower()}"
@@ -87,14 +106,14 @@ def create_map_analysis(payload: Dict[str, Any]) -> int:
                 game_mode=game_mode
             )
 
+            player_performances = []
             for player_stat in payload.player_stats:
-                player_name = player_stat.name
                 kills, deaths = parse_kd(player_stat.kd)
                 kd_ratio = kills / deaths if deaths > 0 else kills
 
-                player_perf = PlayerMapPerformance.objects.create(
+                player_performances.append(PlayerMapPerformance(
                     map_analysis=map_analysis,
-                    player=player_objects[player_name],
+                    player=player_objects[player_stat.name.lower()],
                     kills=kills,
                     deaths=deaths,
                     kd_ratio=kd_ratio,
@@ -102,38 +121,27 @@ def create_map_analysis(payload: Dict[str, Any]) -> int:
                     ntk=int(player_stat.non_traded_kills),
                     highest_streak=int(player_stat.highest_streak),
                     damage=int(player_stat.damage),
-                )
+                ))
+
+            PlayerMapPerformance.objects.bulk_create(player_performances)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                # MySQL doesn't hand back the ids of bulk inserted rows, but they are assigned in insertion order
+                performance_ids = PlayerMapPerformance.objects.filter(
+                    map_analysis=map_analysis
+                ).order_by('id').values_list('id', flat=True)
+                for player_perf, performance_id in zip(player_performances, performance_ids):
+                    player_perf.id = performance_id
+
+            mode_performances = [
+                build_mode_performance(game_mode.code, player_perf, player_stat)
+                for player_perf, player_stat in zip(player_performances, payload.player_stats)
+            ]
+            mode_performances = [performance for performance in mode_performances if performance is not None]
+            if mode_performances:
+                type(mode_performances[0]).objects.bulk_create(mode_performances)
 
-                if game_mode == GameMode.objects.get(code='hp'):
-                    PlayerMapPerformanceHP.objects.create(
-                        player_performance=player_perf,
-                        hill_time=parse_time_to_seconds(player_stat.mode_stat_one),
-                        average_hill_time=parse_time_to_seconds(player_stat.mode_stat_two),
-                        objective_kills=int(player_stat.mode_stat_three),
-                        contested_hill_time=parse_time_to_seconds(player_stat.mode_stat_four),
-                        kills_per_hill=float(player_stat.mode_stat_five),
-                        damage_per_hill=float(player_stat.mode_stat_six)
-                    )
-                elif game_mode == GameMode.objects.get(code='snd'):
-                    PlayerMapPerformanceSND.objects.create(
-                        player_performance=player_perf,
-                        bombs_planted=int(player_stat.mode_stat_one),
-                        bombs_defused=int(player_stat.mode_stat_two),
-                        first_bloods=int(player_stat.mode_stat_three),
-                        first_deaths=int(player_stat.mode_stat_four),
-                        kills_per_round=float(player_stat.mode_stat_five),
-                        damage_per_round=float(player_stat.mode_stat_six)
-                    )
-                elif game_mode == GameMode.objects.get(code='ctl'):
-                    PlayerMapPerformanceControl.objects.create(
-                        player_performance=player_perf,
-                        tiers_captured=int(player_stat.mode_stat_one),
-                        objective_kills=int(player_stat.mode_stat_two),
-                        offense_kills=int(player_stat.mode_stat_three),
-                        defense_kills=int(player_stat.mode_stat_four),
-                        kills_per_round=float(player_stat.mode_stat_five),
-                        damage_per_round=float(player_stat.mode_stat_six)
-                    )
+            PlayerAggregate.objects.add_map_analysis(map_analysis, player_performances)
+            MapTeamParticipation.objects.add_map_analysis(map_analysis)
 
             try:
                 map_analysis.full_clean()
@@ -141,6 +149,11 @@ def create_map_analysis(payload: Dict[str, Any]) -> int:
                 # If validation fails, the transaction will be rolled back
                 raise ValidationError(f"Data validation failed: {str(e)}")
 
+            store_snapshot_on_commit(map_analysis)
+
+        # The screenshot was read from the bucket to process it, so its view url doesn't need to check it exists
+        mark_objects_exist([payload.scoreboard_file_name])
+
         return map_analysis.id
     except ValidationError as e:
         logger.error(f"Error creating map analysis: {str(e)}")
@@ -152,6 +165,68 @@ def create_map_analysis(payload: Dict[str, Any]) -> int:
         logger.error(f"Unexpected error creating map analysis: {str(e)}")
         raise Exception(f"Unexpected error creating map analysis: {str(e)}")
 
+def build_mode_performance(game_mode_code: str, player_perf: PlayerMapPerformance, player_stat: Any):
+    """
+    Builds (without saving) the game mode specific performance of a player for a map analysis.
+
+    args:
+        - game_mode_code [Str]: The code of the map analysis' game mode
+        - player_perf [PlayerMapPerformance]: The player's base performance for the map
+        - player_stat [ninja.Schema]: The player's stats from the request payload
+    returns:
+        - performance [Model]: The unsaved HP, SND or Control performance, or None for any other game mode
+    """
+    if game_mode_code == 'hp':
+        return PlayerMapPerformanceHP(
+            player_performance=player_perf,
+            hill_time=parse_time_to_seconds(player_stat.mode_stat_one),
+            average_hill_time=parse_time_to_seconds(player_stat.mode_stat_two),
+            objective_kills=int(player_stat.mode_stat_three),
+            contested_hill_time=parse_time_to_seconds(player_stat.mode_stat_four),
+            kills_per_hill=float(player_stat.mode_stat_five),
+            damage_per_hill=float(player_stat.mode_stat_six)
+        )
+    elif game_mode_code == 'snd':
+        return PlayerMapPerformanceSND(
+            player_performance=player_perf,
+            bombs_planted=int(player_stat.mode_stat_one),
+            bombs_defused=int(player_stat.mode_stat_two),
+            first_bloods=int(player_stat.mode_stat_three),
+            first_deaths=int(player_stat.mode_stat_four),
+            kills_per_round=float(player_stat.mode_stat_five),
+            damage_per_round=float(player_stat.mode_stat_six)
+        )
+    elif game_mode_code == 'ctl':
+        return PlayerMapPerformanceControl(
+            player_performance=player_perf,
+            tiers_captured=int(player_stat.mode_stat_one),
+            objective_kills=int(player_stat.mode_stat_two),
+            offense_kills=int(player_stat.mode_stat_three),
+            defense_kills=int(player_stat.mode_stat_four),
+            kills_per_round=float(player_stat.mode_stat_five),
+            damage_per_round=float(player_stat.mode_stat_six)
+        )
+    return None
+
+def aggregate_player_performances(map_analyses):
+    """
+    Sums the map performances of every player across a group of map analyses in a single grouped query.
+
+    args:
+        - map_analyses [QuerySet]: The map analyses to aggregate over
+    returns:
+        - player_stats [QuerySet]: One dictionary per player with the player_id and their total_kills, total_deaths,
+        total_assists and total_ntk
+    """
+    return PlayerMapPerformance.objects.filter(
+        map_analysis__in=map_analyses
+    ).values('player_id').annotate(
+        total_kills=Sum('kills'),
+        total_deaths=Sum('deaths'),
+        total_assists=Sum('assists'),
+        total_ntk=Sum('ntk')
+    ).order_by('player_id')
+
 def create_series_analysis(map_ids, title):
     """
     Creates a single series analysis object from the map analyses that were provided.
@@ -215,27 +290,7 @@ def create_series_analysis(map_ids, title):
 
         earliest_played_date = min(map_analysis.played_date for map_analysis in map_analyses)
 
-        player_map_performances = PlayerMapPerformance.objects.filter(
-            map_analysis__in=map_analyses
-        ).select_related('player')
-
-        player_series_stats = {}
-        for performance in player_map_performances:
-            player_id = performance.player_id
-            if player_id not in player_series_stats:
-                player_series_stats[player_id] = {
-                    'player': performance.player,
-                    'total_kills': 0,
-                    'total_deaths': 0,
-                    'total_assists': 0,
-                    'total_ntk': 0
-                }
-
-            stats = player_series_stats[player_id]
-            stats['total_kills'] += performance.kills
-            stats['total_deaths'] += performance.deaths
-            stats['total_assists'] += performance.assists
-            stats['total_ntk'] += performance.ntk
+        player_series_stats = aggregate_player_performances(map_analyses)
 
         first_map_select = map_analyses.select_related('map', 'team_one', 'team_two')[0]
         thumbnail = f"{first_map_select.map.name.lower()}_{first_map_select.team_one.code.lower()}_{first_map_select.team_two.code.lower()}"
@@ -256,7 +311,7 @@ def create_series_analysis(map_ids, title):
             map_analyses.update(series_analysis=series_analysis)
 
             player_series_performances = []
-            for player_id, stats in player_series_stats.items():
+            for stats in player_series_stats:
                 total_kills = stats['total_kills']
                 total_deaths = stats['total_deaths']
                 series_kd_ratio = (
@@ -265,7 +320,7 @@ def create_series_analysis(map_ids, title):
 
                 performance = PlayerSeriesPerformance(
                     series_analysis=series_analysis,
-                    player=stats['player'],
+                    player_id=stats['player_id'],
                     total_kills=total_kills,
                     total_deaths=total_deaths,
                     series_kd_ratio=series_kd_ratio,
@@ -276,6 +331,7 @@ def create_series_analysis(map_ids, title):
 
             # Bulk create all player series performances
             PlayerSeriesPerformance.objects.bulk_create(player_series_performances)
+            store_snapshot_on_commit(series_analysis)
 
             return series_analysis
 
@@ -307,27 +363,7 @@ def create_custom_analysis_from_maps(title, map_ids):
         if len(map_analyses) != len(map_ids):
             raise ValidationError("One or more map IDs provided do not exist")
 
-        player_map_performances = PlayerMapPerformance.objects.filter(
-            map_analysis__in=map_analyses
-        ).select_related('player')
-
-        player_custom_analysis_stats = {}
-        for performance in player_map_performances:
-            player_id = performance.player_id
-            if player_id not in player_custom_analysis_stats:
-                player_custom_analysis_stats[player_id] = {
-                    'player': performance.player,
-                    'total_kills': 0,
-                    'total_deaths': 0,
-                    'total_assists': 0,
-                    'total_ntk': 0
-                }
-
-            stats = player_custom_analysis_stats[player_id]
-            stats['total_kills'] += performance.kills
-            stats['total_deaths'] += performance.deaths
-            stats['total_assists'] += performance.assists
-            stats['total_ntk'] += performance.ntk
+        player_custom_analysis_stats = aggregate_player_performances(map_analyses)
 
         with transaction.atomic():
             custom_analysis = CustomAnalysis.objects.create(
@@ -344,7 +380,7 @@ def create_custom_analysis_from_maps(title, map_ids):
             CustomAnalysisMapAnalysis.objects.bulk_create(custom_analysis_map_relations)
 
             player_performances = []
-            for player_id, stats in player_custom_analysis_stats.items():
+            for stats in player_custom_analysis_stats:
                 total_kills = stats['total_kills']
                 total_deaths = stats['total_deaths']
                 custom_analysis_kd_ratio = (
@@ -353,7 +389,7 @@ def create_custom_analysis_from_maps(title, map_ids):
 
                 performance = PlayerCustomAnalysisPerformance(
                     custom_analysis=custom_analysis,
-                    player=stats['player'],
+                    player_id=stats['player_id'],
                     total_kills=total_kills,
                     total_deaths=total_deaths,
                     custom_analysis_kd_ratio=custom_analysis_kd_ratio,
@@ -363,6 +399,7 @@ def create_custom_analysis_from_maps(title, map_ids):
                 player_performances.append(performance)
 
             PlayerCustomAnalysisPerformance.objects.bulk_create(player_performances)
+            store_snapshot_on_commit(custom_analysis)
 
             return custom_analysis
     except ValidationError as e:
@@ -409,7 +446,8 @@ def create_custom_analysis_from_series(title, series_ids):
 
 def delete_map_analyses(map_analyses_ids):
     """
-    Deletes a group of map analyses, according to the list of ids given.
+    Deletes a group of map analyses, according to the list of ids given. The series and custom analyses that contain
+    any of the maps are deleted along with them, all in one transaction and with a fixed number of queries.
 
     args:
         - map_analyses_ids [List]: list of map analyses ids
@@ -417,22 +455,28 @@ def delete_map_analyses(map_analyses_ids):
         - status [bool]: whether the deletion was successful
         - count [int]: amount of map analysis objects deleted
     raises:
-        -
+        - ValidationError: If any of the ids don't exist (the others are still deleted)
     """
     try:
         if not map_analyses_ids:
             raise ValidationError("No map analysis IDs provided")
 
-        successful_deletions = 0
-        failed_ids = []
-
-        for map_analysis_id in map_analyses_ids:
-            try:
-                response = delete_map_analysis(map_analysis_id)
-                if response == 'success':
-                    successful_deletions += 1
-            except ValidationError:
-                failed_ids.append(map_analysis_id)
+        with transaction.atomic():
+            map_analyses = list(MapAnalysis.objects.filter(id__in=map_analyses_ids))
+            found_ids = {map_analysis.id for map_analysis in map_analyses}
+
+            if found_ids:
+                CustomAnalysis.objects.filter(id__in=CustomAnalysisMapAnalysis.objects.filter(
+                    map_analysis_id__in=found_ids
+                ).values('custom_analysis_id')).delete()
+                SeriesAnalysis.objects.filter(id__in=[
+                    map_analysis.series_analysis_id for map_analysis in map_analyses
+                    if map_analysis.series_analysis_id
+                ]).delete()
+                MapAnalysis.objects.filter(id__in=found_ids).delete()
+
+        successful_deletions = len(found_ids)
+        failed_ids = [map_analysis_id for map_analysis_id in map_analyses_ids if map_analysis_id not in found_ids]
 
         if failed_ids:
             raise ValidationError(
@@ -453,7 +497,7 @@ def delete_map_analyses(map_analyses_ids):
 
 def delete_series_analyses(series_analyses_ids):
     """
-    Deletes a group of series analyses, according to the list of ids given.
+    Deletes a group of series analyses, according to the list of ids given, in one transaction.
 
     args:
         - series_analyses_ids [List]: list of series analyses ids
@@ -461,22 +505,21 @@ def delete_series_analyses(series_analyses_ids):
         - success [bool]: whether the deletion was successful
         - count [int]: amount of series analysis objects deleted
     raises:
-        -
+        - ValidationError: If any of the ids don't exist (the others are still deleted)
     """
     try:
         if not series_analyses_ids:
             raise ValidationError("No series analysis IDs provided")
 
-        successful_deletions = 0
-        failed_ids = []
+        with transaction.atomic():
+            found_ids = set(SeriesAnalysis.objects.filter(id__in=series_analyses_ids).values_list('id', flat=True))
+            if found_ids:
+                SeriesAnalysis.objects.filter(id__in=found_ids).delete()
 
-        for series_analysis_id in series_analyses_ids:
-            try:
-                response = delete_series_analysis(series_analysis_id)
-                if response == 'success':
-                    successful_deletions += 1
-            except ValidationError:
-                failed_ids.append(series_analysis_id)
+        successful_deletions = len(found_ids)
+        failed_ids = [
+            series_analysis_id for series_analysis_id in series_analyses_ids if series_analysis_id not in found_ids
+        ]
 
         if failed_ids:
             raise ValidationError(
@@ -497,7 +540,7 @@ def delete_series_analyses(series_analyses_ids):
 
 def delete_custom_analyses(custom_analyses_ids):
     """
-    Deletes a group of custom analyses, according to the list of ids given.
+    Deletes a group of custom analyses, according to the list of ids given, in one transaction.
 
     args:
         - custom_analyses_ids [List]: list of custom analyses ids
@@ -505,22 +548,21 @@ def delete_custom_analyses(custom_analyses_ids):
         - success [bool]: whether the deletion was successful
         - count [int]: amount of custom analysis objects deleted
     raises:
-        -
+        - ValidationError: If any of the ids don't exist (the others are still deleted)
     """
     try:
         if not custom_analyses_ids:
             raise ValidationError("No custom analysis IDs provided")
 
-        successful_deletions = 0
-        failed_ids = []
-
-        for custom_analysis_id in custom_analyses_ids:
-            try:
-                response = delete_custom_analysis(custom_analysis_id)
-                if response == 'success':
-                    successful_deletions += 1
-            except ValidationError:
-                failed_ids.append(custom_analysis_id)
+        with transaction.atomic():
+            found_ids = set(CustomAnalysis.objects.filter(id__in=custom_analyses_ids).values_list('id', flat=True))
+            if found_ids:
+                CustomAnalysis.objects.filter(id__in=found_ids).delete()
+
+        successful_deletions = len(found_ids)
+        failed_ids = [
+            custom_analysis_id for custom_analysis_id in custom_analyses_ids if custom_analysis_id not in found_ids
+        ]
 
         if failed_ids:
             raise ValidationError(
@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+from django.conf import settings
+from paddleocr import PaddleOCR
+
+logger = logging.getLogger('gunicorn.error')
+
+# Maps the keys used in settings.OCR_ENGINES onto the PaddleOCR constructor arguments
+ENGINE_OPTIONS = {
+    'OCR_VERSION': 'ocr_version',
+    'LANG': 'lang',
+    'USE_GPU': 'use_gpu',
+    'USE_ANGLE_CLS': 'use_angle_cls',
+    'CPU_THREADS': 'cpu_threads',
+    'ENABLE_MKLDNN': 'enable_mkldnn',
+    'DET_MODEL_DIR': 'det_model_dir',
+    'REC_MODEL_DIR': 'rec_model_dir',
+    'CLS_MODEL_DIR': 'cls_model_dir',
+    'REC_BATCH_NUM': 'rec_batch_num',
+}
+
+DEFAULT_ENGINE_NAME = 'default'
+
+
+def get_engine_config(name: str) -> Dict[str, Any]:
+    """
+    Fetch the configuration of a named OCR engine variant from the settings.
+
+    args:
+        - name [Str]: The name of the engine variant (a key of settings.OCR_ENGINES)
+    returns:
+        - config [Dict]: The settings for that engine variant
+    raises:
+        - KeyError: If the variant has not been configured
+    """
+    engines = getattr(settings, 'OCR_ENGINES', {DEFAULT_ENGINE_NAME: {}})
+    if name not in engines:
+        raise KeyError(f"OCR engine variant '{name}' is not configured")
+    return engines[name]
+
+
+def build_ocr_engine(name: str) -> PaddleOCR:
+    """
+    Construct a PaddleOCR instance for a named engine variant. This loads the detector, classifier and recognizer
+    models, so it should only ever happen once per worker process.
+
+    args:
+        - name [Str]: The name of the engine variant
+    returns:
+        - engine [PaddleOCR]: The loaded OCR engine
+    """
+    config = get_engine_config(name)
+    kwargs = {
+        option: config[key]
+        for key, option in ENGINE_OPTIONS.items()
+        if config.get(key) is not None
+    }
+    return PaddleOCR(show_log=False, **kwargs)
+
+
+def warm_up_ocr_engine(engine: PaddleOCR) -> None:
+    """
+    Run a single inference over a small synthetic image so that the first real scoreboard doesn't pay for lazy
+    initialisation inside the inference backend (memory pools, kernel selection etc.).
+
+    args:
+        - engine [PaddleOCR]: The engine to warm up
+    """
+    dummy = np.full((64, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(dummy, "PORTAL 250", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    engine.ocr(dummy)
+
+
+class OCREngineRegistry:
+    """
+    Worker-lifetime registry of loaded OCR engines, keyed by variant name.
+
+    Engines are built lazily on first use (or eagerly through initialise) and are then reused by every task that runs
+    in the process. A PaddleOCR predictor is not safe to share between threads, so each engine is guarded by its own
+    lock and handed out through borrow. The registry is dropped whenever it notices it is running in a forked child,
+    since inference handles do not survive a fork.
+    """
+
+    def __init__(self):
+        self._engines: Dict[str, PaddleOCR] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def _check_process(self) -> None:
+        if self._pid != os.getpid():
+            self._engines = {}
+            self._locks = {}
+            self._pid = os.getpid()
+
+    def get(self, name: str = DEFAULT_ENGINE_NAME, warm_up: bool = False) -> PaddleOCR:
+        """
+        Return the engine for a variant, loading it if this process hasn't done so yet.
+
+        args:
+            - name [Str]: The name of the engine variant
+            - warm_up [Bool]: Whether to run a warm-up inference after loading a new engine
+        returns:
+            - engine [PaddleOCR]: The loaded OCR engine
+        """
+        with self._registry_lock:
+            self._check_process()
+            engine = self._engines.get(name)
+            if engine is None:
+                start = time.perf_counter()
+                engine = build_ocr_engine(name)
+                if warm_up:
+                    warm_up_ocr_engine(engine)
+                self._engines[name] = engine
+                self._locks[name] = threading.Lock()
+                logger.info(
+                    f"Loaded OCR engine '{name}' in process {self._pid} "
+                    f"({time.perf_counter() - start:.2f}s{', warmed up' if warm_up else ''})"
+                )
+            return engine
+
+    @contextmanager
+    def borrow(self, name: str = DEFAULT_ENGINE_NAME):
+        """
+        Context manager that hands out exclusive use of an engine for the duration of the block.
+
+        args:
+            - name [Str]: The name of the engine variant
+        yields:
+            - engine [PaddleOCR]: The loaded OCR engine
+        """
+        engine = self.get(name)
+        with self._locks[name]:
+            yield engine
+
+    def initialise(self, warm_up: bool = True) -> None:
+        """
+        Load (and optionally warm up) every configured engine variant. Called when a worker process boots.
+
+        args:
+            - warm_up [Bool]: Whether to run a warm-up inference on each engine
+        """
+        engines = getattr(settings, 'OCR_ENGINES', {DEFAULT_ENGINE_NAME: {}})
+        for name in engines:
+            self.get(name, warm_up=warm_up)
+
+
+ocr_engines = OCREngineRegistry()
+
+
+def borrow_ocr_engine(name: Optional[str] = None):
+    """
+    Borrow a loaded OCR engine from the process-wide registry.
+
+    args:
+        - name [Str]: The name of the engine variant, defaults to settings.OCR_DEFAULT_ENGINE
+    returns:
+        - context manager yielding the PaddleOCR engine
+    """
+    return ocr_engines.borrow(name or getattr(settings, 'OCR_DEFAULT_ENGINE', DEFAULT_ENGINE_NAME))
@@ -1,10 +1,24 @@
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 import logging
+from analysis.controllers.analysis_snapshots import (
+    apply_snapshot_filters,
+    build_snapshot,
+    get_analysis_snapshot,
+    store_analysis_snapshot
+)
+from analysis.controllers.response_versions import (
+    get_custom_analysis_version,
+    get_map_analysis_version,
+    get_series_analysis_version
+)
 from analysis.models import (
     MapAnalysis,
+    MapTeamParticipation,
     CustomAnalysis,
+    CustomAnalysisMapAnalysis,
+    PlayerAggregate,
     PlayerCustomAnalysisPerformance,
     PlayerMapPerformance,
     PlayerMapPerformanceControl,
@@ -14,83 +28,81 @@ from analysis.models import (
     SeriesAnalysis
 )
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
-from django.db.models import Prefetch, Q
-from general.models import Team
+from django.db import transaction
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery
+from general.models import GameMode, Map, Player, Team, Tournament
 from utils.analysis_handling import parse_seconds_to_time
+from utils.pagination_handling import keyset_paginate
 
 logger = logging.getLogger('gunicorn.error')
 
-def generate_map_analyses_response(filter_payload) -> List[Dict]:
+def generate_map_analyses_response(filter_payload):
     """
     This takes in all the filter data and generates an appropriate response containing all the filtered map analyses
-    objects.
+    objects, grouped by tournament. Only the listed fields are selected, and the rows are grouped as they stream in.
+
+    When the payload has a cursor or limit, a single page is returned using keyset pagination on (played_date, id).
+    A tournament can then span several pages, the client merges its maps by tournament title.
 
     args:
         - filter_payload [ninja.Schema]: A payload object containing the filter data (tournament, game mode, map, team
-        one, team two, player)
+        one, team two, player) and the pagination data (cursor, limit)
     returns:
         - map_analyses [List[Dict]]: A list of map analysis objects in dictionary form, only containing necessary data
         for compressed form.
+        - next_cursor [Str]: The cursor of the next page, None if there are no more pages
     raises:
-        - ValidationError: If there's an issue with data validation
+        - ValidationError: If there's an issue with data validation (e.g. a malformed cursor)
         - Exception: For any other unexpected errors during processing
     """
     try:
-        map_analyses_query = MapAnalysis.objects.select_related(
-            'team_one',
-            'team_two',
-            'winner',
-            'map',
-            'game_mode',
-            'tournament'
+        map_analyses_query = filter_map_analyses(filter_payload).values(
+            'id',
+            'title',
+            'played_date',
+            'tournament_id',
+            'tournament__title',
+            'tournament__played_date',
+            'winner__color',
+            'winner__name',
+            'team_one__name',
+            'team_two__name',
+            'map__name',
+            'game_mode__name'
         )
 
-        if filter_payload.tournament:
-            map_analyses_query = map_analyses_query.filter(tournament_id=filter_payload.tournament)
-
-        if filter_payload.game_mode:
-            map_analyses_query = map_analyses_query.filter(game_mode__code=filter_payload.game_mode)
-
-        if filter_payload.map:
-            map_analyses_query = map_analyses_query.filter(map__name=filter_payload.map)
-
-        if filter_payload.team_one:
-            team_one_query = Q(team_one__code=filter_payload.team_one) | Q(team_two__code=filter_payload.team_one)
-            map_analyses_query = map_analyses_query.filter(team_one_query)
-
-        if filter_payload.team_two:
-            team_two_query = Q(team_one__code=filter_payload.team_two) | Q(team_two__code=filter_payload.team_two)
-            map_analyses_query = map_analyses_query.filter(team_two_query)
-
-        if filter_payload.player:
-            map_analyses_query = map_analyses_query.filter(
-                playermapperformance__player__gamertag_clean=filter_payload.player
-            ).distinct()
-
-        map_analyses_query = map_analyses_query.order_by('-played_date')
+        if filter_payload.cursor is not None or filter_payload.limit is not None:
+            map_analyses, next_cursor = keyset_paginate(
+                map_analyses_query,
+                filter_payload.cursor,
+                filter_payload.limit,
+                field='played_date'
+            )
+        else:
+            map_analyses, next_cursor = map_analyses_query.order_by('-played_date', '-id').iterator(), None
 
         tournament_map_dict = {}
 
-        for map_analysis in map_analyses_query:
-            tournament_id = map_analysis.tournament_id
+        for map_analysis in map_analyses:
+            tournament_id = map_analysis['tournament_id']
 
             if tournament_id not in tournament_map_dict:
                 tournament_map_dict[tournament_id] = {
-                    "tournament_title": map_analysis.tournament.title,
+                    "tournament_title": map_analysis['tournament__title'],
                     "maps": [],
-                    "played_date": map_analysis.tournament.played_date
+                    "played_date": map_analysis['tournament__played_date']
                 }
 
             map_data = {
-                "id": map_analysis.id,
-                "title": map_analysis.title,
-                "thumbnail_color": map_analysis.winner.color,
-                "team_one": map_analysis.team_one.name,
-                "team_two": map_analysis.team_two.name,
-                "winner": map_analysis.winner.name,
-                "played_date": map_analysis.played_date.isoformat(),
-                "map": map_analysis.map.name,
-                "game_mode": map_analysis.game_mode.name
+                "id": map_analysis['id'],
+                "title": map_analysis['title'],
+                "thumbnail_color": map_analysis['winner__color'],
+                "team_one": map_analysis['team_one__name'],
+                "team_two": map_analysis['team_two__name'],
+                "winner": map_analysis['winner__name'],
+                "played_date": map_analysis['played_date'].isoformat(),
+                "map": map_analysis['map__name'],
+                "game_mode": map_analysis['game_mode__name']
             }
 
             tournament_map_dict[tournament_id]["maps"].append(map_data)
@@ -107,7 +119,7 @@ def generate_map_analyses_response(filter_payload) -> List[Dict]:
             )
         ]
 
-        return response
+        return response, next_cursor
     except ValidationError as ve:
         logger.error(f"Validation error in generate_map_analyses_response: {ve}")
         raise ValidationError(f"Invalid data: {str(ve)}")
@@ -119,69 +131,66 @@ def generate_map_analyses_response(filter_payload) -> List[Dict]:
 def generate_series_analyses_response(filter_payload):
     """
     This takes in all the filter data and generates an appropriate response containing all the filtered series analyses
-    objects.
+    objects, grouped by tournament. Only the listed fields are selected, and the rows are grouped as they stream in.
+
+    When the payload has a cursor or limit, a single page is returned using keyset pagination on (played_date, id).
+    A tournament can then span several pages, the client merges its series by tournament title.
 
     args:
         - filter_payload [ninja.Schema]: A payload object containing the filter data (tournament, team one, team two,
-        player)
+        player) and the pagination data (cursor, limit)
     returns:
         - series_analyses [List[Dict]]: A list of series analysis objects in dictionary form, only containing necessary
         data for compressed form.
+        - next_cursor [Str]: The cursor of the next page, None if there are no more pages
     raises:
-        - ValidationError: If there's an issue with data validation
+        - ValidationError: If there's an issue with data validation (e.g. a malformed cursor)
         - Exception: For any other unexpected errors during processing
     """
     try:
-        series_analyses_query = SeriesAnalysis.objects.select_related(
-            'team_one',
-            'team_two',
-            'winner',
-            'tournament'
+        series_analyses_query = filter_series_analyses(filter_payload).values(
+            'id',
+            'title',
+            'played_date',
+            'tournament_id',
+            'tournament__title',
+            'tournament__played_date',
+            'winner__color',
+            'winner__name',
+            'team_one__name',
+            'team_two__name'
         )
 
-        if filter_payload.tournament:
-            series_analyses_query = series_analyses_query.filter(tournament_id=filter_payload.tournament)
-
-        if filter_payload.team_one:
-            team_one_query = Q(team_one__code=filter_payload.team_one) | Q(team_two__code=filter_payload.team_one)
-            series_analyses_query = series_analyses_query.filter(team_one_query)
-
-        if filter_payload.team_two:
-            team_two_query = Q(team_one__code=filter_payload.team_two) | Q(team_two__code=filter_payload.team_two)
-            series_analyses_query = series_analyses_query.filter(team_two_query)
-
-        if filter_payload.player:
-            series_analyses_query = series_analyses_query.filter(
-                playerseriesperformance__player__gamertag_clean=filter_payload.player
-            ).distinct()
-
-        if filter_payload.map:
-            series_analyses_query = series_analyses_query.filter(
-                maps__map__name=filter_payload.map
-            ).distinct()
-
-        series_analyses_query = series_analyses_query.order_by('-played_date')
+        if filter_payload.cursor is not None or filter_payload.limit is not None:
+            series_analyses, next_cursor = keyset_paginate(
+                series_analyses_query,
+                filter_payload.cursor,
+                filter_payload.limit,
+                field='played_date'
+            )
+        else:
+            series_analyses, next_cursor = series_analyses_query.order_by('-played_date', '-id').iterator(), None
 
         tournament_map_dict = {}
 
-        for series_analysis in series_analyses_query:
-            tournament_id = series_analysis.tournament_id
+        for series_analysis in series_analyses:
+            tournament_id = series_analysis['tournament_id']
 
             if tournament_id not in tournament_map_dict:
                 tournament_map_dict[tournament_id] = {
-                    "tournament_title": series_analysis.tournament.title,
+                    "tournament_title": series_analysis['tournament__title'],
                     "series": [],
-                    "played_date": series_analysis.tournament.played_date
+                    "played_date": series_analysis['tournament__played_date']
                 }
 
             series_data = {
-                "id": series_analysis.id,
-                "title": series_analysis.title,
-                "thumbnail_color": series_analysis.winner.color,
-                "team_one": series_analysis.team_one.name,
-                "team_two": series_analysis.team_two.name,
-                "winner": series_analysis.winner.name,
-                "played_date": series_analysis.played_date.isoformat(),
+                "id": series_analysis['id'],
+                "title": series_analysis['title'],
+                "thumbnail_color": series_analysis['winner__color'],
+                "team_one": series_analysis['team_one__name'],
+                "team_two": series_analysis['team_two__name'],
+                "winner": series_analysis['winner__name'],
+                "played_date": series_analysis['played_date'].isoformat(),
             }
 
             tournament_map_dict[tournament_id]["series"].append(series_data)
@@ -198,7 +207,7 @@ def generate_series_analyses_response(filter_payload):
             )
         ]
 
-        return response
+        return response, next_cursor
     except ValidationError as ve:
         logger.error(f"Validation error in generate_series_analyses_response: {ve}")
         raise ValidationError(f"Invalid data: {str(ve)}")
@@ -207,38 +216,148 @@ def generate_series_analyses_response(filter_payload):
         logger.error(f"Unexpected error in generate_series_analyses_response: {e}")
         raise Exception(f"Error processing map analyses: {str(e)}")
 
-def generate_custom_analyses_response():
+def filter_map_analyses(filter_payload):
+    """
+    This builds the map analyses query for the filters in the payload. The composite indexes on MapAnalysis are tuned
+    to these filters (see tests/analysis/test_list_query_indexes.py), so codes and names are resolved to ids in
+    subqueries rather than filtered through joins, which would stop the planner from using them. Teams are matched
+    through the participation table, which has a row per team per map.
+
+    args:
+        - filter_payload [ninja.Schema]: A payload object containing the filter data (tournament, game mode, map, team
+        one, team two, player)
+    returns:
+        - map_analyses_query [QuerySet]: The filtered map analyses
+    """
+    map_analyses_query = MapAnalysis.objects.all()
+
+    if filter_payload.tournament:
+        map_analyses_query = map_analyses_query.filter(tournament_id=filter_payload.tournament)
+
+    if filter_payload.game_mode:
+        game_mode_ids = GameMode.objects.filter(code=filter_payload.game_mode).values('id')
+        map_analyses_query = map_analyses_query.filter(game_mode_id__in=game_mode_ids)
+
+    if filter_payload.map:
+        map_ids = Map.objects.filter(name=filter_payload.map).values('id')
+        map_analyses_query = map_analyses_query.filter(map_id__in=map_ids)
+
+    if filter_payload.team_one:
+        map_analyses_query = map_analyses_query.filter(
+            id__in=team_participations(filter_payload.team_one).values('map_analysis_id')
+        )
+
+    if filter_payload.team_two:
+        map_analyses_query = map_analyses_query.filter(
+            id__in=team_participations(filter_payload.team_two).values('map_analysis_id')
+        )
+
+    if filter_payload.player:
+        map_analyses_query = map_analyses_query.filter(
+            playermapperformance__player__gamertag_clean=filter_payload.player
+        ).distinct()
+
+    return map_analyses_query
+
+def team_participations(team_code: str):
     """
-    This simply fetches all the custom analysis objects and returns it in descending order (ordered by creation). Only
-    containing necessary data for compressed form.
+    This finds the maps a team played, on either side, from the participation table, as a plain equality join on its
+    team index rather than an OR across the two team columns of the analyses.
 
     args:
-        - None
+        - team_code [Str]: The code of the team
     returns:
-        - series_analyses [List[Dict]]: A list of series analysis objects in dictionary form
+        - participations [QuerySet]: The team's map participations
+    """
+    return MapTeamParticipation.objects.filter(team__code=team_code)
+
+def filter_series_analyses(filter_payload):
+    """
+    This builds the series analyses query for the filters in the payload. The composite indexes on SeriesAnalysis are
+    tuned to these filters (see tests/analysis/test_list_query_indexes.py). Teams are matched through the
+    participation table of the series' maps.
+
+    args:
+        - filter_payload [ninja.Schema]: A payload object containing the filter data (tournament, map, team one, team
+        two, player)
+    returns:
+        - series_analyses_query [QuerySet]: The filtered series analyses
+    """
+    series_analyses_query = SeriesAnalysis.objects.all()
+
+    if filter_payload.tournament:
+        series_analyses_query = series_analyses_query.filter(tournament_id=filter_payload.tournament)
+
+    if filter_payload.team_one:
+        series_analyses_query = series_analyses_query.filter(
+            id__in=team_participations(filter_payload.team_one).values('map_analysis__series_analysis_id')
+        )
+
+    if filter_payload.team_two:
+        series_analyses_query = series_analyses_query.filter(
+            id__in=team_participations(filter_payload.team_two).values('map_analysis__series_analysis_id')
+        )
+
+    if filter_payload.player:
+        series_analyses_query = series_analyses_query.filter(
+            playerseriesperformance__player__gamertag_clean=filter_payload.player
+        ).distinct()
+
+    if filter_payload.map:
+        series_analyses_query = series_analyses_query.filter(
+            maps__map__name=filter_payload.map
+        ).distinct()
+
+    return series_analyses_query
+
+def generate_custom_analyses_response(cursor: Optional[str] = None, limit: Optional[int] = None):
+    """
+    This fetches the custom analysis objects in descending order (ordered by creation), only containing necessary
+    data for compressed form. The thumbnail colour (the winner of the first map) is annotated onto the same query.
+
+    When a cursor or limit is given, a single page is returned using keyset pagination on (created, id), otherwise
+    every custom analysis is returned.
+
+    args:
+        - cursor [Str]: The cursor returned with the previous page
+        - limit [Int]: The page size
+    returns:
+        - custom_analyses [List[Dict]]: A list of custom analysis objects in dictionary form
+        - next_cursor [Str]: The cursor of the next page, None if there are no more pages
     raises:
-        - ValidationError: If there's an issue with data validation
+        - ValidationError: If there's an issue with data validation (e.g. a malformed cursor)
         - Exception: For any other unexpected errors during processing
     """
     try:
-        custom_analyses = CustomAnalysis.objects.order_by('-created').prefetch_related(
-            'map_analyses',
-            'map_analyses__winner'
+        first_map_color = CustomAnalysisMapAnalysis.objects.filter(
+            custom_analysis=OuterRef('pk')
+        ).order_by('map_analysis_id').values('map_analysis__winner__color')[:1]
+
+        custom_analyses = CustomAnalysis.objects.annotate(
+            thumbnail_color=Subquery(first_map_color)
+        ).values(
+            'id',
+            'created',
+            'title',
+            'thumbnail_color'
         )
 
-        result = []
-        for custom_analysis in custom_analyses:
-            first_map = custom_analysis.map_analyses.first()
-            thumbnail_color = first_map.winner.color if first_map else None
+        if cursor is not None or limit is not None:
+            custom_analyses, next_cursor = keyset_paginate(custom_analyses, cursor, limit)
+        else:
+            custom_analyses, next_cursor = custom_analyses.order_by('-created', '-id'), None
 
-            result.append({
-                "id": custom_analysis.id,
-                "created": custom_analysis.created.isoformat(),
-                "title": custom_analysis.title,
-                "thumbnail_color": thumbnail_color
-            })
+        result = [
+            {
+                "id": custom_analysis['id'],
+                "created": custom_analysis['created'].isoformat(),
+                "title": custom_analysis['title'],
+                "thumbnail_color": custom_analysis['thumbnail_color']
+            }
+            for custom_analysis in custom_analyses
+        ]
 
-        return result
+        return result, next_cursor
     except ValidationError as ve:
         logger.error(f"Validation error in generate_custom_analyses_response: {ve}")
         raise ValidationError(f"Invalid data: {str(ve)}")
@@ -248,7 +367,8 @@ def generate_custom_analyses_response():
 
 def generate_map_analysis_response(filter_payload):
     """
-    This returns the data for a single map analysis according to the filters applied in the payload.
+    This returns the data for a single map analysis according to the filters applied in the payload. The unfiltered
+    data comes from the map analysis' snapshot and the filters are applied over it in memory.
 
     args:
         - filter_payload [ninja.Schema]: A payload object containing the map analysis id and filter data (team, player)
@@ -258,62 +378,13 @@ def generate_map_analysis_response(filter_payload):
         -
     """
     try:
-        try:
-            map_analysis = MapAnalysis.objects.get(id=filter_payload.id)
-        except ObjectDoesNotExist:
-            raise
-
-        all_performances = PlayerMapPerformance.objects.filter(
-            map_analysis=map_analysis
-        ).select_related(
-            'player',
-            'player__team',
-            'playermapperformancehp',
-            'playermapperformancesnd',
-            'playermapperformancecontrol'
+        snapshot = get_analysis_snapshot(
+            MapAnalysis,
+            filter_payload.id,
+            get_map_analysis_version,
+            generate_map_analysis_snapshot
         )
-
-        filtered_performances = all_performances
-        if filter_payload.team:
-            filtered_performances = filtered_performances.filter(player__team__code=filter_payload.team)
-        if filter_payload.players:
-            filtered_performances = filtered_performances.filter(player__gamertag_clean__in=filter_payload.players)
-
-        all_sorted_performances = process_performances(map_analysis, all_performances)
-        player_performance_data = {}
-        for performance in all_sorted_performances:
-            player_performance_data[performance.player.gamertag_clean] = create_map_performance_dict(map_analysis, performance)
-
-        response = {
-            "id": map_analysis.id,
-            "created": map_analysis.created,
-            "last_modified": map_analysis.last_modified,
-            "tournament": map_analysis.tournament.id,
-            "series_analysis": map_analysis.series_analysis.id if map_analysis.series_analysis else None,
-            "series_analysis_title": map_analysis.series_analysis.title if map_analysis.series_analysis else None,
-            "title": map_analysis.title,
-            "thumbnail": map_analysis.thumbnail,
-            "screenshot": map_analysis.screenshot,
-            "team_one": map_analysis.team_one.name,
-            "team_two": map_analysis.team_two.name,
-            "team_one_score": map_analysis.team_one_score,
-            "team_two_score": map_analysis.team_two_score,
-            "winner": map_analysis.winner.name,
-            "played_date": map_analysis.played_date,
-            "map": map_analysis.map.name,
-            "game_mode": map_analysis.game_mode.name,
-            "player_performance_data": player_performance_data
-        }
-
-        if filter_payload.team or filter_payload.players:
-            filtered_sorted_performances = process_performances(map_analysis, filtered_performances)
-            filtered_player_performance_data = {}
-            for performance in filtered_sorted_performances:
-                filtered_player_performance_data[performance.player.gamertag_clean] = create_map_performance_dict(
-                    map_analysis, performance)
-            response["filtered_player_performance_data"] = filtered_player_performance_data
-
-        return response
+        return apply_snapshot_filters(snapshot, filter_payload)
     except ValidationError as ve:
         logger.error(f"Validation error in generate_map_analysis_response: {ve}")
         raise ValidationError(f"Invalid data: {str(ve)}")
@@ -321,9 +392,63 @@ def generate_map_analysis_response(filter_payload):
         logger.error(f"Unexpected error in generate_map_analysis_response: {e}")
         raise Exception(f"Error processing map analysis: {str(e)}")
 
+def generate_map_analysis_snapshot(map_analysis_id: int) -> str:
+    """
+    This builds the snapshot of a map analysis: the unfiltered map analysis data and the team of each player.
+
+    args:
+        - map_analysis_id [Int]: The id of the map analysis
+    returns:
+        - snapshot [Str]: The serialised snapshot
+    raises:
+        - ObjectDoesNotExist: If the map analysis does not exist
+    """
+    map_analysis = MapAnalysis.objects.defer('snapshot').get(id=map_analysis_id)
+
+    all_performances = PlayerMapPerformance.objects.filter(
+        map_analysis=map_analysis
+    ).select_related(
+        'player',
+        'player__team',
+        'playermapperformancehp',
+        'playermapperformancesnd',
+        'playermapperformancecontrol'
+    )
+
+    all_sorted_performances = process_performances(map_analysis, all_performances)
+    player_performance_data = {}
+    player_teams = {}
+    for performance in all_sorted_performances:
+        player_performance_data[performance.player.gamertag_clean] = create_map_performance_dict(map_analysis, performance)
+        player_teams[performance.player.gamertag_clean] = performance.player.team.code
+
+    response = {
+        "id": map_analysis.id,
+        "created": map_analysis.created,
+        "last_modified": map_analysis.last_modified,
+        "tournament": map_analysis.tournament.id,
+        "series_analysis": map_analysis.series_analysis.id if map_analysis.series_analysis else None,
+        "series_analysis_title": map_analysis.series_analysis.title if map_analysis.series_analysis else None,
+        "title": map_analysis.title,
+        "thumbnail": map_analysis.thumbnail,
+        "screenshot": map_analysis.screenshot,
+        "team_one": map_analysis.team_one.name,
+        "team_two": map_analysis.team_two.name,
+        "team_one_score": map_analysis.team_one_score,
+        "team_two_score": map_analysis.team_two_score,
+        "winner": map_analysis.winner.name,
+        "played_date": map_analysis.played_date,
+        "map": map_analysis.map.name,
+        "game_mode": map_analysis.game_mode.name,
+        "player_performance_data": player_performance_data
+    }
+
+    return build_snapshot(response, player_teams)
+
 def generate_series_analysis_response(filter_payload):
     """
-    This returns the data for a single series analysis according to the filters applied in the payload.
+    This returns the data for a single series analysis according to the filters applied in the payload. The
+    unfiltered data comes from the series analysis' snapshot and the filters are applied over it in memory.
 
     args:
         - filter_payload [ninja.Schema]: A payload object containing the series analysis id and filter data (team,
@@ -334,81 +459,13 @@ def generate_series_analysis_response(filter_payload):
         -
     """
     try:
-        try:
-            series_analysis = SeriesAnalysis.objects.get(id=filter_payload.id)
-        except ObjectDoesNotExist:
-            raise
-
-        all_performances = PlayerSeriesPerformance.objects.filter(
-            series_analysis=series_analysis
-        ).select_related(
-            'player',
-            'player__team'
-        )
-
-        filtered_performances = all_performances
-        if filter_payload.team:
-            filtered_performances = filtered_performances.filter(player__team__code=filter_payload.team)
-        if filter_payload.players:
-            filtered_performances = filtered_performances.filter(player__gamertag_clean__in=filter_payload.players)
-
-        maps = MapAnalysis.objects.filter(
-            series_analysis=series_analysis
-        ).order_by('played_date').values(
-            'id',
-            'title',
-            'team_one__name',
-            'team_two__name',
-            'thumbnail',
-            'played_date',
-            'winner'
+        snapshot = get_analysis_snapshot(
+            SeriesAnalysis,
+            filter_payload.id,
+            get_series_analysis_version,
+            generate_series_analysis_snapshot
         )
-
-        maps_data = [
-            {
-                'id': map_obj['id'],
-                'title': map_obj['title'],
-                'team_one': map_obj['team_one__name'],
-                'team_two': map_obj['team_two__name'],
-                'thumbnail': map_obj['thumbnail'],
-                'thumbnail_color': Team.objects.get(id=map_obj['winner']).color,
-                'played_date': map_obj['played_date']
-            }
-            for map_obj in maps
-        ]
-
-        all_sorted_performances = process_performances(series_analysis, all_performances)
-        player_performance_data = {}
-        for performance in all_sorted_performances:
-            player_performance_data[performance.player.gamertag_clean] = create_general_performance_dict(performance)
-
-        response = {
-            "id": series_analysis.id,
-            "created": series_analysis.created,
-            "last_modified": series_analysis.last_modified,
-            "tournament": series_analysis.tournament.id,
-            "title": series_analysis.title,
-            "thumbnail": series_analysis.thumbnail,
-            "winner": series_analysis.winner.name,
-            "played_date": series_analysis.played_date,
-            "team_one": series_analysis.team_one.name,
-            "team_two": series_analysis.team_two.name,
-            "team_one_map_count": series_analysis.team_one_map_count,
-            "team_two_map_count": series_analysis.team_two_map_count,
-            "player_performance_data": player_performance_data,
-            "maps": maps_data
-        }
-
-        if filter_payload.team or filter_payload.players:
-            filtered_sorted_performances = process_performances(series_analysis, filtered_performances)
-            filtered_player_performance_data = {}
-            for performance in filtered_sorted_performances:
-                filtered_player_performance_data[performance.player.gamertag_clean] = create_general_performance_dict(
-                    performance
-                )
-            response["filtered_player_performance_data"] = filtered_player_performance_data
-
-        return response
+        return apply_snapshot_filters(snapshot, filter_payload)
     except ValidationError as ve:
         logger.error(f"Validation error in generate_series_analysis_response: {ve}")
         raise ValidationError(f"Invalid data: {str(ve)}")
@@ -416,9 +473,85 @@ def generate_series_analysis_response(filter_payload):
         logger.error(f"Unexpected error in generate_series_analysis_response: {e}")
         raise Exception(f"Error processing series analysis: {str(e)}")
 
+def generate_series_analysis_snapshot(series_analysis_id: int) -> str:
+    """
+    This builds the snapshot of a series analysis: the unfiltered series analysis data and the team of each player.
+
+    args:
+        - series_analysis_id [Int]: The id of the series analysis
+    returns:
+        - snapshot [Str]: The serialised snapshot
+    raises:
+        - ObjectDoesNotExist: If the series analysis does not exist
+    """
+    series_analysis = SeriesAnalysis.objects.defer('snapshot').select_related(
+        'winner',
+        'team_one',
+        'team_two'
+    ).get(id=series_analysis_id)
+
+    all_performances = PlayerSeriesPerformance.objects.filter(
+        series_analysis=series_analysis
+    ).select_related(
+        'player',
+        'player__team'
+    )
+
+    maps = MapAnalysis.objects.filter(
+        series_analysis=series_analysis
+    ).order_by('played_date').values(
+        'id',
+        'title',
+        'team_one__name',
+        'team_two__name',
+        'thumbnail',
+        'played_date',
+        'winner__color'
+    )
+
+    maps_data = [
+        {
+            'id': map_obj['id'],
+            'title': map_obj['title'],
+            'team_one': map_obj['team_one__name'],
+            'team_two': map_obj['team_two__name'],
+            'thumbnail': map_obj['thumbnail'],
+            'thumbnail_color': map_obj['winner__color'],
+            'played_date': map_obj['played_date']
+        }
+        for map_obj in maps
+    ]
+
+    all_sorted_performances = process_performances(series_analysis, all_performances)
+    player_performance_data = {}
+    player_teams = {}
+    for performance in all_sorted_performances:
+        player_performance_data[performance.player.gamertag_clean] = create_general_performance_dict(performance)
+        player_teams[performance.player.gamertag_clean] = performance.player.team.code
+
+    response = {
+        "id": series_analysis.id,
+        "created": series_analysis.created,
+        "last_modified": series_analysis.last_modified,
+        "tournament": series_analysis.tournament_id,
+        "title": series_analysis.title,
+        "thumbnail": series_analysis.thumbnail,
+        "winner": series_analysis.winner.name,
+        "played_date": series_analysis.played_date,
+        "team_one": series_analysis.team_one.name,
+        "team_two": series_analysis.team_two.name,
+        "team_one_map_count": series_analysis.team_one_map_count,
+        "team_two_map_count": series_analysis.team_two_map_count,
+        "player_performance_data": player_performance_data,
+        "maps": maps_data
+    }
+
+    return build_snapshot(response, player_teams)
+
 def generate_custom_analysis_response(filter_payload):
     """
-    This returns the data for a single custom analysis according to the filters applied in the payload.
+    This returns the data for a single custom analysis according to the filters applied in the payload. The
+    unfiltered data comes from the custom analysis' snapshot and the filters are applied over it in memory.
 
     args:
         - filter_payload [ninja.Schema]: A payload object containing the custom analysis id and filter data (team,
@@ -428,57 +561,272 @@ def generate_custom_analysis_response(filter_payload):
     raises:
         -
     """
+    try:
+        snapshot = get_analysis_snapshot(
+            CustomAnalysis,
+            filter_payload.id,
+            get_custom_analysis_version,
+            generate_custom_analysis_snapshot
+        )
+        return apply_snapshot_filters(snapshot, filter_payload)
+    except ValidationError as ve:
+        logger.error(f"Validation error in generate_custom_analysis_response: {ve}")
+        raise ValidationError(f"Invalid data: {str(ve)}")
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_custom_analysis_response: {e}")
+        raise Exception(f"Error processing custom analysis: {str(e)}")
+
+def generate_custom_analysis_snapshot(custom_analysis_id: int) -> str:
+    """
+    This builds the snapshot of a custom analysis: the unfiltered custom analysis data and the team of each player.
+
+    args:
+        - custom_analysis_id [Int]: The id of the custom analysis
+    returns:
+        - snapshot [Str]: The serialised snapshot
+    raises:
+        - ObjectDoesNotExist: If the custom analysis does not exist
+    """
+    custom_analysis = CustomAnalysis.objects.defer('snapshot').get(id=custom_analysis_id)
+
+    all_performances = PlayerCustomAnalysisPerformance.objects.filter(
+        custom_analysis=custom_analysis
+    ).select_related(
+        'player',
+        'player__team'
+    )
+
+    all_sorted_performances = sorted(all_performances, key=lambda x: x.player.gamertag_clean)
+    player_performance_data = {}
+    player_teams = {}
+    for performance in all_sorted_performances:
+        player_performance_data[performance.player.gamertag_clean] = create_general_performance_dict(performance)
+        player_teams[performance.player.gamertag_clean] = performance.player.team.code
+
+    response = {
+        "id": custom_analysis.id,
+        "created": custom_analysis.created,
+        "last_modified": custom_analysis.last_modified,
+        "title": custom_analysis.title,
+        "thumbnail": custom_analysis.thumbnail,
+        "mapset": build_mapset_structure(custom_analysis),
+        "player_performance_data": player_performance_data
+    }
+
+    return build_snapshot(response, player_teams)
+
+def store_snapshot_on_commit(analysis) -> None:
+    """
+    This builds and stores the snapshot of a newly created map, series or custom analysis once the transaction that
+    creates it commits.
+
+    args:
+        - analysis [MapAnalysis, SeriesAnalysis, CustomAnalysis]: The analysis that was created
+    """
+    get_version, generate_snapshot = {
+        MapAnalysis: (get_map_analysis_version, generate_map_analysis_snapshot),
+        SeriesAnalysis: (get_series_analysis_version, generate_series_analysis_snapshot),
+        CustomAnalysis: (get_custom_analysis_version, generate_custom_analysis_snapshot),
+    }[type(analysis)]
+
+    transaction.on_commit(
+        lambda: store_analysis_snapshot(type(analysis), analysis.id, get_version, generate_snapshot)
+    )
+
+def generate_player_profile_response(gamertag: str) -> Dict:
+    """
+    This returns the career profile of a player from their precomputed aggregates: overall, and broken down per game
+    mode, map and tournament. The number of queries doesn't depend on how many maps the player has played.
+
+    args:
+        - gamertag [Str]: The clean gamertag of the player
+    returns:
+        - player_profile [Dict]: The player's details and aggregated stats
+    raises:
+        - ObjectDoesNotExist: If the player does not exist
+        - Exception: For any other unexpected errors during processing
+    """
     try:
         try:
-            custom_analysis = CustomAnalysis.objects.get(id=filter_payload.id)
+            player = Player.objects.select_related('team').get(gamertag_clean=gamertag)
         except ObjectDoesNotExist:
-            raise
+            raise ObjectDoesNotExist(f"Player {gamertag} does not exist")
 
-        all_performances = PlayerCustomAnalysisPerformance.objects.filter(
-            custom_analysis=custom_analysis
-        ).select_related(
-            'player',
-            'player__team'
-        )
+        aggregates = list(PlayerAggregate.objects.filter(player=player))
+
+        scope_models = {
+            PlayerAggregate.Scope.GAME_MODE: (GameMode, 'name'),
+            PlayerAggregate.Scope.MAP: (Map, 'name'),
+            PlayerAggregate.Scope.TOURNAMENT: (Tournament, 'title'),
+        }
+        scope_names = {}
+        for scope, (model, name_field) in scope_models.items():
+            scope_ids = [aggregate.scope_id for aggregate in aggregates if aggregate.scope == scope]
+            if scope_ids:
+                scope_names[scope] = dict(model.objects.filter(id__in=scope_ids).values_list('id', name_field))
+
+        response = {
+            "gamertag": player.gamertag_clean,
+            "full_name": player.full_name,
+            "team": player.team.name,
+            "overall": None,
+            "game_modes": [],
+            "maps": [],
+            "tournaments": []
+        }
+        scope_keys = {
+            PlayerAggregate.Scope.GAME_MODE: "game_modes",
+            PlayerAggregate.Scope.MAP: "maps",
+            PlayerAggregate.Scope.TOURNAMENT: "tournaments",
+        }
+
+        for aggregate in aggregates:
+            aggregate_dict = create_aggregate_dict(aggregate)
+            if aggregate.scope == PlayerAggregate.Scope.OVERALL:
+                response["overall"] = aggregate_dict
+            else:
+                aggregate_dict["id"] = aggregate.scope_id
+                aggregate_dict["name"] = scope_names[aggregate.scope].get(aggregate.scope_id)
+                response[scope_keys[aggregate.scope]].append(aggregate_dict)
+
+        for key in scope_keys.values():
+            response[key].sort(key=lambda x: x["maps_played"], reverse=True)
+
+        return response
+    except ObjectDoesNotExist as e:
+        logger.error(f"Object not found in generate_player_profile_response: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_player_profile_response: {e}")
+        raise Exception(f"Error processing player profile: {str(e)}")
 
-        filtered_performances = all_performances
-        if filter_payload.team:
-            filtered_performances = filtered_performances.filter(player__team__code=filter_payload.team)
-        if filter_payload.players:
-            filtered_performances = filtered_performances.filter(player__gamertag_clean__in=filter_payload.players)
+def generate_head_to_head_response(team_one_code: str, team_two_code: str) -> Dict:
+    """
+    This returns the record of two teams against each other, overall and per game mode, counted from the map
+    participation table joined onto itself.
 
-        all_sorted_performances = sorted(all_performances, key=lambda x: x.player.gamertag_clean)
-        player_performance_data = {}
-        for performance in all_sorted_performances:
-            player_performance_data[performance.player.gamertag_clean] = create_general_performance_dict(performance)
+    args:
+        - team_one_code [Str]: The code of the first team
+        - team_two_code [Str]: The code of the second team
+    returns:
+        - head_to_head [Dict]: Both teams and the maps played and won by each
+    raises:
+        - ObjectDoesNotExist: If either team does not exist
+        - Exception: For any other unexpected errors during processing
+    """
+    try:
+        teams = {}
+        for team_code in (team_one_code, team_two_code):
+            try:
+                teams[team_code] = Team.objects.get(code=team_code.lower())
+            except ObjectDoesNotExist:
+                raise ObjectDoesNotExist(f"Team with code {team_code} does not exist")
+        team_one, team_two = teams[team_one_code], teams[team_two_code]
+
+        game_modes = MapTeamParticipation.objects.head_to_head(team_one.id, team_two.id).values(
+            'map_analysis__game_mode__name'
+        ).annotate(
+            maps_played=Count('id'),
+            maps_won=Count('id', filter=Q(won=True))
+        ).order_by('map_analysis__game_mode__name')
 
         response = {
-            "id": custom_analysis.id,
-            "created": custom_analysis.created,
-            "last_modified": custom_analysis.last_modified,
-            "title": custom_analysis.title,
-            "thumbnail": custom_analysis.thumbnail,
-            "mapset": build_mapset_structure(custom_analysis),
-            "player_performance_data": player_performance_data
+            "team_one": create_team_dict(team_one),
+            "team_two": create_team_dict(team_two),
+            "maps_played": 0,
+            "team_one_wins": 0,
+            "team_two_wins": 0,
+            "game_modes": []
         }
 
-        if filter_payload.team or filter_payload.players:
-            filtered_sorted_performances = sorted(filtered_performances, key=lambda x: x.player.gamertag_clean)
-            filtered_player_performance_data = {}
-            for performance in filtered_sorted_performances:
-                filtered_player_performance_data[performance.player.gamertag_clean] = create_general_performance_dict(
-                    performance
-                )
-            response["filtered_player_performance_data"] = filtered_player_performance_data
+        for game_mode in game_modes:
+            response["maps_played"] += game_mode["maps_played"]
+            response["team_one_wins"] += game_mode["maps_won"]
+            response["team_two_wins"] += game_mode["maps_played"] - game_mode["maps_won"]
+            response["game_modes"].append({
+                "name": game_mode["map_analysis__game_mode__name"],
+                "maps_played": game_mode["maps_played"],
+                "team_one_wins": game_mode["maps_won"],
+                "team_two_wins": game_mode["maps_played"] - game_mode["maps_won"]
+            })
 
         return response
-    except ValidationError as ve:
-        logger.error(f"Validation error in generate_custom_analysis_response: {ve}")
-        raise ValidationError(f"Invalid data: {str(ve)}")
+    except ObjectDoesNotExist as e:
+        logger.error(f"Object not found in generate_head_to_head_response: {e}")
+        raise
     except Exception as e:
-        logger.error(f"Unexpected error in generate_custom_analysis_response: {e}")
-        raise Exception(f"Error processing custom analysis: {str(e)}")
+        logger.error(f"Unexpected error in generate_head_to_head_response: {e}")
+        raise Exception(f"Error processing head to head: {str(e)}")
+
+def generate_team_win_rates_response(tournament: Optional[int] = None) -> List[Dict]:
+    """
+    This returns the map win rate of every team that has played a map, highest first, from one grouped count over the
+    map participation table.
 
+    args:
+        - tournament [Int]: Only count the maps of this tournament, None for every map
+    returns:
+        - win_rates [List[Dict]]: Each team with the maps they played and won
+    raises:
+        - Exception: For any unexpected errors during processing
+    """
+    try:
+        win_rates = list(MapTeamParticipation.objects.win_rates(tournament))
+        teams = Team.objects.in_bulk([win_rate['team_id'] for win_rate in win_rates])
+
+        response = []
+        for win_rate in win_rates:
+            team_dict = create_team_dict(teams[win_rate['team_id']])
+            team_dict.update({
+                "maps_played": win_rate['maps_played'],
+                "maps_won": win_rate['maps_won'],
+                "win_rate": round(win_rate['maps_won'] / win_rate['maps_played'] * 100, 2)
+            })
+            response.append(team_dict)
+
+        response.sort(key=lambda x: (x["win_rate"], x["maps_played"]), reverse=True)
+        return response
+    except Exception as e:
+        logger.error(f"Unexpected error in generate_team_win_rates_response: {e}")
+        raise Exception(f"Error processing team win rates: {str(e)}")
+
+def create_team_dict(team):
+    """
+    This creates a dictionary containing the details of a team.
+
+    args:
+        - team [Team]: The team object
+    returns:
+        - team_dict [Dict]: Dictionary containing the team's code, name and colour
+    """
+    return {
+        "code": team.code,
+        "name": team.name,
+        "color": team.color
+    }
+
+def create_aggregate_dict(aggregate):
+    """
+    This creates a dictionary containing the aggregated statistics of a player, with the ratios derived from the
+    totals.
+
+    args:
+        - aggregate [PlayerAggregate]: The aggregate object containing the player's totals
+    returns:
+        - aggregate_dict [Dict]: Dictionary containing the aggregated statistics
+    """
+    maps_played = aggregate.maps_played
+    return {
+        "maps_played": maps_played,
+        "kills": aggregate.kills,
+        "deaths": aggregate.deaths,
+        "kd": round(aggregate.kills / aggregate.deaths, 2) if aggregate.deaths > 0 else aggregate.kills,
+        "assists": aggregate.assists,
+        "ntk": aggregate.ntk,
+        "damage": aggregate.damage,
+        "kills_per_map": round(aggregate.kills / maps_played, 2) if maps_played > 0 else 0,
+        "damage_per_map": round(aggregate.damage / maps_played, 2) if maps_played > 0 else 0
+    }
 
 def process_performances(analysis, performances):
     """
@@ -639,7 +987,7 @@ def build_mapset_structure(custom_analysis):
     try:
         map_analyses = MapAnalysis.objects.filter(
             customanalysismapanalysis__custom_analysis=custom_analysis
-        ).select_related(
+        ).defer('snapshot').select_related(
             'tournament',
             'series_analysis'
         ).order_by('-played_date')
@@ -0,0 +1,111 @@
+"""
+Version stamps of the read API's responses, used as the validators for conditional GETs (see
+utils/http_handling.conditional_etag). Each one is a single cheap query over the last_modified and the number of
+rows the response is built from, so a client with a current copy gets a 304 without the response being generated.
+Responses also show team, player, map and tournament names, so every stamp includes the general data version,
+which changes whenever any of those do. A stamp of None means the response isn't cached (e.g. the analysis doesn't
+exist, so the endpoint returns its usual error, or the cache holding the general data version is unavailable).
+"""
+from typing import Optional
+
+from analysis.models import CustomAnalysis, MapAnalysis, MapTeamParticipation, PlayerAggregate, SeriesAnalysis
+from django.db.models import Count, Max
+from general.controllers.general_data_cache import get_general_data_version
+
+def get_table_version(queryset, field: str = 'last_modified') -> Optional[str]:
+    """
+    This stamps a set of rows by the last time any of them was modified and how many there are, which also changes
+    when one of them is deleted.
+
+    args:
+        - queryset [QuerySet]: The rows a response is built from
+        - field [Str]: The modification time field
+    returns:
+        - version [Str]: The version stamp, None if there is no general data version
+    """
+    general_data_version = get_general_data_version()
+    if general_data_version is None:
+        return None
+
+    stamp = queryset.aggregate(modified=Max(field), count=Count('id'))
+    return f"{stamp['modified']}:{stamp['count']}:{general_data_version}"
+
+def stamp_analysis(stamp: Optional[tuple]) -> Optional[str]:
+    """
+    This combines the stamp of a single analysis with the general data version.
+
+    args:
+        - stamp [Tuple]: The fields of the analysis the stamp is made of, None if the analysis doesn't exist
+    returns:
+        - version [Str]: The version stamp, None if the analysis doesn't exist or there is no general data version
+    """
+    general_data_version = get_general_data_version()
+    if stamp is None or general_data_version is None:
+        return None
+    return f"{':'.join(str(part) for part in stamp)}:{general_data_version}"
+
+def get_map_analyses_version(payload) -> Optional[str]:
+    return get_table_version(MapAnalysis.objects.all())
+
+def get_series_analyses_version(payload) -> Optional[str]:
+    return get_table_version(SeriesAnalysis.objects.all())
+
+def get_custom_analyses_version(cursor=None, limit=None) -> Optional[str]:
+    return get_table_version(CustomAnalysis.objects.all())
+
+def get_map_analysis_version(payload) -> Optional[str]:
+    """
+    This stamps a map analysis response. The map's series is included, since it is linked to the map (and unlinked
+    when the series is deleted) without the map's last_modified changing.
+
+    args:
+        - payload [ninja.Schema]: The map analysis id and filter data
+    returns:
+        - version [Str]: The version stamp, None if the map analysis doesn't exist
+    """
+    stamp = MapAnalysis.objects.filter(id=payload.id).values_list(
+        'last_modified', 'series_analysis_id', 'series_analysis__last_modified'
+    ).first()
+    return stamp_analysis(stamp)
+
+def get_series_analysis_version(payload) -> Optional[str]:
+    """
+    This stamps a series analysis response by the series and its maps.
+
+    args:
+        - payload [ninja.Schema]: The series analysis id and filter data
+    returns:
+        - version [Str]: The version stamp, None if the series analysis doesn't exist
+    """
+    stamp = SeriesAnalysis.objects.filter(id=payload.id).annotate(
+        maps_modified=Max('maps__last_modified'),
+        map_count=Count('maps')
+    ).values_list('last_modified', 'maps_modified', 'map_count').first()
+    return stamp_analysis(stamp)
+
+def get_custom_analysis_version(payload) -> Optional[str]:
+    """
+    This stamps a custom analysis response by the custom analysis and its maps. The number of its maps that are in a
+    series is included, since the mapset shows the series and a map's series is linked and unlinked without its
+    last_modified changing.
+
+    args:
+        - payload [ninja.Schema]: The custom analysis id and filter data
+    returns:
+        - version [Str]: The version stamp, None if the custom analysis doesn't exist
+    """
+    stamp = CustomAnalysis.objects.filter(id=payload.id).annotate(
+        maps_modified=Max('map_analyses__last_modified'),
+        map_count=Count('map_analyses'),
+        series_map_count=Count('map_analyses__series_analysis')
+    ).values_list('last_modified', 'maps_modified', 'map_count', 'series_map_count').first()
+    return stamp_analysis(stamp)
+
+def get_player_profile_version(gamertag: str) -> Optional[str]:
+    return get_table_version(PlayerAggregate.objects.filter(player__gamertag_clean=gamertag))
+
+def get_head_to_head_version(team_one: str, team_two: str) -> Optional[str]:
+    return get_table_version(MapTeamParticipation.objects.all())
+
+def get_team_win_rates_version(tournament: Optional[int] = None) -> Optional[str]:
+    return get_table_version(MapTeamParticipation.objects.all())
@@ -0,0 +1,96 @@
+import logging
+from typing import Any, Dict, List
+
+from celery import group
+from celery.result import GroupResult
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from analysis.tasks import process_scoreboard_batch
+
+logger = logging.getLogger('gunicorn.error')
+
+BATCH_CACHE_PREFIX = 'scoreboard_batch'
+BATCH_TIMEOUT = 60 * 60 * 24
+
+
+def dispatch_scoreboard_batch(file_names: List[str]) -> str:
+    """
+    Splits a batch of uploaded scoreboards into micro-batches of settings.OCR_BATCH_SIZE screenshots and dispatches
+    them as a Celery group, one process_scoreboard_batch task per micro-batch.
+
+    args:
+        - file_names [List]: The S3 keys of the uploaded scoreboard screenshots
+    returns:
+        - batch_id [Str]: The id that the progress of the whole batch can be polled with
+    raises:
+        - ValidationError: If no file names, or more than settings.OCR_BATCH_MAX_FILES, are provided
+    """
+    try:
+        file_names = list(dict.fromkeys(file_names))
+        if not file_names:
+            raise ValidationError("No scoreboard file names provided")
+
+        max_files = getattr(settings, 'OCR_BATCH_MAX_FILES', 100)
+        if len(file_names) > max_files:
+            raise ValidationError(f"A batch cannot contain more than {max_files} scoreboards")
+
+        batch_size = getattr(settings, 'OCR_BATCH_SIZE', 4)
+        chunks = [file_names[i:i + batch_size] for i in range(0, len(file_names), batch_size)]
+
+        group_result = group(process_scoreboard_batch.s(chunk) for chunk in chunks).apply_async()
+        group_result.save()
+        cache.set(f"{BATCH_CACHE_PREFIX}:{group_result.id}", chunks, timeout=BATCH_TIMEOUT)
+
+        return group_result.id
+    except ValidationError as e:
+        logger.error(f"Error dispatching scoreboard batch: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error dispatching scoreboard batch: {str(e)}")
+        raise Exception(f"Error dispatching scoreboard batch: {str(e)}")
+
+
+def get_scoreboard_batch_progress(batch_id: str) -> Dict[str, Any]:
+    """
+    Aggregates the progress of every micro-batch in a batch.
+
+    args:
+        - batch_id [Str]: The id returned when the batch was dispatched
+    returns:
+        - progress [Dict]: The overall status, how many scoreboards are done out of the total, and the result (or
+        error) of every scoreboard that is done, keyed by file name
+    raises:
+        - ValidationError: If the batch does not exist or has expired
+    """
+    try:
+        chunks = cache.get(f"{BATCH_CACHE_PREFIX}:{batch_id}")
+        group_result = GroupResult.restore(batch_id)
+        if chunks is None or group_result is None:
+            raise ValidationError(f"Scoreboard batch {batch_id} does not exist")
+
+        results = {}
+        for chunk, chunk_result in zip(chunks, group_result.results):
+            if chunk_result.successful():
+                results.update(chunk_result.result)
+            elif chunk_result.failed():
+                results.update({
+                    file_name: {"status": "failed", "error": str(chunk_result.result)}
+                    for file_name in chunk
+                })
+
+        total = sum(len(chunk) for chunk in chunks)
+
+        return {
+            "status": "completed" if len(results) == total else "processing",
+            "completed": len(results),
+            "total": total,
+            "results": results
+        }
+    except ValidationError as e:
+        logger.error(f"Error checking scoreboard batch progress: {str(e)}")
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error checking scoreboard batch progress: {str(e)}")
+        raise Exception(f"Error checking scoreboard batch progress: {str(e)}")
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from analysis.controllers.ocr_engine import DEFAULT_ENGINE_NAME, get_engine_config
+from analysis.controllers.scoreboard_processing import get_scoreboard_layout
+
+logger = logging.getLogger('gunicorn.error')
+
+CACHE_PREFIX = 'scoreboard_ocr'
+HITS_KEY = f'{CACHE_PREFIX}:stats:hits'
+MISSES_KEY = f'{CACHE_PREFIX}:stats:misses'
+SLOT_COUNTER_KEY = f'{CACHE_PREFIX}:slots:counter'
+
+
+def get_scoreboard_cache_config() -> Dict[str, int]:
+    return getattr(settings, 'SCOREBOARD_CACHE', {
+        'TIMEOUT': 60 * 60 * 24 * 7,
+        'MAX_ENTRIES': 2000
+    })
+
+
+def hash_scoreboard(scoreboard: bytes) -> str:
+    """
+    SHA-256 of the raw screenshot bytes, used to recognise re-submitted screenshots.
+
+    args:
+        - scoreboard [Bytes]: The scoreboard screenshot
+    returns:
+        - content_hash [Str]: The hex digest of the screenshot
+    """
+    return hashlib.sha256(scoreboard).hexdigest()
+
+
+def get_ocr_version() -> str:
+    """
+    A short digest of everything that changes what the OCR pipeline returns for the same screenshot: the engine
+    variant, the extraction mode and the confidence thresholds.
+
+    returns:
+        - version [Str]: The OCR version digest
+    """
+    engine_name = getattr(settings, 'OCR_DEFAULT_ENGINE', DEFAULT_ENGINE_NAME)
+    config = {
+        'engine': get_engine_config(engine_name),
+        'mode': getattr(settings, 'OCR_EXTRACTION_MODE', 'full_frame'),
+        'fallback_confidence': getattr(settings, 'OCR_RECOGNITION_FALLBACK_CONFIDENCE', None),
+        'confidence_thresholds': getattr(settings, 'OCR_CONFIDENCE_THRESHOLDS', None),
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def get_result_key(content_hash: str) -> str:
+    return f"{CACHE_PREFIX}:result:{content_hash}:{get_scoreboard_layout().version}:{get_ocr_version()}"
+
+
+def get_etag_key(etag: str) -> str:
+    return f"{CACHE_PREFIX}:etag:" + etag.strip('"')
+
+
+def get_cached_scoreboard(content_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Looks up the OCR result of a screenshot by its content hash, counting the lookup as a hit or a miss.
+
+    args:
+        - content_hash [Str]: The SHA-256 of the screenshot
+    returns:
+        - data [Dict]: The processed scoreboard data, or None if it isn't cached
+    """
+    try:
+        data = cache.get(get_result_key(content_hash))
+        increment_counter(HITS_KEY if data is not None else MISSES_KEY)
+        return data
+    except Exception as e:
+        logger.error(f"Error reading scoreboard cache: {str(e)}")
+        return None
+
+
+def get_cached_scoreboard_for_etag(etag: str) -> Optional[Dict[str, Any]]:
+    """
+    Looks up the OCR result of a screenshot from its S3 ETag, without downloading it. This works because the worker
+    records which content hash each ETag it has processed belongs to. Only hits are counted, since on a miss the
+    screenshot is sent to the worker which does its own (counted) lookup.
+
+    args:
+        - etag [Str]: The ETag of the uploaded screenshot
+    returns:
+        - data [Dict]: The processed scoreboard data, or None if it isn't cached
+    """
+    try:
+        content_hash = cache.get(get_etag_key(etag))
+        if content_hash is None:
+            return None
+
+        data = cache.get(get_result_key(content_hash))
+        if data is not None:
+            increment_counter(HITS_KEY)
+        return data
+    except Exception as e:
+        logger.error(f"Error reading scoreboard cache: {str(e)}")
+        return None
+
+
+def cache_scoreboard(content_hash: str, data: Dict[str, Any], etag: Optional[str] = None) -> None:
+    """
+    Stores the OCR result of a screenshot under its content hash (and maps its S3 ETag to that hash).
+
+    The number of results kept is bounded by SCOREBOARD_CACHE['MAX_ENTRIES']: every new result takes the next slot
+    of a fixed size ring, evicting whichever result held that slot before it. Results also expire after
+    SCOREBOARD_CACHE['TIMEOUT'] seconds.
+
+    args:
+        - content_hash [Str]: The SHA-256 of the screenshot
+        - data [Dict]: The processed scoreboard data
+        - etag [Str]: The ETag of the screenshot in S3, if known
+    """
+    try:
+        config = get_scoreboard_cache_config()
+        timeout = config['TIMEOUT']
+        result_key = get_result_key(content_hash)
+
+        cache.add(SLOT_COUNTER_KEY, 0, timeout=None)
+        slot_key = f"{CACHE_PREFIX}:slots:{cache.incr(SLOT_COUNTER_KEY) % config['MAX_ENTRIES']}"
+        evicted_key = cache.get(slot_key)
+        if evicted_key and evicted_key != result_key:
+            cache.delete(evicted_key)
+
+        cache.set_many({result_key: data, slot_key: result_key}, timeout=timeout)
+        if etag:
+            cache.set(get_etag_key(etag), content_hash, timeout=timeout)
+    except Exception as e:
+        logger.error(f"Error writing scoreboard cache: {str(e)}")
+
+
+def increment_counter(key: str) -> None:
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def get_scoreboard_cache_stats() -> Dict[str, Any]:
+    """
+    Returns the hit and miss counts of the scoreboard cache.
+
+    returns:
+        - stats [Dict]: The hits, misses and hit rate of the cache
+    """
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    lookups = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else None
+    }
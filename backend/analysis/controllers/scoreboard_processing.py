@@ -1,7 +1,9 @@
+import hashlib
 import logging
 import os
 import re
 import sys
+import threading
 import time
 from dataclasses import dataclass
 from enum import Enum
@@ -10,7 +12,7 @@ from pathlib import Path
 
 import cv2
 import django
-from paddleocr import PaddleOCR
+import numpy as np
 from utils.s3_handling import binary_to_np_array, get_object_from_bucket
 
 # This is to run Django in a standalone configuration
@@ -21,6 +23,8 @@ django.setup()
 
 from django.conf import settings
 
+from analysis.controllers.ocr_engine import borrow_ocr_engine
+
 logger = logging.getLogger('gunicorn.error')
 
 class GameDataField(Enum):
@@ -52,6 +56,57 @@ class PlayerDataField(Enum):
     MODE_STAT_FIVE = ((1641, 324), (1717, 368))
     MODE_STAT_SIX = ((1727, 324), (1825, 368))
 
+class ExtractionMode(Enum):
+    """
+    Enumeration of the strategies extract_data can use to run OCR over a scoreboard
+    """
+    FULL_FRAME = 'full_frame'  # Detection + recognition over the two masked full resolution frames
+    REGIONS = 'regions'  # Detection + recognition over a single mosaic of the cropped field regions
+    RECOGNITION = 'recognition'  # Batched recognition of the cropped field regions, detection only as a fallback
+
+# Extra pixels kept around each field when cropping it out of the scoreboard
+REGION_MARGIN = 6
+# Gap left between tiles in the region mosaic, wide enough that the detector never joins two fields into one box
+MOSAIC_PADDING = 16
+MOSAIC_MAX_WIDTH = 1280
+
+@dataclass
+class ScoreboardRegion:
+    """
+    Data class for a single field region on the scoreboard. Row is None for game metadata fields
+    """
+    field: Enum
+    row: Optional[int]
+    bounds: Tuple[Tuple[float, float], Tuple[float, float]]
+
+    @property
+    def is_game_field(self) -> bool:
+        return isinstance(self.field, GameDataField)
+
+@dataclass(frozen=True)
+class ScoreboardLayout:
+    """
+    Data class holding everything about the scoreboard layout that doesn't depend on the screenshot: the decoded
+    masks and the geometry of every field. It is built once per process by get_scoreboard_layout.
+    """
+    player_mask: np.ndarray
+    game_mask: np.ndarray
+    regions: Tuple[ScoreboardRegion, ...]  # Game fields first, then the player table row by row
+    game_field_bounds: np.ndarray  # (7, 4) array of [min_x, min_y, max_x, max_y], in GameDataField order
+    player_field_bounds: np.ndarray  # (96, 4) array of [min_x, min_y, max_x, max_y], row by row
+    mask_mtimes: Tuple[int, int]
+    version: str  # Changes whenever the masks or the field geometry change
+
+@dataclass
+class MosaicTile:
+    """
+    Data class describing where a region's crop was taken from on the scoreboard and where it was placed on the mosaic
+    """
+    region: ScoreboardRegion
+    source_origin: Tuple[int, int]  # (x, y) of the crop's top left corner on the scoreboard
+    tile_origin: Tuple[int, int]  # (x, y) of the crop's top left corner on the mosaic
+    size: Tuple[int, int]  # (width, height)
+
 @dataclass
 class OCRDetection:
     """
@@ -81,62 +136,340 @@ class PlayerStats:
 
 
 def extract_data(scoreboard: bytes):
+    """
+    Runs OCR over a scoreboard screenshot. The strategy used is chosen by settings.OCR_EXTRACTION_MODE, but the
+    result is always in PaddleOCR's format with coordinates relative to the full scoreboard, so process_data doesn't
+    need to know which one was used.
+    """
     try:
-        ocr = PaddleOCR()
+        return extract_data_batch([decode_scoreboard(scoreboard)])[0]
+    except Exception as e:
+        logger.error(f"Error extracting scoreboard data: {str(e)}")
+        raise Exception(f"Error in get_data: {str(e)}")
+
+def decode_scoreboard(scoreboard: bytes) -> np.ndarray:
+    """
+    Decodes a scoreboard screenshot into the grayscale image OCR is run on
+    """
+    np_array_image = binary_to_np_array(scoreboard)
 
-        player_mask_path = os.path.join(settings.STATIC_ROOT, 'utils', 'mask_players.png')
-        game_mask_path = os.path.join(settings.STATIC_ROOT, 'utils', 'mask_game.png')
-        np_array_image = binary_to_np_array(scoreboard)
+    sb_full = cv2.imdecode(np_array_image, cv2.IMREAD_COLOR)
+    if sb_full is None:
+        raise ValueError("Failed to load the scoreboard image")
 
-        if not all(os.path.exists(path) for path in [player_mask_path, game_mask_path]):
-            raise FileNotFoundError("One or more required utility files are missing")
+    return cv2.cvtColor(sb_full, cv2.COLOR_BGR2GRAY)
 
-        sb_full = cv2.imdecode(np_array_image, cv2.IMREAD_COLOR)
-        if sb_full is None:
-            raise ValueError("Failed to load the scoreboard image")
+def extract_data_batch(scoreboards: List[np.ndarray]) -> List[Tuple[List, List]]:
+    """
+    Runs OCR over several decoded scoreboards while borrowing the OCR engine once. In 'recognition' mode the field
+    crops of every scoreboard are recognised together in one batched call.
 
-        sb = cv2.cvtColor(sb_full, cv2.COLOR_BGR2GRAY)
+    returns:
+        - results [List]: (game_result, players_result) for each scoreboard, in the order they were given
+    """
+    layout = get_scoreboard_layout()
+    mode = ExtractionMode(getattr(settings, 'OCR_EXTRACTION_MODE', ExtractionMode.FULL_FRAME.value))
+
+    with borrow_ocr_engine() as ocr:
+        if mode == ExtractionMode.RECOGNITION:
+            results = extract_recognition(ocr, scoreboards, layout)
+        elif mode == ExtractionMode.REGIONS:
+            results = [extract_regions(ocr, sb, layout) for sb in scoreboards]
+        else:
+            results = [extract_full_frame(ocr, sb, layout) for sb in scoreboards]
+
+    for game_result, players_result in results:
+        if not has_detections(players_result) or not has_detections(game_result):
+            raise ValueError("OCR failed to extract data from the image")
 
-        player_mask = cv2.imread(player_mask_path, 0)
-        game_mask = cv2.imread(game_mask_path, 0)
-        if player_mask is None or game_mask is None:
-            raise ValueError("Failed to load mask images")
+    return results
 
-        masked_players = cv2.bitwise_and(sb, sb, mask=player_mask)
-        masked_game = cv2.bitwise_and(sb, sb, mask=game_mask)
+def has_detections(result: List) -> bool:
+    """
+    Checks an OCR result found any text. Results are wrapped in a list per image, so the inner list has to be
+    checked: the region strategies return [[]] and full frame PaddleOCR returns [None] when nothing was found.
+    """
+    return bool(result) and bool(result[0])
 
-        players_result = ocr.ocr(masked_players)
+def extract_full_frame(ocr, sb: np.ndarray, layout: ScoreboardLayout) -> Tuple[List, List]:
+    """
+    Runs detection and recognition over the masked full resolution scoreboard, once for the player table and once
+    for the game metadata
+    """
+    masked_players = cv2.bitwise_and(sb, sb, mask=layout.player_mask)
+    masked_game = cv2.bitwise_and(sb, sb, mask=layout.game_mask)
 
-        game_result = ocr.ocr(masked_game)
+    players_result = ocr.ocr(masked_players)
+    game_result = ocr.ocr(masked_game)
 
-        if not players_result or not game_result:
-            raise ValueError("OCR failed to extract data from the image")
+    return game_result, players_result
 
-        return game_result, players_result
-    except Exception as e:
-        logger.error(f"Error extracting scoreboard data: {str(e)}")
-        raise Exception(f"Error in get_data: {str(e)}")
+def extract_regions(ocr, sb: np.ndarray, layout: ScoreboardLayout,
+                    regions: Optional[List[ScoreboardRegion]] = None) -> Tuple[List, List]:
+    """
+    Crops only the field regions out of the scoreboard, tiles them into one compact mosaic and runs detection and
+    recognition over it once. Detections are mapped back onto scoreboard coordinates afterwards.
+    """
+    if regions is None:
+        regions = layout.regions
+
+    mosaic, tiles = build_region_mosaic(sb, layout, regions)
+    mosaic_result = ocr.ocr(mosaic)
+
+    return map_mosaic_detections(mosaic_result[0] if mosaic_result else None, tiles)
+
+def extract_recognition(ocr, scoreboards: List[np.ndarray], layout: ScoreboardLayout) -> List[Tuple[List, List]]:
+    """
+    Skips text detection entirely, since the scoreboard layout already tells us where every field is. The field
+    crops of all the scoreboards are recognised in a single batched call and each result is given its crop's box on
+    its scoreboard.
+    """
+    crops_per_scoreboard = [crop_regions(sb, layout, layout.regions) for sb in scoreboards]
+    recognitions = recognize_crops(ocr, [crop for crops in crops_per_scoreboard for _, _, crop in crops])
+
+    results = []
+    offset = 0
+    for sb, crops in zip(scoreboards, crops_per_scoreboard):
+        scoreboard_recognitions = recognitions[offset:offset + len(crops)]
+        results.append(resolve_recognitions(ocr, sb, layout, crops, scoreboard_recognitions))
+        offset += len(crops)
+
+    return results
+
+def recognize_crops(ocr, crops: List[np.ndarray]) -> List[Tuple[str, float]]:
+    """
+    Runs recognition only (det=False) over a batch of crops, returning a (text, confidence) pair for each crop in
+    the order they were given
+    """
+    if not crops:
+        return []
 
-def process_data(game_data, player_data):
+    batch = [cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR) if crop.ndim == 2 else crop for crop in crops]
+    result = ocr.ocr(batch, det=False, cls=False)
+    recognitions = result[0] if result else []
+
+    if len(recognitions) != len(crops):
+        raise ValueError(f"Recognition returned {len(recognitions)} results for {len(crops)} crops")
+
+    return recognitions
+
+def resolve_recognitions(ocr, sb: np.ndarray, layout: ScoreboardLayout,
+                         crops: List[Tuple[ScoreboardRegion, Tuple[int, int], np.ndarray]],
+                         recognitions: List[Tuple[str, float]]) -> Tuple[List, List]:
+    """
+    Turns recognition results into detections on the scoreboard. Empty crops are treated as empty fields, while any
+    field recognised with poor confidence is sent through full detection (on a mosaic of just those fields). The weak
+    recognitions are dropped rather than kept alongside the fallback detections, since assign_detections_to_fields
+    keeps the most confident match per field and a weak read could otherwise win. A field the fallback finds nothing
+    in is left empty.
+    """
+    threshold = getattr(settings, 'OCR_RECOGNITION_FALLBACK_CONFIDENCE', 0.5)
+
+    game_detections, player_detections = [], []
+    retry_regions = []
+    for (region, (x1, y1), crop), (text, confidence) in zip(crops, recognitions):
+        if not text.strip():
+            continue
+
+        if confidence < threshold:
+            retry_regions.append(region)
+            continue
+
+        crop_height, crop_width = crop.shape[:2]
+        box = [[x1, y1], [x1 + crop_width, y1], [x1 + crop_width, y1 + crop_height], [x1, y1 + crop_height]]
+        target = game_detections if region.is_game_field else player_detections
+        target.append([box, (text, confidence)])
+
+    if retry_regions:
+        fallback_game, fallback_players = extract_regions(ocr, sb, layout, retry_regions)
+        game_detections += fallback_game[0]
+        player_detections += fallback_players[0]
+
+    return [game_detections], [player_detections]
+
+def get_scoreboard_regions() -> List[ScoreboardRegion]:
+    """
+    All the field regions on the scoreboard, game metadata first followed by the player table row by row
+    """
+    regions = [ScoreboardRegion(field, None, field.value) for field in GameDataField]
+    for row in range(8):
+        regions.extend(
+            ScoreboardRegion(field, row, adjust_bounds_for_row(field.value, row))
+            for field in PlayerDataField
+        )
+    return regions
+
+def get_mask_paths() -> Tuple[str, str]:
+    """
+    Paths of the player table mask and the game metadata mask
+    """
+    return (
+        os.path.join(settings.STATIC_ROOT, 'utils', 'mask_players.png'),
+        os.path.join(settings.STATIC_ROOT, 'utils', 'mask_game.png')
+    )
+
+_layout: Optional[ScoreboardLayout] = None
+_layout_lock = threading.Lock()
+
+def get_scoreboard_layout() -> ScoreboardLayout:
+    """
+    Returns the process wide scoreboard layout, building it on first use. The mask files are only stat'ed on each
+    call, and the layout is rebuilt whenever either of their modification times changes, so replacing a mask still
+    takes effect without restarting the workers.
+    """
+    global _layout
+
+    mask_paths = get_mask_paths()
+    try:
+        mask_mtimes = tuple(os.stat(path).st_mtime_ns for path in mask_paths)
+    except FileNotFoundError:
+        raise FileNotFoundError("One or more required utility files are missing")
+
+    layout = _layout
+    if layout is None or layout.mask_mtimes != mask_mtimes:
+        with _layout_lock:
+            layout = _layout
+            if layout is None or layout.mask_mtimes != mask_mtimes:
+                layout = load_scoreboard_layout(*mask_paths, mask_mtimes)
+                _layout = layout
+                logger.info(f"Loaded scoreboard layout {layout.version}")
+
+    return layout
+
+def load_scoreboard_layout(player_mask_path: str, game_mask_path: str, mask_mtimes: Tuple[int, int]) -> ScoreboardLayout:
+    """
+    Decodes the masks and precomputes the geometry of every field on the scoreboard
+    """
+    player_mask = cv2.imread(player_mask_path, cv2.IMREAD_GRAYSCALE)
+    game_mask = cv2.imread(game_mask_path, cv2.IMREAD_GRAYSCALE)
+    if player_mask is None or game_mask is None:
+        raise ValueError("Failed to load mask images")
+
+    player_mask = np.ascontiguousarray(player_mask, dtype=np.uint8)
+    game_mask = np.ascontiguousarray(game_mask, dtype=np.uint8)
+    player_mask.flags.writeable = False
+    game_mask.flags.writeable = False
+
+    regions = tuple(get_scoreboard_regions())
+    game_field_bounds = regions_to_bounds([region for region in regions if region.is_game_field])
+    player_field_bounds = regions_to_bounds([region for region in regions if not region.is_game_field])
+
+    digest = hashlib.sha256()
+    for array in (player_mask, game_mask, game_field_bounds, player_field_bounds):
+        digest.update(array.tobytes())
+
+    return ScoreboardLayout(
+        player_mask=player_mask,
+        game_mask=game_mask,
+        regions=regions,
+        game_field_bounds=game_field_bounds,
+        player_field_bounds=player_field_bounds,
+        mask_mtimes=mask_mtimes,
+        version=digest.hexdigest()[:16]
+    )
+
+def crop_regions(sb: np.ndarray, layout: ScoreboardLayout,
+                 regions: List[ScoreboardRegion]) -> List[Tuple[ScoreboardRegion, Tuple[int, int], np.ndarray]]:
+    """
+    Cuts each region (plus a small margin) out of the scoreboard and applies the matching mask to the crop. Regions
+    that fall outside of the image are skipped.
+
+    returns:
+        - crops [List]: (region, (x, y) of the crop's top left corner on the scoreboard, masked crop) for each region
+    """
+    height, width = sb.shape[:2]
+    crops = []
+    for region in regions:
+        (x1, y1), (x2, y2) = region.bounds
+        x1, y1 = max(int(x1) - REGION_MARGIN, 0), max(int(y1) - REGION_MARGIN, 0)
+        x2, y2 = min(int(x2) + REGION_MARGIN, width), min(int(y2) + REGION_MARGIN, height)
+        if x2 <= x1 or y2 <= y1:
+            continue
+
+        mask = layout.game_mask if region.is_game_field else layout.player_mask
+        crop = sb[y1:y2, x1:x2]
+        crops.append((region, (x1, y1), cv2.bitwise_and(crop, crop, mask=mask[y1:y2, x1:x2])))
+
+    return crops
+
+def build_region_mosaic(sb: np.ndarray, layout: ScoreboardLayout,
+                        regions: List[ScoreboardRegion]) -> Tuple[np.ndarray, List[MosaicTile]]:
+    """
+    Packs the masked crops of the given regions onto a black canvas, shelf by shelf, leaving enough padding between
+    them that the text detector can't merge neighbouring fields.
+    """
+    crops = crop_regions(sb, layout, regions)
+    if not crops:
+        raise ValueError("No scoreboard regions fall inside the image")
+
+    mosaic_width = max(MOSAIC_MAX_WIDTH, max(crop.shape[1] for _, _, crop in crops) + 2 * MOSAIC_PADDING)
+
+    tiles = []
+    x, y, shelf_height = MOSAIC_PADDING, MOSAIC_PADDING, 0
+    for region, source_origin, crop in crops:
+        crop_height, crop_width = crop.shape[:2]
+        if x + crop_width + MOSAIC_PADDING > mosaic_width:
+            x, y, shelf_height = MOSAIC_PADDING, y + shelf_height + MOSAIC_PADDING, 0
+        tiles.append(MosaicTile(region, source_origin, (x, y), (crop_width, crop_height)))
+        x += crop_width + MOSAIC_PADDING
+        shelf_height = max(shelf_height, crop_height)
+
+    mosaic = np.zeros((y + shelf_height + MOSAIC_PADDING, mosaic_width), dtype=sb.dtype)
+    for tile, (_, _, crop) in zip(tiles, crops):
+        (tx, ty), (tw, th) = tile.tile_origin, tile.size
+        mosaic[ty:ty + th, tx:tx + tw] = crop
+
+    return mosaic, tiles
+
+def map_mosaic_detections(detections: Optional[List], tiles: List[MosaicTile]) -> Tuple[List, List]:
+    """
+    Moves detections made on the mosaic back onto the scoreboard, splitting them into game and player results in the
+    same shape ocr.ocr() returns for a single image
+    """
+    game_detections, player_detections = [], []
+    for detection in detections or []:
+        region, text_and_confidence = detection
+        center_x, center_y = get_region_center(region)
+
+        for tile in tiles:
+            (tx, ty), (tw, th) = tile.tile_origin, tile.size
+            if tx <= center_x <= tx + tw and ty <= center_y <= ty + th:
+                dx = tile.source_origin[0] - tx
+                dy = tile.source_origin[1] - ty
+                mapped = [[point[0] + dx, point[1] + dy] for point in region]
+                target = game_detections if tile.region.is_game_field else player_detections
+                target.append([mapped, text_and_confidence])
+                break
+
+    return [game_detections], [player_detections]
+
+def process_data(game_data, player_data, layout: Optional[ScoreboardLayout] = None):
     """
     Main entry point for processing scoreboard data
     """
     try:
+        if layout is None:
+            layout = get_scoreboard_layout()
+
         # Convert raw detections to OCRDetection objects
         game_ocr = [parse_ocr_detection(d) for d in game_data[0]]
         player_ocr = [parse_ocr_detection(d) for d in player_data[0]]
 
         # Process game metadata
+        game_matches = assign_detections_to_fields(game_ocr, layout.game_field_bounds)
         game_data = {
-            field.name.lower(): find_detection_for_field(game_ocr, field.value)
-            for field in GameDataField
+            field.name.lower(): match
+            for field, match in zip(GameDataField, game_matches)
         }
 
-        # Process player data
+        # Process player data, every detection is assigned to its (row, field) cell in one pass
+        player_matches = assign_detections_to_fields(player_ocr, layout.player_field_bounds)
+        fields_per_row = len(PlayerDataField)
+
         players = []
-        total_players = 8
         for row in range(8):
-            player = process_player_row(player_ocr, row)
+            row_matches = player_matches[row * fields_per_row:(row + 1) * fields_per_row]
+            player = process_player_row(dict(zip(PlayerDataField, row_matches)))
             if player:
                 stats_dict = {
                     "name": player.name,
@@ -194,34 +527,58 @@ def get_region_center(region: List[List[float]]) -> Tuple[float, float]:
     except (ValueError, TypeError, IndexError) as e:
         raise ValueError(f"Invalid region format: {str(e)}")
 
-def is_point_in_bounds(point: Tuple[float, float], bounds: Tuple[Tuple[float, float], Tuple[float, float]], tolerance: int = 10) -> bool:
+def regions_to_bounds(regions: List[ScoreboardRegion]) -> np.ndarray:
     """
-    Check if point falls within specified bounds with tolerance
-    Added tolerance to account for slight variations in OCR detection regions
+    Converts regions into a (regions, 4) array of [min_x, min_y, max_x, max_y] bounds, in the order given
     """
-    try:
-        (min_x, min_y), (max_x, max_y) = bounds
-        if max_x < min_x or max_y < min_y:
-            raise ValueError("Invalid bounds: max values must be greater than min values")
+    return np.array(
+        [[x1, y1, x2, y2] for (x1, y1), (x2, y2) in (region.bounds for region in regions)],
+        dtype=np.float64
+    )
 
-        x, y = point
-        return (min_x - tolerance <= x <= max_x + tolerance and
-                min_y - tolerance <= y <= max_y + tolerance)
-    except (TypeError, ValueError) as e:
-        raise ValueError(f"Invalid coordinate data: {str(e)}")
-
-def find_detection_for_field(detections: List[OCRDetection], field_bounds: Tuple[Tuple[float, float], Tuple[float, float]]) -> Optional[Tuple[str, str]]:
+def assign_detections_to_fields(detections: List[OCRDetection], field_bounds: np.ndarray,
+                                tolerance: int = 10) -> List[Optional[Tuple[str, str]]]:
     """
-    Find matching detection for a given field based on region bounds
+    Match detections to fields based on region bounds, in one vectorised pass over all detections and fields.
+    A detection belongs to a field when its center falls within the field's bounds (with tolerance, to account for
+    slight variations in OCR detection regions). When several detections land in the same field the one with the
+    highest confidence wins, ties going to the earliest detection.
+
+    args:
+        - detections [List[OCRDetection]]: The parsed OCR detections
+        - field_bounds [np.ndarray]: (fields, 4) array of [min_x, min_y, max_x, max_y] field bounds
+        - tolerance [Int]: Pixels a detection center may fall outside of the field bounds
+    returns:
+        - matches [List]: (text, confidence) of the matching detection for each field, or None if nothing matched
     """
     try:
-        for detection in detections:
-            center = get_region_center(detection.region)
-            if is_point_in_bounds(center, field_bounds):
-                return detection.text.lower(), convert_confidence(detection.confidence)
-        return None
+        if not detections:
+            return [None] * len(field_bounds)
+
+        regions = np.array([detection.region for detection in detections], dtype=np.float64)
+        if regions.ndim != 3 or regions.shape[1:] != (4, 2):
+            raise ValueError("Detection regions must each have four (x, y) points")
+
+        centers = regions.mean(axis=1)
+        confidences = np.array([detection.confidence for detection in detections], dtype=np.float64)
+
+        x = centers[:, 0:1]
+        y = centers[:, 1:2]
+        inside = (
+            (x >= field_bounds[:, 0] - tolerance) & (x <= field_bounds[:, 2] + tolerance) &
+            (y >= field_bounds[:, 1] - tolerance) & (y <= field_bounds[:, 3] + tolerance)
+        )
+
+        scores = np.where(inside, confidences[:, np.newaxis], -np.inf)
+        best = scores.argmax(axis=0)
+        matched = inside[best, np.arange(len(field_bounds))]
+
+        return [
+            (detections[index].text.lower(), convert_confidence(detections[index].confidence)) if is_match else None
+            for index, is_match in zip(best, matched)
+        ]
     except Exception as e:
-        raise ValueError(f"Failed to process field detection: {str(e)}")
+        raise ValueError(f"Failed to process field detections: {str(e)}")
 
 def convert_confidence(confidence: float) -> str:
     """
@@ -268,21 +625,9 @@ def adjust_bounds_for_row(bounds: Tuple[Tuple[float, float], Tuple[float, float]
         raise Exception(f"Failed to adjus bounds: {str(e)}")
 
 
-def process_player_row(detections: List[OCRDetection], row_number: int) -> Optional[PlayerStats]:
-    """Process OCR detections for a single player row"""
-    # Adjust field bounds based on row position
+def process_player_row(fields: Dict[PlayerDataField, Optional[Tuple[str, str]]]) -> Optional[PlayerStats]:
+    """Build the stats for a single player row from the detections matched to each of its fields"""
     try:
-        row_fields = {
-            field: adjust_bounds_for_row(field.value, row_number)
-            for field in PlayerDataField
-        }
-
-        # Find detections for each field
-        fields = {
-            name: find_detection_for_field(detections, adjusted_bounds)
-            for name, adjusted_bounds in row_fields.items()
-        }
-
         # Return None if no significant detections found for this row
         if not fields[PlayerDataField.NAME]:  # If no name detected, assume row is empty
             return None
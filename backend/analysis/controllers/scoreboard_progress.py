@@ -0,0 +1,167 @@
+import asyncio
+import json
+import logging
+import os
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from celery import Task
+from celery.result import AsyncResult
+from django.conf import settings
+
+logger = logging.getLogger('gunicorn.error')
+
+CHANNEL_PREFIX = 'scoreboard_progress'
+PROGRESS_STATE = 'PROGRESS'
+
+
+class ProgressStage(str, Enum):
+    DOWNLOAD = 'download'
+    PREPROCESS = 'preprocess'
+    OCR = 'ocr'
+    PARSE = 'parse'
+
+
+_redis_client: Optional[redis.Redis] = None
+_redis_client_pid: Optional[int] = None
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Lazily creates the Redis client used to publish progress, once per process (connections don't survive a fork).
+
+    returns:
+        - client [Redis]: The Redis client
+    """
+    global _redis_client, _redis_client_pid
+    if _redis_client is None or _redis_client_pid != os.getpid():
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+        _redis_client_pid = os.getpid()
+    return _redis_client
+
+
+def get_progress_channel(task_id: str) -> str:
+    return f"{CHANNEL_PREFIX}:{task_id}"
+
+
+def publish_progress(task: Optional[Task], stage: ProgressStage) -> None:
+    """
+    Records the stage a scoreboard task has reached in its result (so pollers see it) and publishes it on the task's
+    progress channel (so streams see it straight away). Failing to report progress never fails the task.
+
+    args:
+        - task [Task]: The running task, or None when the OCR isn't running inside a task (nothing is reported)
+        - stage [ProgressStage]: The stage the task has just started
+    """
+    if task is None or not task.request.id:
+        return
+
+    try:
+        task.update_state(state=PROGRESS_STATE, meta={'stage': stage.value})
+        publish_event(task.request.id, {"status": "processing", "stage": stage.value})
+    except Exception as e:
+        logger.error(f"Error publishing scoreboard progress: {str(e)}")
+
+
+def publish_finished(task_id: str) -> None:
+    """
+    Tells any stream of this task that it has finished. This must only be called once the result has been stored,
+    since streams read the result from the result backend when they are told.
+
+    args:
+        - task_id [Str]: The id of the finished task
+    """
+    try:
+        publish_event(task_id, {"status": "finished"})
+    except Exception as e:
+        logger.error(f"Error publishing scoreboard completion: {str(e)}")
+
+
+def publish_event(task_id: str, event: Dict[str, Any]) -> None:
+    get_redis_client().publish(get_progress_channel(task_id), json.dumps(event))
+
+
+def get_scoreboard_task_status(task_id: str) -> Dict[str, Any]:
+    """
+    Reads the current status of a scoreboard task from the result backend.
+
+    args:
+        - task_id [Str]: The id of the scoreboard task
+    returns:
+        - status [Dict]: {"status": "completed", "data": ...}, {"status": "failed", "error": ...} or
+        {"status": "processing", "stage": ...} where stage is None until the task has started
+    """
+    task = AsyncResult(task_id)
+
+    if task.state == 'SUCCESS':
+        return {"status": "completed", "data": task.result}
+    elif task.state == 'FAILURE':
+        return {"status": "failed", "error": str(task.result)}
+    elif task.state == PROGRESS_STATE:
+        return {"status": "processing", "stage": (task.info or {}).get('stage')}
+    else:
+        return {"status": "processing", "stage": None}
+
+
+def format_event(status: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(status)}\n\n"
+
+
+async def stream_scoreboard_progress(task_id: str) -> AsyncIterator[str]:
+    """
+    Server-sent events stream of a scoreboard task's progress. An event is sent for every stage the task reaches,
+    followed by a final event with the result (or error), after which the stream ends.
+
+    The stream subscribes to the task's progress channel before reading the task's status, so a task that finishes in
+    between is still seen. The status is re-read whenever the stream has been quiet for a heartbeat interval, which
+    also covers workers that die without publishing anything. The stream gives up after
+    settings.SCOREBOARD_PROGRESS_STREAM_TIMEOUT seconds.
+
+    args:
+        - task_id [Str]: The id of the scoreboard task
+    yields:
+        - event [Str]: Server-sent events, each carrying the same JSON the polling endpoint returns
+    """
+    timeout = getattr(settings, 'SCOREBOARD_PROGRESS_STREAM_TIMEOUT', 180)
+    heartbeat = getattr(settings, 'SCOREBOARD_PROGRESS_HEARTBEAT', 15)
+    get_status = sync_to_async(get_scoreboard_task_status, thread_sensitive=False)
+
+    client = aioredis.Redis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(get_progress_channel(task_id))
+
+        status = await get_status(task_id)
+        yield format_event(status)
+        if status["status"] != "processing":
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+
+            if message is None:
+                status = await get_status(task_id)
+                if status["status"] != "processing":
+                    yield format_event(status)
+                    return
+                yield ": heartbeat\n\n"
+                continue
+
+            event = json.loads(message["data"])
+            if event["status"] == "finished":
+                yield format_event(await get_status(task_id))
+                return
+            yield format_event(event)
+
+        yield format_event({"status": "failed", "error": "Timed out waiting for the scoreboard to be processed"})
+    except Exception as e:
+        logger.error(f"Error streaming scoreboard progress: {str(e)}")
+        yield format_event({"status": "failed", "error": str(e)})
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
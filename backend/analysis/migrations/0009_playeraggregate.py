@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0008_remove_playermapperformancehp_damage_and_more'),
+        ('general', '0003_team_color'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('scope', models.CharField(choices=[('overall', 'Overall'), ('game_mode', 'Game Mode'), ('map', 'Map'), ('tournament', 'Tournament')], max_length=10)),
+                ('scope_id', models.PositiveIntegerField(default=0)),
+                ('maps_played', models.IntegerField(default=0)),
+                ('kills', models.IntegerField(default=0)),
+                ('deaths', models.IntegerField(default=0)),
+                ('assists', models.IntegerField(default=0)),
+                ('ntk', models.IntegerField(default=0)),
+                ('damage', models.IntegerField(default=0)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='general.player')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('player', 'scope', 'scope_id'), name='unique_player_aggregate_scope')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:24
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+SCOPE_FIELDS = {
+    'overall': None,
+    'game_mode': 'map_analysis__game_mode_id',
+    'map': 'map_analysis__map_id',
+    'tournament': 'map_analysis__tournament_id',
+}
+
+
+def backfill_player_aggregates(apps, schema_editor):
+    PlayerMapPerformance = apps.get_model('analysis', 'PlayerMapPerformance')
+    PlayerAggregate = apps.get_model('analysis', 'PlayerAggregate')
+
+    for scope, scope_field in SCOPE_FIELDS.items():
+        group_fields = ['player_id'] + ([scope_field] if scope_field else [])
+        totals = PlayerMapPerformance.objects.values(*group_fields).annotate(
+            total_maps=Count('id'),
+            total_kills=Sum('kills'),
+            total_deaths=Sum('deaths'),
+            total_assists=Sum('assists'),
+            total_ntk=Sum('ntk'),
+            total_damage=Sum('damage'),
+        ).order_by()
+
+        PlayerAggregate.objects.bulk_create(
+            [
+                PlayerAggregate(
+                    player_id=total['player_id'],
+                    scope=scope,
+                    scope_id=total[scope_field] if scope_field else 0,
+                    maps_played=total['total_maps'],
+                    kills=total['total_kills'],
+                    deaths=total['total_deaths'],
+                    assists=total['total_assists'],
+                    ntk=total['total_ntk'],
+                    damage=total['total_damage'],
+                )
+                for total in totals.iterator()
+            ],
+            batch_size=1000
+        )
+
+
+def clear_player_aggregates(apps, schema_editor):
+    apps.get_model('analysis', 'PlayerAggregate').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0009_playeraggregate'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_player_aggregates, clear_player_aggregates),
+    ]
@@ -0,0 +1,146 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:40
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+# Each of these used to accept the same row twice (e.g. a player appearing twice in a scoreboard payload), which has
+# to be cleaned up before they can be made unique
+UNIQUE_FIELDS = {
+    'CustomAnalysisMapAnalysis': ['custom_analysis_id', 'map_analysis_id'],
+    'PlayerMapPerformance': ['player_id', 'map_analysis_id'],
+    'PlayerSeriesPerformance': ['series_analysis_id', 'player_id'],
+    'PlayerCustomAnalysisPerformance': ['custom_analysis_id', 'player_id'],
+}
+
+
+def remove_duplicates(model, fields):
+    """
+    Deletes every duplicate of a row but the first one, returning the values of the fields the duplicates had.
+    """
+    duplicates = list(model.objects.values(*fields).annotate(
+        first_id=Min('id'),
+        count=Count('id')
+    ).filter(count__gt=1).order_by())
+
+    for duplicate in duplicates:
+        model.objects.filter(**{field: duplicate[field] for field in fields}).exclude(
+            id=duplicate['first_id']
+        ).delete()
+
+    return duplicates
+
+
+def recompute_totals(PlayerMapPerformance, performance_model, kd_field, map_filter, owner_filter):
+    """
+    Recomputes the series or custom analysis totals of every player from their remaining map performances.
+    """
+    totals = PlayerMapPerformance.objects.filter(**map_filter).values('player_id').annotate(
+        total_kills=Sum('kills'),
+        total_deaths=Sum('deaths'),
+        total_assists=Sum('assists'),
+        total_ntk=Sum('ntk')
+    ).order_by()
+
+    for total in totals:
+        total_kills, total_deaths = total['total_kills'], total['total_deaths']
+        performance_model.objects.filter(player_id=total['player_id'], **owner_filter).update(**{
+            'total_kills': total_kills,
+            'total_deaths': total_deaths,
+            kd_field: float(total_kills) / total_deaths if total_deaths > 0 else float(total_kills),
+            'total_assists': total['total_assists'],
+            'total_ntk': total['total_ntk'],
+        })
+
+
+def remove_duplicate_rows(apps, schema_editor):
+    MapAnalysis = apps.get_model('analysis', 'MapAnalysis')
+    CustomAnalysisMapAnalysis = apps.get_model('analysis', 'CustomAnalysisMapAnalysis')
+    PlayerMapPerformance = apps.get_model('analysis', 'PlayerMapPerformance')
+    PlayerSeriesPerformance = apps.get_model('analysis', 'PlayerSeriesPerformance')
+    PlayerCustomAnalysisPerformance = apps.get_model('analysis', 'PlayerCustomAnalysisPerformance')
+    PlayerAggregate = apps.get_model('analysis', 'PlayerAggregate')
+
+    duplicates = {
+        model_name: remove_duplicates(apps.get_model('analysis', model_name), fields)
+        for model_name, fields in UNIQUE_FIELDS.items()
+    }
+
+    # The totals built from the duplicated map performances and links counted them twice
+    map_ids = {duplicate['map_analysis_id'] for duplicate in duplicates['PlayerMapPerformance']}
+    series_ids = set(MapAnalysis.objects.filter(
+        id__in=map_ids, series_analysis__isnull=False
+    ).values_list('series_analysis_id', flat=True))
+    custom_ids = {duplicate['custom_analysis_id'] for duplicate in duplicates['CustomAnalysisMapAnalysis']}
+    custom_ids.update(CustomAnalysisMapAnalysis.objects.filter(
+        map_analysis_id__in=map_ids
+    ).values_list('custom_analysis_id', flat=True))
+
+    for series_id in series_ids:
+        recompute_totals(
+            PlayerMapPerformance, PlayerSeriesPerformance, 'series_kd_ratio',
+            {'map_analysis__series_analysis_id': series_id}, {'series_analysis_id': series_id}
+        )
+    for custom_id in custom_ids:
+        recompute_totals(
+            PlayerMapPerformance, PlayerCustomAnalysisPerformance, 'custom_analysis_kd_ratio',
+            {'map_analysis_id__in': CustomAnalysisMapAnalysis.objects.filter(
+                custom_analysis_id=custom_id
+            ).values('map_analysis_id')},
+            {'custom_analysis_id': custom_id}
+        )
+
+    if map_ids:
+        PlayerAggregate.objects.all().delete()
+        import_module('analysis.migrations.0010_backfill_player_aggregates').backfill_player_aggregates(
+            apps, schema_editor
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0010_backfill_player_aggregates'),
+        ('general', '0003_team_color'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='mapanalysis',
+            index=models.Index(fields=['played_date'], name='map_played_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mapanalysis',
+            index=models.Index(fields=['tournament', 'played_date'], name='map_tournament_played_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mapanalysis',
+            index=models.Index(fields=['game_mode', 'map', 'played_date'], name='map_mode_map_played_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seriesanalysis',
+            index=models.Index(fields=['played_date'], name='series_played_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seriesanalysis',
+            index=models.Index(fields=['tournament', 'played_date'], name='series_tournament_played_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='customanalysismapanalysis',
+            constraint=models.UniqueConstraint(fields=('custom_analysis', 'map_analysis'), name='unique_custom_analysis_map'),
+        ),
+        migrations.AddConstraint(
+            model_name='playercustomanalysisperformance',
+            constraint=models.UniqueConstraint(fields=('custom_analysis', 'player'), name='unique_player_custom_performance'),
+        ),
+        migrations.AddConstraint(
+            model_name='playermapperformance',
+            constraint=models.UniqueConstraint(fields=('player', 'map_analysis'), name='unique_player_map_performance'),
+        ),
+        migrations.AddConstraint(
+            model_name='playerseriesperformance',
+            constraint=models.UniqueConstraint(fields=('series_analysis', 'player'), name='unique_player_series_performance'),
+        ),
+    ]
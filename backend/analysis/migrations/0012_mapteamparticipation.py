@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0011_list_filter_indexes'),
+        ('general', '0003_team_color'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapTeamParticipation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('side', models.PositiveSmallIntegerField(choices=[(1, 'Team One'), (2, 'Team Two')])),
+                ('won', models.BooleanField()),
+                ('played_date', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='mapteamparticipation',
+            name='map_analysis',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to='analysis.mapanalysis'),
+        ),
+        migrations.AddField(
+            model_name='mapteamparticipation',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='map_participations', to='general.team'),
+        ),
+        migrations.AddIndex(
+            model_name='mapteamparticipation',
+            index=models.Index(fields=['team', 'played_date', 'map_analysis'], name='participation_team_played_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='mapteamparticipation',
+            constraint=models.UniqueConstraint(fields=('map_analysis', 'side'), name='unique_map_team_participation_side'),
+        ),
+    ]
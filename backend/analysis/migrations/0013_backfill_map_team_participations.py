@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:07
+
+from django.db import migrations
+
+
+def backfill_map_team_participations(apps, schema_editor):
+    MapAnalysis = apps.get_model('analysis', 'MapAnalysis')
+    MapTeamParticipation = apps.get_model('analysis', 'MapTeamParticipation')
+
+    map_analyses = MapAnalysis.objects.values(
+        'id', 'team_one_id', 'team_two_id', 'winner_id', 'played_date'
+    ).order_by('id')
+
+    MapTeamParticipation.objects.bulk_create(
+        [
+            MapTeamParticipation(
+                map_analysis_id=map_analysis['id'],
+                team_id=map_analysis[team_field],
+                side=side,
+                won=map_analysis[team_field] == map_analysis['winner_id'],
+                played_date=map_analysis['played_date'],
+            )
+            for map_analysis in map_analyses.iterator()
+            for side, team_field in ((1, 'team_one_id'), (2, 'team_two_id'))
+        ],
+        batch_size=1000
+    )
+
+
+def clear_map_team_participations(apps, schema_editor):
+    apps.get_model('analysis', 'MapTeamParticipation').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0012_mapteamparticipation'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_map_team_participations, clear_map_team_participations),
+    ]
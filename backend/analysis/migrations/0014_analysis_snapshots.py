@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0013_backfill_map_team_participations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customanalysis',
+            name='snapshot',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customanalysis',
+            name='snapshot_version',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='mapanalysis',
+            name='snapshot',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mapanalysis',
+            name='snapshot_version',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='seriesanalysis',
+            name='snapshot',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seriesanalysis',
+            name='snapshot_version',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
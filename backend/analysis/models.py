@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, Value, When
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -17,6 +18,16 @@ class SeriesAnalysis(models.Model):
     team_two = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='team_two_series')
     team_one_map_count = models.PositiveIntegerField()
     team_two_map_count = models.PositiveIntegerField()
+    # The serialised detail response and the version it was built for (see analysis/controllers/analysis_snapshots.py)
+    snapshot = models.TextField(null=True, blank=True)
+    snapshot_version = models.CharField(max_length=255, null=True, blank=True)
+
+    class Meta:
+        # Tuned to the series list filters, which always order by played_date
+        indexes = [
+            models.Index(fields=['played_date'], name='series_played_date_idx'),
+            models.Index(fields=['tournament', 'played_date'], name='series_tournament_played_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -43,23 +54,116 @@ class MapAnalysis(models.Model):
     played_date = models.DateTimeField(validators=[MaxValueValidator(limit_value=timezone.now)])
     map = models.ForeignKey(Map, on_delete=models.CASCADE)
     game_mode = models.ForeignKey(GameMode, on_delete=models.CASCADE)
+    # The serialised detail response and the version it was built for (see analysis/controllers/analysis_snapshots.py)
+    snapshot = models.TextField(null=True, blank=True)
+    snapshot_version = models.CharField(max_length=255, null=True, blank=True)
+
+    class Meta:
+        # Tuned to the map list filters, which always order by played_date
+        indexes = [
+            models.Index(fields=['played_date'], name='map_played_date_idx'),
+            models.Index(fields=['tournament', 'played_date'], name='map_tournament_played_idx'),
+            models.Index(fields=['game_mode', 'map', 'played_date'], name='map_mode_map_played_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def delete(self, *args, **kwargs):
-        custom_analyses = CustomAnalysis.objects.filter(
-            map_analyses__id=self.id
-        )
-        custom_analyses.delete()
+        with transaction.atomic():
+            custom_analyses = CustomAnalysis.objects.filter(
+                map_analyses__id=self.id
+            )
+            custom_analyses.delete()
+
+            if self.series_analysis:
+                series = self.series_analysis
+                self.series_analysis = None
+                self.save()
+                series.delete()
+
+            super().delete(*args, **kwargs)
+
+class MapTeamParticipationManager(models.Manager):
+    def add_map_analysis(self, map_analysis):
+        """
+        Records both teams of a newly created map analysis, one row per side. The rows are removed along with the map
+        analysis by the cascade.
+
+        args:
+            - map_analysis [MapAnalysis]: The map analysis that was created
+        """
+        self.bulk_create([
+            MapTeamParticipation(
+                map_analysis=map_analysis,
+                team_id=team_id,
+                side=side,
+                won=team_id == map_analysis.winner_id,
+                played_date=map_analysis.played_date
+            )
+            for side, team_id in (
+                (MapTeamParticipation.Side.TEAM_ONE, map_analysis.team_one_id),
+                (MapTeamParticipation.Side.TEAM_TWO, map_analysis.team_two_id),
+            )
+        ])
+
+    def head_to_head(self, team_id, opponent_id):
+        """
+        The participations of a team in the maps it played against an opponent, found by joining the participation
+        table onto itself by map.
+
+        args:
+            - team_id [int]: The id of the team
+            - opponent_id [int]: The id of the opponent
+        returns:
+            - participations [QuerySet]: The team's participations in the maps against the opponent
+        """
+        return self.filter(team_id=team_id).filter(Exists(self.filter(
+            map_analysis_id=OuterRef('map_analysis_id'),
+            team_id=opponent_id
+        )))
+
+    def win_rates(self, tournament_id=None):
+        """
+        The number of maps played and won by each team, in a single grouped count.
+
+        args:
+            - tournament_id [int]: Only count the maps of this tournament, None for every map
+        returns:
+            - win_rates [QuerySet]: Rows of team_id, maps_played and maps_won
+        """
+        participations = self.all()
+        if tournament_id:
+            participations = participations.filter(map_analysis__tournament_id=tournament_id)
 
-        if self.series_analysis:
-            series = self.series_analysis
-            self.series_analysis = None
-            self.save()
-            series.delete()
+        return participations.values('team_id').annotate(
+            maps_played=Count('id'),
+            maps_won=Count('id', filter=Q(won=True))
+        ).order_by()
 
-        super().delete(*args, **kwargs)
+class MapTeamParticipation(models.Model):
+    class Side(models.IntegerChoices):
+        TEAM_ONE = 1, 'Team One'
+        TEAM_TWO = 2, 'Team Two'
+
+    created = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
+    map_analysis = models.ForeignKey(MapAnalysis, on_delete=models.CASCADE, related_name='participations')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='map_participations')
+    side = models.PositiveSmallIntegerField(choices=Side.choices)
+    won = models.BooleanField()
+    # Copied from the map analysis so the team filter of the map list can be served from this table's index
+    played_date = models.DateTimeField()
+
+    objects = MapTeamParticipationManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['map_analysis', 'side'], name='unique_map_team_participation_side')
+        ]
+        indexes = [
+            models.Index(fields=['team', 'played_date', 'map_analysis'], name='participation_team_played_idx'),
+        ]
 
 class CustomAnalysis(models.Model):
     created = models.DateTimeField(auto_now_add=True)
@@ -71,6 +175,9 @@ class CustomAnalysis(models.Model):
         through='CustomAnalysisMapAnalysis',
         related_name='custom_analyses'
     )
+    # The serialised detail response and the version it was built for (see analysis/controllers/analysis_snapshots.py)
+    snapshot = models.TextField(null=True, blank=True)
+    snapshot_version = models.CharField(max_length=255, null=True, blank=True)
 
     def __str__(self):
         return self.title
@@ -81,6 +188,11 @@ class CustomAnalysisMapAnalysis(models.Model):
     custom_analysis = models.ForeignKey(CustomAnalysis, on_delete=models.CASCADE)
     map_analysis = models.ForeignKey(MapAnalysis, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['custom_analysis', 'map_analysis'], name='unique_custom_analysis_map')
+        ]
+
 class PlayerMapPerformance(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
@@ -94,6 +206,12 @@ class PlayerMapPerformance(models.Model):
     highest_streak = models.PositiveIntegerField()
     damage = models.PositiveIntegerField()
 
+    class Meta:
+        # Also serves the player filter of the map list, which goes from the player to their maps
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'map_analysis'], name='unique_player_map_performance')
+        ]
+
 class PlayerMapPerformanceHP(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
@@ -138,6 +256,11 @@ class PlayerSeriesPerformance(models.Model):
     total_assists = models.PositiveIntegerField()
     total_ntk = models.PositiveIntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['series_analysis', 'player'], name='unique_player_series_performance')
+        ]
+
 class PlayerCustomAnalysisPerformance(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
@@ -148,3 +271,135 @@ class PlayerCustomAnalysisPerformance(models.Model):
     custom_analysis_kd_ratio =  models.FloatField(validators=[MinValueValidator(0)])
     total_assists = models.PositiveIntegerField()
     total_ntk = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['custom_analysis', 'player'], name='unique_player_custom_performance')
+        ]
+
+class PlayerAggregateManager(models.Manager):
+    STAT_FIELDS = ['kills', 'deaths', 'assists', 'ntk', 'damage']
+
+    def get_scopes(self, map_analysis):
+        return [
+            (PlayerAggregate.Scope.OVERALL, 0),
+            (PlayerAggregate.Scope.GAME_MODE, map_analysis.game_mode_id),
+            (PlayerAggregate.Scope.MAP, map_analysis.map_id),
+            (PlayerAggregate.Scope.TOURNAMENT, map_analysis.tournament_id),
+        ]
+
+    def add_map_analysis(self, map_analysis, performances):
+        """
+        Adds the player performances of a newly created map analysis onto the aggregates of each of its players.
+
+        args:
+            - map_analysis [MapAnalysis]: The map analysis that was created
+            - performances [List[PlayerMapPerformance]]: The player performances of the map analysis
+        """
+        self.apply_performances([map_analysis], performances, 1)
+
+    def remove_map_analysis(self, map_analysis):
+        """
+        Takes the player performances of a map analysis that is about to be deleted off the aggregates of each of its
+        players, dropping any aggregate that no longer covers a map.
+
+        args:
+            - map_analysis [MapAnalysis]: The map analysis that is being deleted
+        """
+        self.remove_map_analyses([map_analysis])
+
+    def remove_map_analyses(self, map_analyses):
+        """
+        Takes the player performances of a group of map analyses that are about to be deleted off the aggregates of
+        their players, dropping any aggregate that no longer covers a map.
+
+        args:
+            - map_analyses [List[MapAnalysis]]: The map analyses that are being deleted
+        """
+        performances = list(PlayerMapPerformance.objects.filter(
+            map_analysis_id__in=[map_analysis.id for map_analysis in map_analyses]
+        ))
+        self.apply_performances(map_analyses, performances, -1)
+        self.filter(
+            player_id__in=set(performance.player_id for performance in performances),
+            maps_played__lte=0
+        ).delete()
+
+    def apply_performances(self, map_analyses, performances, sign):
+        """
+        Applies the player performances of some map analyses to the overall, game mode, map and tournament aggregates
+        of each player in two statements: one insert of any missing aggregates and one update of all of them. This has
+        to run inside the transaction that creates or deletes the map analyses.
+
+        args:
+            - map_analyses [List[MapAnalysis]]: The map analyses the performances belong to
+            - performances [List[PlayerMapPerformance]]: The player performances
+            - sign [int]: 1 to add the performances, -1 to remove them
+        """
+        scopes = {map_analysis.id: self.get_scopes(map_analysis) for map_analysis in map_analyses}
+
+        deltas = {}
+        for performance in performances:
+            for scope, scope_id in scopes[performance.map_analysis_id]:
+                delta = deltas.setdefault((performance.player_id, scope, scope_id), dict.fromkeys(
+                    ['maps_played'] + self.STAT_FIELDS, 0
+                ))
+                delta['maps_played'] += sign
+                for field in self.STAT_FIELDS:
+                    delta[field] += sign * getattr(performance, field)
+
+        if not deltas:
+            return
+
+        self.bulk_create(
+            [
+                PlayerAggregate(player_id=player_id, scope=scope, scope_id=scope_id)
+                for player_id, scope, scope_id in deltas
+            ],
+            ignore_conflicts=True
+        )
+
+        conditions = {
+            key: Q(player_id=key[0], scope=key[1], scope_id=key[2])
+            for key in deltas
+        }
+        updates = {
+            field: F(field) + Case(
+                *[When(conditions[key], then=Value(delta[field])) for key, delta in deltas.items()],
+                default=Value(0)
+            )
+            for field in ['maps_played'] + self.STAT_FIELDS
+        }
+
+        matched = Q()
+        for condition in conditions.values():
+            matched |= condition
+
+        self.filter(matched).update(last_modified=timezone.now(), **updates)
+
+class PlayerAggregate(models.Model):
+    class Scope(models.TextChoices):
+        OVERALL = 'overall', 'Overall'
+        GAME_MODE = 'game_mode', 'Game Mode'
+        MAP = 'map', 'Map'
+        TOURNAMENT = 'tournament', 'Tournament'
+
+    created = models.DateTimeField(auto_now_add=True)
+    last_modified = models.DateTimeField(auto_now=True)
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='aggregates')
+    scope = models.CharField(max_length=10, choices=Scope.choices)
+    # The id of the game mode, map or tournament the aggregate covers, 0 for the overall aggregate
+    scope_id = models.PositiveIntegerField(default=0)
+    maps_played = models.IntegerField(default=0)
+    kills = models.IntegerField(default=0)
+    deaths = models.IntegerField(default=0)
+    assists = models.IntegerField(default=0)
+    ntk = models.IntegerField(default=0)
+    damage = models.IntegerField(default=0)
+
+    objects = PlayerAggregateManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'scope', 'scope_id'], name='unique_player_aggregate_scope')
+        ]
@@ -0,0 +1,29 @@
+import weakref
+
+from django.db.models import QuerySet
+from django.db.models.signals import pre_delete
+
+from analysis.models import MapAnalysis, PlayerAggregate
+
+# The ids of the map analyses each queryset delete has already taken off the player aggregates
+removed_by_delete = weakref.WeakKeyDictionary()
+
+
+def remove_map_analysis_from_aggregates(sender, instance, origin=None, **kwargs):
+    """
+    Takes a map analysis off the player aggregates before it is deleted, whether it is deleted directly or by the
+    cascade from its tournament, map, game mode or one of its teams. A queryset delete sends this once per map
+    analysis, so the whole queryset is taken off in one batch the first time.
+    """
+    if isinstance(origin, QuerySet) and origin.model is MapAnalysis:
+        removed = removed_by_delete.setdefault(origin, set())
+        if instance.id not in removed:
+            map_analyses = list(origin.all())
+            PlayerAggregate.objects.remove_map_analyses(map_analyses)
+            removed.update(map_analysis.id for map_analysis in map_analyses)
+        return
+
+    PlayerAggregate.objects.remove_map_analysis(instance)
+
+
+pre_delete.connect(remove_map_analysis_from_aggregates, sender=MapAnalysis)
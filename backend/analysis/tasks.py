@@ -1,15 +1,41 @@
+from typing import List, Optional
+
 from celery import shared_task
+from celery.signals import task_failure, task_success, worker_process_init
 from celery.utils.log import get_task_logger
+from django.conf import settings
 
-from .controllers.scoreboard_processing import extract_data, process_data
+from .controllers.ocr_engine import ocr_engines
+from .controllers.scoreboard_cache import cache_scoreboard, get_cached_scoreboard, hash_scoreboard
+from .controllers.scoreboard_processing import decode_scoreboard, extract_data_batch, process_data
+from .controllers.scoreboard_progress import ProgressStage, publish_finished, publish_progress
+from utils.s3_handling import get_object_with_etag_from_bucket
 
 logger = get_task_logger(__name__)
 
+@worker_process_init.connect
+def init_ocr_engines(**kwargs):
+    """
+    Loads the OCR engines once when a worker process boots, so that scoreboard tasks borrow an already initialised
+    engine instead of loading the models themselves. A dummy inference is run on each engine so the first real
+    scoreboard isn't penalised.
+
+    If this fails the worker stays up and the engines are loaded lazily by the first task instead.
+    """
+    try:
+        ocr_engines.initialise(warm_up=getattr(settings, 'OCR_WARM_UP_ON_BOOT', True))
+    except Exception as e:
+        logger.error(f"Error initialising OCR engines: {str(e)}")
+
 @shared_task(bind=True, soft_time_limit=120, time_limit=180)
-def process_scoreboard(self, scoreboard: str):
+def process_scoreboard_file(self, file_name: str):
     """
     This function handles the task of performing OCR on a scoreboard screenshot and extracting the relevant data from
-    it.
+    it. Only the S3 key travels through the broker, the screenshot itself is fetched from the bucket by the worker.
+    Results are cached by the screenshot's content hash, so re-submitted screenshots skip OCR entirely.
+
+    The task reports each stage it reaches (download, preprocess, ocr, parse) as PROGRESS state, and publishes it to
+    the task's progress channel so it can be streamed to the client (see scoreboard_progress.py).
 
     The data returned may look something as follows:
     {
@@ -32,17 +58,152 @@ def process_scoreboard(self, scoreboard: str):
     }
 
     args:
-        - scoreboard [Str]: The scoreboard screenshot as a string (base64 encoded image)
+        - file_name [Str]: The S3 key of the uploaded scoreboard screenshot
     returns:
         - data [Dict]: A dictionary response of the extracted data. Empty until processing is complete. Example above.
     raises:
-        - Exception: If there's an error during processing
+        - Exception: If the screenshot can't be fetched or there's an error during processing
+    """
+    try:
+        publish_progress(self, ProgressStage.DOWNLOAD)
+        scoreboard, etag = get_object_with_etag_from_bucket(file_name)
+        return run_scoreboard_ocr(scoreboard, etag, task=self)
+    except Exception as e:
+        logger.error(f"Error processing scoreboard {file_name}: {str(e)}")
+        raise
+
+@shared_task(bind=True, soft_time_limit=300, time_limit=360)
+def process_scoreboard_batch(self, file_names: List[str]):
+    """
+    This function handles a micro-batch of scoreboard screenshots from a batch upload. Screenshots that are already
+    cached are answered from the cache, and the rest go through OCR together, so in 'recognition' mode a single
+    recognition call covers the fields of every scoreboard in the micro-batch.
+
+    A failure with one screenshot doesn't fail the others, it is reported against that screenshot instead. If OCR
+    fails for the micro-batch, each screenshot is retried on its own (see extract_scoreboard_batch).
+
+    args:
+        - file_names [List]: The S3 keys of the uploaded scoreboard screenshots
+    returns:
+        - results [Dict]: For each file name, either {"status": "completed", "data": ...} with the same data
+        process_scoreboard_file returns, or {"status": "failed", "error": ...}
+    """
+    results = {}
+    pending = []
+    for file_name in file_names:
+        try:
+            scoreboard, etag = get_object_with_etag_from_bucket(file_name)
+            content_hash = hash_scoreboard(scoreboard)
+
+            cached_data = get_cached_scoreboard(content_hash)
+            if cached_data is not None:
+                results[file_name] = {"status": "completed", "data": cached_data}
+                continue
+
+            pending.append((file_name, content_hash, etag, decode_scoreboard(scoreboard)))
+        except Exception as e:
+            logger.error(f"Error fetching scoreboard {file_name}: {str(e)}")
+            results[file_name] = {"status": "failed", "error": str(e)}
+
+    if pending:
+        extracted = extract_scoreboard_batch([sb for _, _, _, sb in pending])
+
+        for (file_name, content_hash, etag, _), extraction in zip(pending, extracted):
+            try:
+                if isinstance(extraction, Exception):
+                    raise extraction
+
+                game_data, player_data = extraction
+                processed_data = process_data(game_data, player_data)
+                cache_scoreboard(content_hash, processed_data, etag)
+                results[file_name] = {"status": "completed", "data": processed_data}
+            except Exception as e:
+                logger.error(f"Error processing scoreboard {file_name}: {str(e)}")
+                results[file_name] = {"status": "failed", "error": str(e)}
+
+    return results
+
+def extract_scoreboard_batch(scoreboards: List) -> List:
+    """
+    Runs OCR over a micro-batch of decoded scoreboards. extract_data_batch fails the whole batch if any scoreboard in
+    it fails, so when that happens each scoreboard is retried on its own and only the ones that fail again are failed.
+
+    args:
+        - scoreboards [List]: The decoded scoreboard screenshots
+    returns:
+        - extracted [List]: For each scoreboard, either its (game_result, players_result) or the exception it failed
+        with
     """
     try:
-        game_data, player_data = extract_data(scoreboard)
-        processed_data = process_data(game_data, player_data)
+        return extract_data_batch(scoreboards)
+    except Exception as e:
+        if len(scoreboards) == 1:
+            return [e]
+        logger.warning(f"Error extracting scoreboard batch, retrying each scoreboard individually: {str(e)}")
+
+    extracted = []
+    for scoreboard in scoreboards:
+        try:
+            extracted.append(extract_data_batch([scoreboard])[0])
+        except Exception as e:
+            extracted.append(e)
+    return extracted
+
+@shared_task(bind=True, soft_time_limit=120, time_limit=180)
+def process_scoreboard(self, scoreboard: str):
+    """
+    Deprecated: use process_scoreboard_file, which takes the S3 key instead of the screenshot itself. This is kept so
+    that messages queued with the old contract are still processed.
 
-        return processed_data
+    args:
+        - scoreboard [Str]: The scoreboard screenshot as a string (base64 encoded image)
+    returns:
+        - data [Dict]: A dictionary response of the extracted data, see process_scoreboard_file.
+    raises:
+        - Exception: If there's an error during processing
+    """
+    logger.warning("process_scoreboard is deprecated, enqueue process_scoreboard_file with the S3 key instead")
+    try:
+        return run_scoreboard_ocr(scoreboard, task=self)
     except Exception as e:
         logger.error(f"Error processing scoreboard: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+@task_success.connect(sender=process_scoreboard_file)
+@task_success.connect(sender=process_scoreboard)
+def publish_scoreboard_success(sender=None, **kwargs):
+    # Celery stores the result before sending task_success, so streams can read it as soon as they're told
+    publish_finished(sender.request.id)
+
+@task_failure.connect(sender=process_scoreboard_file)
+@task_failure.connect(sender=process_scoreboard)
+def publish_scoreboard_failure(sender=None, task_id=None, **kwargs):
+    publish_finished(task_id)
+
+def run_scoreboard_ocr(scoreboard: bytes, etag: Optional[str] = None, task=None):
+    """
+    Runs OCR over a scoreboard screenshot and processes the detections into the scoreboard data, unless the result
+    for the same screenshot is already cached.
+
+    args:
+        - scoreboard [Bytes]: The scoreboard screenshot
+        - etag [Str]: The ETag of the screenshot in S3, if known
+        - task [Task]: The task running the OCR, which progress is reported through
+    returns:
+        - data [Dict]: A dictionary response of the extracted data
+    """
+    publish_progress(task, ProgressStage.PREPROCESS)
+    content_hash = hash_scoreboard(scoreboard)
+    cached_data = get_cached_scoreboard(content_hash)
+    if cached_data is not None:
+        return cached_data
+    image = decode_scoreboard(scoreboard)
+
+    publish_progress(task, ProgressStage.OCR)
+    game_data, player_data = extract_data_batch([image])[0]
+
+    publish_progress(task, ProgressStage.PARSE)
+    processed_data = process_data(game_data, player_data)
+
+    cache_scoreboard(content_hash, processed_data, etag)
+    return processed_data
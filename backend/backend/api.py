@@ -5,9 +5,12 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 
+from asgiref.sync import sync_to_async
 from botocore.exceptions import ClientError
-from celery.result import AsyncResult
-from ninja import NinjaAPI, Schema
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from ninja import NinjaAPI, Query, Schema
 from ninja.errors import HttpError
 from ninja.responses import Response
 
@@ -17,7 +20,10 @@ from analysis.controllers.response_generation import (
     generate_custom_analyses_response,
     generate_map_analysis_response,
     generate_series_analysis_response,
-    generate_custom_analysis_response
+    generate_custom_analysis_response,
+    generate_player_profile_response,
+    generate_head_to_head_response,
+    generate_team_win_rates_response
 )
 from analysis.controllers.model_control import (
     create_custom_analysis_from_maps,
@@ -31,10 +37,30 @@ from analysis.controllers.model_control import (
     delete_series_analyses,
     delete_series_analysis
 )
-from analysis.tasks import process_scoreboard
-from general.controllers.response_generation import generate_general_data_response
-
-from utils.s3_handling import generate_upload_scoreboard_url, generate_view_scoreboard_url, get_object_from_bucket
+from analysis.controllers.response_versions import (
+    get_custom_analyses_version,
+    get_custom_analysis_version,
+    get_head_to_head_version,
+    get_map_analyses_version,
+    get_map_analysis_version,
+    get_player_profile_version,
+    get_series_analyses_version,
+    get_series_analysis_version,
+    get_team_win_rates_version
+)
+from analysis.controllers.scoreboard_batches import dispatch_scoreboard_batch, get_scoreboard_batch_progress
+from analysis.controllers.scoreboard_cache import get_cached_scoreboard_for_etag, get_scoreboard_cache_stats
+from analysis.controllers.scoreboard_progress import get_scoreboard_task_status, stream_scoreboard_progress
+from analysis.tasks import process_scoreboard_file
+from general.controllers.general_data_cache import get_cached_general_data
+
+from utils.http_handling import conditional_etag, etag_matches, not_modified, set_validator_headers
+from utils.s3_handling import (
+    generate_upload_scoreboard_url,
+    generate_view_scoreboard_url,
+    generate_view_scoreboard_urls,
+    get_object_etag
+)
 
 api = NinjaAPI()
 logger = logging.getLogger('gunicorn.error')
@@ -66,6 +92,9 @@ class MapAnalysisIn(Schema):
     team_two_score: int
     player_stats: List[PlayerStatsSchema]
 
+class ScoreboardBatchIn(Schema):
+    file_names: List[str]
+
 class SeriesAnalysisIn(Schema):
     title: str
     map_ids: List[int]
@@ -82,6 +111,8 @@ class MapAnalysesFilterIn(Schema):
     team_one: Optional[str] = None
     team_two: Optional[str] = None
     player: Optional[str] = None
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
 
 class SeriesAnalysesFilterIn(Schema):
     tournament: Optional[int] = None
@@ -89,6 +120,8 @@ class SeriesAnalysesFilterIn(Schema):
     team_one: Optional[str] = None
     team_two: Optional[str] = None
     player: Optional[str] = None
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
 
 class AnalysisFilterIn(Schema):
     id: int
@@ -129,35 +162,92 @@ def view_scoreboard_url(request, file_name: str):
         logger.error(f"Error generating pre-signed URL for viewing: {e}")
         return Response({"error": str(e)}, status=500)
 
+@api.get("/view_scoreboard_urls")
+def view_scoreboard_urls(request, file_names: List[str] = Query(...)):
+    try:
+        urls = generate_view_scoreboard_urls(file_names)
+        return {"urls": urls}
+    except ValidationError as e:
+        logger.error(f"Error generating pre-signed URLs for viewing: {e}")
+        return Response({"error": str(e)}, status=400)
+    except ClientError as e:
+        logger.error(f"Error generating pre-signed URLs for viewing: {e}")
+        return Response({"error": "Failed to generate pre-signed URLs for viewing"}, status=500)
+    except Exception as e:
+        logger.error(f"Error generating pre-signed URLs for viewing: {e}")
+        return Response({"error": str(e)}, status=500)
+
 @api.get("/new_map_analysis_step_one")
 def process_scoreboard_data(request, file_name: str):
     try:
-        scoreboard = get_object_from_bucket(file_name)
-        task = process_scoreboard.delay(scoreboard)
+        try:
+            cached_data = get_cached_scoreboard_for_etag(get_object_etag(file_name))
+        except Exception as e:
+            logger.error(f"Error checking scoreboard cache: {e}")
+            cached_data = None
+
+        if cached_data is not None:
+            return {"task_id": None, "status": "completed", "data": cached_data}
+
+        task = process_scoreboard_file.delay(file_name)
 
         return {"task_id": str(task.id)}
-    except ClientError as e:
-        logger.error(f"Error fetching image from S3: {e}")
-        return Response({"error": "Failed to fetch image from S3"}, status=500)
     except Exception as e:
         logger.error(f"Error processing scoreboard: {e}")
         return Response({"error": str(e)}, status=500)
 
+@api.post("/new_map_analysis_batch")
+def process_scoreboard_batch_data(request, payload: ScoreboardBatchIn):
+    try:
+        batch_id = dispatch_scoreboard_batch(payload.file_names)
+        return {"batch_id": batch_id}
+    except ValidationError as e:
+        logger.error(f"Error processing scoreboard batch: {e}")
+        return Response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error processing scoreboard batch: {e}")
+        return Response({"error": str(e)}, status=500)
+
+@api.get("/new_map_analysis_batch_progress")
+def process_scoreboard_batch_progress(request, batch_id: str):
+    try:
+        return get_scoreboard_batch_progress(batch_id)
+    except ValidationError as e:
+        logger.error(f"Error checking scoreboard batch progress: {e}")
+        return Response({"error": str(e)}, status=404)
+    except Exception as e:
+        logger.error(f"Error checking scoreboard batch progress: {e}")
+        return Response({"error": str(e)}, status=500)
+
+@api.get("/scoreboard_cache_stats")
+def scoreboard_cache_stats(request):
+    try:
+        return {"scoreboard_cache": get_scoreboard_cache_stats()}
+    except Exception as e:
+        logger.error(f"Error getting scoreboard cache stats: {e}")
+        return Response({"error": str(e)}, status=500)
+
 @api.get("/new_map_analysis_step_two")
 async def process_scoreboard_progress(request, task_id: str):
     try:
-        task = AsyncResult(task_id)
-
-        if task.state == 'SUCCESS':
-            return {"status": "completed", "data": task.result}
-        elif task.state == 'FAILURE':
-            return {"status": "failed", "error": str(task.result)}
-        else:
-            return {"status": "processing"}
+        return await sync_to_async(get_scoreboard_task_status, thread_sensitive=False)(task_id)
     except Exception as e:
         logger.error(f"Error checking task status: {str(e)}")
         return Response({"error": str(e)}, status=500)
 
+@api.get("/new_map_analysis_step_two_stream")
+async def stream_scoreboard_progress_events(request, task_id: str):
+    # A WSGI server buffers the whole stream and holds a sync worker until it ends, so the stream is only served by
+    # the ASGI deployment (see conf/gunicorn/prod_asgi.py). Elsewhere the client falls back to polling step two.
+    if not isinstance(request, ASGIRequest):
+        return Response({"error": "Progress streaming is only served under ASGI, poll the task status instead"},
+                        status=501)
+
+    response = StreamingHttpResponse(stream_scoreboard_progress(task_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 @api.post("/new_map_analysis_confirmation")
 def create_map_analysis_object(request, payload: MapAnalysisIn):
     try:
@@ -194,35 +284,48 @@ def create_custom_analysis_object_from_series(request, payload: CustomAnalysisIn
         logger.error(f"Error creating custom analysis: {e}")
         return Response({"error": f"Error occurred while creating custom analysis: {str(e)}"}, status=500)
 
-@api.post("/map_analyses")
-def get_map_analyses(request, payload: MapAnalysesFilterIn):
+@api.get("/map_analyses")
+@conditional_etag(get_map_analyses_version)
+def get_map_analyses(request, payload: Query[MapAnalysesFilterIn]):
     try:
-        result = generate_map_analyses_response(payload)
-        return {"map_analyses": result}
+        result, next_cursor = generate_map_analyses_response(payload)
+        return {"map_analyses": result, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    except ValidationError as e:
+        logger.error(f"Error fetching map analyses: {e}")
+        return Response({"error": f"Error fetching map analyses: {str(e)}"}, status=400)
     except Exception as e:
         logger.error(f"Error fetching map analyses: {e}")
         return Response({"error": f"Error fetching map analyses: {str(e)}"}, status=500)
 
-@api.post("/series_analyses")
-def get_series_analyses(request, payload: SeriesAnalysesFilterIn):
+@api.get("/series_analyses")
+@conditional_etag(get_series_analyses_version)
+def get_series_analyses(request, payload: Query[SeriesAnalysesFilterIn]):
     try:
-        result = generate_series_analyses_response(payload)
-        return {"series_analyses": result }
+        result, next_cursor = generate_series_analyses_response(payload)
+        return {"series_analyses": result, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    except ValidationError as e:
+        logger.error(f"Error fetching series analyses: {e}")
+        return Response({"error": f"Error fetching series analyses: {str(e)}"}, status=400)
     except Exception as e:
         logger.error(f"Error fetching series analyses: {e}")
         return Response({"error": f"Error fetching series analyses: {str(e)}"}, status=500)
 
-@api.post("/custom_analyses")
-def get_custom_analyses(request):
+@api.get("/custom_analyses")
+@conditional_etag(get_custom_analyses_version)
+def get_custom_analyses(request, cursor: Optional[str] = None, limit: Optional[int] = None):
     try:
-        result = generate_custom_analyses_response()
-        return {"custom_analyses": result}
+        result, next_cursor = generate_custom_analyses_response(cursor, limit)
+        return {"custom_analyses": result, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+    except ValidationError as e:
+        logger.error(f"Error getting custom analyses: {e}")
+        return Response({"error": f"Error fetching custom analyses: {str(e)}"}, status=400)
     except Exception as e:
         logger.error(f"Error getting custom analyses: {e}")
         return Response({"error": f"Error fetching custom analyses: {str(e)}"}, status=500)
 
-@api.post("/map_analysis")
-def get_map_analysis(request, payload: AnalysisFilterIn):
+@api.get("/map_analysis")
+@conditional_etag(get_map_analysis_version)
+def get_map_analysis(request, payload: Query[AnalysisFilterIn]):
     try:
         result = generate_map_analysis_response(payload)
         return {"map_analysis": result}
@@ -230,8 +333,9 @@ def get_map_analysis(request, payload: AnalysisFilterIn):
         logger.error(f"Error getting map analysis: {e}")
         return Response({"error": f"Error fetching map analysis: {str(e)}"}, status=500)
 
-@api.post("/series_analysis")
-def get_series_analysis(request, payload: AnalysisFilterIn):
+@api.get("/series_analysis")
+@conditional_etag(get_series_analysis_version)
+def get_series_analysis(request, payload: Query[AnalysisFilterIn]):
     try:
         result = generate_series_analysis_response(payload)
         return {"series_analysis": result}
@@ -239,8 +343,9 @@ def get_series_analysis(request, payload: AnalysisFilterIn):
         logger.error(f"Error getting series analysis: {e}")
         return Response({"error": f"Error fetching series analysis: {str(e)}"}, status=500)
 
-@api.post("/custom_analysis")
-def get_custom_analysis(request, payload: AnalysisFilterIn):
+@api.get("/custom_analysis")
+@conditional_etag(get_custom_analysis_version)
+def get_custom_analysis(request, payload: Query[AnalysisFilterIn]):
     try:
         result = generate_custom_analysis_response(payload)
         return {"custom_analysis": result}
@@ -248,6 +353,42 @@ def get_custom_analysis(request, payload: AnalysisFilterIn):
         logger.error(f"Error getting custom analysis: {e}")
         return Response({"error": f"Error fetching custom analysis: {str(e)}"}, status=500)
 
+@api.get("/player_profile")
+@conditional_etag(get_player_profile_version)
+def get_player_profile(request, gamertag: str):
+    try:
+        result = generate_player_profile_response(gamertag)
+        return {"player_profile": result}
+    except ObjectDoesNotExist as e:
+        logger.error(f"Error getting player profile: {e}")
+        return Response({"error": str(e)}, status=404)
+    except Exception as e:
+        logger.error(f"Error getting player profile: {e}")
+        return Response({"error": f"Error fetching player profile: {str(e)}"}, status=500)
+
+@api.get("/head_to_head")
+@conditional_etag(get_head_to_head_version)
+def get_head_to_head(request, team_one: str, team_two: str):
+    try:
+        result = generate_head_to_head_response(team_one, team_two)
+        return {"head_to_head": result}
+    except ObjectDoesNotExist as e:
+        logger.error(f"Error getting head to head: {e}")
+        return Response({"error": str(e)}, status=404)
+    except Exception as e:
+        logger.error(f"Error getting head to head: {e}")
+        return Response({"error": f"Error fetching head to head: {str(e)}"}, status=500)
+
+@api.get("/team_win_rates")
+@conditional_etag(get_team_win_rates_version)
+def get_team_win_rates(request, tournament: Optional[int] = None):
+    try:
+        result = generate_team_win_rates_response(tournament)
+        return {"win_rates": result}
+    except Exception as e:
+        logger.error(f"Error getting team win rates: {e}")
+        return Response({"error": f"Error fetching team win rates: {str(e)}"}, status=500)
+
 @api.delete("/map_analyses")
 def delete_map_analysis_objects(request, payload: DeleteAnalysesIn):
     try:
@@ -305,8 +446,12 @@ def delete_custom_analysis_object(request, payload: DeleteAnalysisIn):
 @api.get("/general_data")
 def general_data(request):
     try:
-        response = generate_general_data_response()
-        return {"general_data": response}
+        payload, etag = get_cached_general_data()
+
+        # The general data rarely changes, so browsers revalidate their copy and get a 304 while it's current
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return set_validator_headers(HttpResponse(payload, content_type="application/json"), etag)
     except Exception as e:
         logger.error(f"Error getting general data: {e}")
         return Response({"error": f"Error getting general data: {str(e)}"}, status=500)
\ No newline at end of file
@@ -151,6 +151,39 @@ OCR_CONFIDENCE_THRESHOLDS = {
     'HIGH': 1.0
 }
 
+# Named PaddleOCR variants, built once per Celery worker process (see analysis/controllers/ocr_engine.py).
+# Model dirs left as None use PaddleOCR's bundled models for the given OCR_VERSION and LANG.
+OCR_ENGINES = {
+    'default': {
+        'OCR_VERSION': 'PP-OCRv4',
+        'LANG': 'ch',
+        'USE_GPU': False,
+        'USE_ANGLE_CLS': False,
+        'CPU_THREADS': int(os.environ.get('OCR_CPU_THREADS', 4)),
+        'ENABLE_MKLDNN': False,
+        'DET_MODEL_DIR': None,
+        'REC_MODEL_DIR': None,
+        'CLS_MODEL_DIR': None,
+        'REC_BATCH_NUM': 16,
+    },
+}
+OCR_DEFAULT_ENGINE = 'default'
+OCR_WARM_UP_ON_BOOT = True
+# How extract_data runs OCR over a scoreboard: 'full_frame', 'regions' or 'recognition' (see ExtractionMode)
+OCR_EXTRACTION_MODE = 'recognition'
+# In 'recognition' mode, fields recognised below this confidence are re-read with full text detection
+OCR_RECOGNITION_FALLBACK_CONFIDENCE = 0.5
+# Batch uploads are split into micro-batches of this many scoreboards, each processed by one task
+OCR_BATCH_SIZE = 4
+OCR_BATCH_MAX_FILES = 100
+# Server-sent progress streams give up after the task's hard time limit, and re-check the task every heartbeat
+SCOREBOARD_PROGRESS_STREAM_TIMEOUT = 180
+SCOREBOARD_PROGRESS_HEARTBEAT = 15
+
+# PAGINATION SETTINGS
+PAGINATION_DEFAULT_LIMIT = 25
+PAGINATION_MAX_LIMIT = 100
+
 # LOGGING SETTINGS
 LOGGING = {
     'version': 1,
@@ -180,14 +213,47 @@ LOGGING = {
     },
 }
 
+# CACHE SETTINGS
+REDIS_URL = 'redis://localhost:6379'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'{REDIS_URL}/1',
+        'KEY_PREFIX': 'portal',
+    }
+}
+# Serialised /general_data payload, invalidated whenever the data it is built from changes (see general/signals.py)
+GENERAL_DATA_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day
+# Content addressed cache of scoreboard OCR results (see analysis/controllers/scoreboard_cache.py)
+SCOREBOARD_CACHE = {
+    'TIMEOUT': 60 * 60 * 24 * 7,  # 1 week
+    'MAX_ENTRIES': 2000
+}
+
 # CELERY SETTINGS
-CELERY_BROKER_URL = 'redis://localhost:6379'
-CELERY_RESULT_BACKEND = 'redis://localhost:6379'
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+# Worker processes load and warm up the OCR models on boot, which takes longer than Celery's default 4 seconds
+CELERY_WORKER_PROC_ALIVE_TIMEOUT = 60
 
 # AWS SETTINGS
 AWS_STORAGE_BUCKET_NAME = os.environ.get('AWS_STORAGE_BUCKET_NAME', '')
+# S3 client (see utils/s3_handling.py), the pool is shared by every thread of a process, so it should cover the
+# presign and OCR requests one process can have in flight at once
+S3_CLIENT_CONFIG = {
+    'MAX_POOL_CONNECTIONS': int(os.environ.get('S3_MAX_POOL_CONNECTIONS', 50)),
+    'CONNECT_TIMEOUT': 5,
+    'READ_TIMEOUT': 30,
+    'MAX_RETRY_ATTEMPTS': 5,
+    'RETRY_MODE': 'adaptive',  # Backs off client side when S3 starts throttling
+    'TCP_KEEPALIVE': True
+}
+# How long screenshots are remembered to exist in the bucket, so view urls are generated without checking S3 first
+S3_EXISTENCE_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # 1 week
+# The most screenshots a single batch of view urls can be generated for
+S3_VIEW_URLS_MAX_FILES = 100
 
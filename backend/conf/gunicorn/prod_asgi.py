@@ -0,0 +1,56 @@
+"""
+Gunicorn production configuration file, serving the ASGI application with uvicorn workers. It runs alongside the sync
+deployment (conf/gunicorn/prod.py) and only serves the scoreboard progress stream, Nginx routes
+/api/new_map_analysis_step_two_stream here and everything else to the sync deployment:
+
+    location /api/new_map_analysis_step_two_stream {
+        proxy_pass http://127.0.0.1:8001;
+        proxy_http_version 1.1;
+        proxy_buffering off;
+        proxy_read_timeout 200s;
+    }
+
+Without it the stream endpoint answers 501 and the frontend polls the task status instead.
+"""
+import multiprocessing
+
+wsgi_app = "backend.asgi:application"
+
+# Set environment variables
+raw_env = [
+    "DJANGO_SETTINGS_MODULE=backend.settings_prod"
+]
+
+# Each worker runs an event loop that holds many idle streams at once, so one per core is enough. The rest of the API
+# is sync and runs in a thread per request under ASGI, which measured slower than the sync deployment under load (see
+# utils/load_test.py), so it isn't served from here.
+workers = multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = "127.0.0.1:8001"  # Only allow internal connections, Nginx will proxy
+
+timeout = 300  # 5 minutes for long-running tasks
+keepalive = 65
+graceful_timeout = 30  # How long to wait before forcefully killing workers
+
+loglevel = "info"
+accesslog = "/var/log/gunicorn/asgi_access.log"
+errorlog = "/var/log/gunicorn/asgi_error.log"
+capture_output = True
+
+pidfile = "/var/run/gunicorn/prod_asgi.pid"
+
+daemon = False
+
+proc_name = "portal_gunicorn_asgi"
+
+max_requests = 1000
+max_requests_jitter = 50
+
+def post_fork(server, worker):
+    server.log.info("Worker spawned (pid: %s)", worker.pid)
+
+def worker_exit(server, worker):
+    server.log.info("Worker exited (pid: %s)", worker.pid)
+
+preload_app = True
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GeneralConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'general'
+
+    def ready(self):
+        # Connects the signals that invalidate the cached general data
+        from general import signals  # noqa: F401
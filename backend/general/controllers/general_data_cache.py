@@ -0,0 +1,102 @@
+import hashlib
+import json
+import logging
+import uuid
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from general.controllers.response_generation import generate_general_data_response
+
+logger = logging.getLogger('gunicorn.error')
+
+CACHE_PREFIX = 'general_data'
+VERSION_KEY = f'{CACHE_PREFIX}:version'
+
+
+def new_version() -> str:
+    # Random rather than a counter, so a version is never repeated when the cache is flushed or restarts empty. A
+    # counter would start over, and snapshots stamped with an old version would match again.
+    return uuid.uuid4().hex
+
+
+def get_general_data_version() -> Optional[str]:
+    """
+    The version stamp of the general data, replaced every time a team, player, game mode, map or tournament changes.
+    The cached payload is stored under the version it was built for, so replacing the version invalidates it. The
+    snapshots and ETags of the read API include it too, so when the cache is unavailable there is no version and
+    they are built without one rather than failing.
+
+    returns:
+        - version [Str]: The current version, None if the cache is unavailable
+    """
+    try:
+        version = new_version()
+        cache.add(VERSION_KEY, version, timeout=None)
+        return cache.get(VERSION_KEY, version)
+    except Exception as e:
+        logger.error(f"Error reading general data version: {str(e)}")
+        return None
+
+
+def get_payload_key(version: str) -> str:
+    return f"{CACHE_PREFIX}:payload:{version}"
+
+
+def build_general_data_payload() -> Tuple[str, str]:
+    """
+    Builds the serialised /general_data response body along with its ETag.
+
+    returns:
+        - payload [Str]: The JSON response body
+        - etag [Str]: The quoted ETag of the body
+    """
+    payload = json.dumps({"general_data": generate_general_data_response()}, cls=DjangoJSONEncoder)
+    etag = f'"{hashlib.sha256(payload.encode()).hexdigest()[:32]}"'
+    return payload, etag
+
+
+def get_cached_general_data() -> Tuple[str, str]:
+    """
+    Returns the serialised /general_data response body and its ETag, building and caching them if this version of
+    the general data hasn't been cached yet. If the cache is unavailable, the payload is built straight from the
+    database.
+
+    returns:
+        - payload [Str]: The JSON response body
+        - etag [Str]: The quoted ETag of the body
+    """
+    try:
+        version = get_general_data_version()
+        if version is None:
+            return build_general_data_payload()
+
+        payload_key = get_payload_key(version)
+        cached = cache.get(payload_key)
+        if cached is not None:
+            return cached['payload'], cached['etag']
+    except Exception as e:
+        logger.error(f"Error reading general data cache: {str(e)}")
+        return build_general_data_payload()
+
+    payload, etag = build_general_data_payload()
+    try:
+        timeout = getattr(settings, 'GENERAL_DATA_CACHE_TIMEOUT', 60 * 60 * 24)
+        cache.set(payload_key, {'payload': payload, 'etag': etag}, timeout=timeout)
+    except Exception as e:
+        logger.error(f"Error writing general data cache: {str(e)}")
+
+    return payload, etag
+
+
+def invalidate_general_data() -> None:
+    """
+    Replaces the version of the general data, so the next request rebuilds the payload. The payload cached for the
+    old version is left to expire.
+    """
+    try:
+        cache.set(VERSION_KEY, new_version(), timeout=None)
+    except Exception as e:
+        logger.error(f"Error invalidating general data cache: {str(e)}")
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from general.controllers.general_data_cache import invalidate_general_data
+from general.models import GameMode, Map, Player, Team, Tournament
+
+# The models /general_data is built from
+GENERAL_DATA_MODELS = [Team, Player, GameMode, Map, Tournament]
+
+
+def invalidate_general_data_on_change(sender, **kwargs):
+    """
+    Invalidates the cached /general_data payload when any of the models it is built from changes. The version is
+    only bumped once the change is committed, so a request can't cache the old rows under the new version.
+    """
+    transaction.on_commit(invalidate_general_data)
+
+
+for model in GENERAL_DATA_MODELS:
+    for signal in (post_save, post_delete):
+        signal.connect(invalidate_general_data_on_change, sender=model)
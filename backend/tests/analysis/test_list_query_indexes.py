@@ -0,0 +1,148 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.db import connection
+from django.utils import timezone
+
+from analysis.controllers.response_generation import filter_map_analyses, filter_series_analyses
+from analysis.models import MapAnalysis, MapTeamParticipation, PlayerMapPerformance, SeriesAnalysis
+from general.models import GameMode, Map, Team, Tournament
+from tests.analysis.test_model_control import AnalysisTestCase
+
+MAP_FILTERS = ['tournament', 'game_mode', 'map', 'team_one', 'team_two', 'player']
+SERIES_FILTERS = ['tournament', 'map', 'team_one', 'team_two', 'player']
+PAGE_SIZE = 25
+# The planner prefers a full scan on very small tables, so there have to be enough rows for the indexes to pay off
+SERIES_COUNT = 100
+MAPS_PER_SERIES = 3
+
+
+def build_filter_payload(fields, **filters):
+    payload = dict.fromkeys(fields)
+    payload.update(filters)
+    return SimpleNamespace(**payload)
+
+
+def unique_constraint_index_names(model, name):
+    """
+    SQLite doesn't name the index behind a unique constraint after it, it is an automatic index on the table.
+    """
+    if connection.vendor == 'sqlite':
+        return [name, f"sqlite_autoindex_{model._meta.db_table}_"]
+    return [name]
+
+
+class ListQueryIndexTests(AnalysisTestCase):
+    """
+    Runs EXPLAIN on the map and series list queries of every filter path, and checks the planner uses the composite
+    index added for it.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        teams = [cls.team_one, cls.team_two] + [
+            Team.objects.create(code=f'team{i}', name=f'Team {i}') for i in range(6)
+        ]
+        tournaments = [cls.tournament] + [
+            Tournament.objects.create(title=f'Major {i}', played_date=timezone.now().date()) for i in range(2, 6)
+        ]
+        game_modes = list(GameMode.objects.all())
+        maps = list(Map.objects.all()) + [Map.objects.create(name=f'map{i}') for i in range(4)]
+        now = timezone.now()
+
+        SeriesAnalysis.objects.bulk_create([
+            SeriesAnalysis(
+                title=f'Series {i}',
+                thumbnail='thumbnail',
+                played_date=now - timedelta(hours=i),
+                team_one_map_count=3,
+                team_two_map_count=0,
+                team_one=teams[i % len(teams)],
+                team_two=teams[(i + 1) % len(teams)],
+                winner=teams[i % len(teams)],
+                tournament=tournaments[i % len(tournaments)]
+            )
+            for i in range(SERIES_COUNT)
+        ])
+        series_analyses = list(SeriesAnalysis.objects.order_by('id'))
+
+        MapAnalysis.objects.bulk_create([
+            MapAnalysis(
+                title=f'Map {i}',
+                thumbnail='thumbnail',
+                screenshot='scoreboard.png',
+                team_one_score=250,
+                team_two_score=200,
+                played_date=series_analysis.played_date,
+                team_one=series_analysis.team_one,
+                team_two=series_analysis.team_two,
+                winner=series_analysis.winner,
+                tournament=series_analysis.tournament,
+                game_mode=game_modes[i % len(game_modes)],
+                map=maps[i % len(maps)],
+                series_analysis=series_analysis
+            )
+            for series_analysis in series_analyses
+            for i in range(MAPS_PER_SERIES)
+        ])
+        map_analyses = list(MapAnalysis.objects.order_by('id'))
+
+        for map_analysis in map_analyses:
+            MapTeamParticipation.objects.add_map_analysis(map_analysis)
+        PlayerMapPerformance.objects.bulk_create([
+            PlayerMapPerformance(
+                map_analysis=map_analysis,
+                player=player,
+                kills=10,
+                deaths=5,
+                kd_ratio=2,
+                assists=1,
+                ntk=2,
+                highest_streak=3,
+                damage=400
+            )
+            for map_analysis in map_analyses
+            for player in cls.players[:4]
+        ])
+
+        cls.latest_map = map_analyses[0]
+        cls.latest_series = series_analyses[0]
+
+    def assert_uses_index(self, queryset, expected):
+        plan = queryset.order_by('-played_date', '-id')[:PAGE_SIZE].explain()
+        self.assertTrue(
+            any(index in plan for index in expected),
+            f"Expected one of {expected} to be used, the plan was:\n{plan}"
+        )
+
+    def test_map_list_paths(self):
+        scenarios = [
+            ("no filters", {}, ['map_played_date_idx']),
+            ("tournament", {'tournament': self.latest_map.tournament_id}, ['map_tournament_played_idx']),
+            ("game mode and map", {
+                'game_mode': self.latest_map.game_mode.code,
+                'map': self.latest_map.map.name
+            }, ['map_mode_map_played_idx']),
+            ("team", {'team_one': self.latest_map.team_one.code}, ['participation_team_played_idx']),
+            ("player", {'player': self.players[0].gamertag_clean}, unique_constraint_index_names(
+                PlayerMapPerformance, 'unique_player_map_performance'
+            )),
+        ]
+
+        for description, filters, expected in scenarios:
+            with self.subTest(description):
+                self.assert_uses_index(filter_map_analyses(build_filter_payload(MAP_FILTERS, **filters)), expected)
+
+    def test_series_list_paths(self):
+        scenarios = [
+            ("no filters", {}, ['series_played_date_idx']),
+            ("tournament", {'tournament': self.latest_series.tournament_id}, ['series_tournament_played_idx']),
+            ("team", {'team_one': self.latest_series.team_one.code}, ['participation_team_played_idx']),
+        ]
+
+        for description, filters, expected in scenarios:
+            with self.subTest(description):
+                self.assert_uses_index(
+                    filter_series_analyses(build_filter_payload(SERIES_FILTERS, **filters)),
+                    expected
+                )
@@ -0,0 +1,183 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analysis.controllers.model_control import (
+    aggregate_player_performances,
+    create_custom_analysis_from_maps,
+    create_map_analysis,
+    create_series_analysis,
+    delete_map_analyses
+)
+from analysis.models import CustomAnalysis, MapAnalysis, PlayerMapPerformance, PlayerMapPerformanceHP, SeriesAnalysis
+from general.models import GameMode, Map, Player, Team, Tournament
+
+# The most queries creating a map analysis may take, however many players are on the scoreboard
+MAX_CREATE_MAP_ANALYSIS_QUERIES = 35
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalysisTestCase(TestCase):
+    """
+    Sets up the teams, players and general data map analyses are created from.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.team_one = Team.objects.create(code='opt', name='OpTic Texas')
+        cls.team_two = Team.objects.create(code='nysl', name='New York Subliners')
+        for code in ['hp', 'snd', 'ctl']:
+            GameMode.objects.create(code=code, name=code)
+        Map.objects.create(name='karachi')
+        cls.tournament = Tournament.objects.create(title='Major 1', played_date=timezone.now().date())
+        cls.players = [
+            Player.objects.create(gamertag_dirty=f'Player{i}', gamertag_clean=f'player{i}', team=cls.team_one)
+            for i in range(8)
+        ]
+
+    def build_payload(self, player_names, game_mode='hp', team_one_won=True):
+        player_stats = [SimpleNamespace(
+            name=player_name,
+            kd='10/5',
+            assists='1',
+            non_traded_kills='2',
+            highest_streak='3',
+            damage='400',
+            mode_stat_one='1:00' if game_mode == 'hp' else '1',
+            mode_stat_two='0:20' if game_mode == 'hp' else '1',
+            mode_stat_three='3',
+            mode_stat_four='0:10' if game_mode == 'hp' else '1',
+            mode_stat_five='1.5',
+            mode_stat_six='100'
+        ) for player_name in player_names]
+
+        return SimpleNamespace(
+            played_date=timezone.now() - timedelta(days=1),
+            tournament=self.tournament.id,
+            team_one='OPT',
+            team_two='NYSL',
+            game_mode=game_mode,
+            map='Karachi',
+            team_one_score=250 if team_one_won else 200,
+            team_two_score=200 if team_one_won else 250,
+            title='OpTic vs Subliners',
+            scoreboard_file_name='scoreboard.png',
+            player_stats=player_stats
+        )
+
+    def create_map(self, player_count=8, game_mode='hp', team_one_won=True):
+        player_names = [player.gamertag_dirty for player in self.players[:player_count]]
+        return create_map_analysis(self.build_payload(player_names, game_mode, team_one_won))
+
+
+class CreateMapAnalysisTests(AnalysisTestCase):
+    def count_create_queries(self, player_count, game_mode):
+        with CaptureQueriesContext(connection) as queries:
+            self.create_map(player_count, game_mode)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_players(self):
+        for game_mode in ['hp', 'snd', 'ctl']:
+            with self.subTest(game_mode=game_mode):
+                few_players = self.count_create_queries(2, game_mode)
+                all_players = self.count_create_queries(8, game_mode)
+
+                self.assertEqual(few_players, all_players)
+                self.assertLessEqual(all_players, MAX_CREATE_MAP_ANALYSIS_QUERIES)
+
+    def test_creates_base_and_mode_performances(self):
+        map_analysis_id = self.create_map()
+
+        self.assertEqual(PlayerMapPerformance.objects.filter(map_analysis_id=map_analysis_id).count(), 8)
+        self.assertEqual(
+            PlayerMapPerformanceHP.objects.filter(player_performance__map_analysis_id=map_analysis_id).count(),
+            8
+        )
+
+    def test_matches_gamertags_ignoring_case(self):
+        # OCR lowercases every name on the scoreboard
+        player_names = [player.gamertag_dirty.lower() for player in self.players]
+        map_analysis_id = create_map_analysis(self.build_payload(player_names))
+
+        self.assertEqual(
+            set(PlayerMapPerformance.objects.filter(map_analysis_id=map_analysis_id).values_list('player', flat=True)),
+            {player.id for player in self.players}
+        )
+
+    def test_gamertags_matching_more_than_one_player(self):
+        Player.objects.create(gamertag_dirty='PLAYER0', gamertag_clean='player0_dupe', team=self.team_two)
+
+        with self.assertRaisesMessage(ValidationError, 'matches more than one player'):
+            self.create_map()
+
+    def test_unknown_player(self):
+        payload = self.build_payload(['Player0', 'Nobody'])
+
+        with self.assertRaisesMessage(ObjectDoesNotExist, 'Player nobody does not exist'):
+            create_map_analysis(payload)
+
+    def test_duplicate_player(self):
+        payload = self.build_payload(['Player0', 'player0'])
+
+        with self.assertRaisesMessage(ValidationError, 'appear more than once'):
+            create_map_analysis(payload)
+
+
+class AggregatePlayerPerformancesTests(AnalysisTestCase):
+    def test_sums_every_player_in_one_query(self):
+        map_ids = [self.create_map() for _ in range(3)]
+
+        with self.assertNumQueries(1):
+            player_stats = list(aggregate_player_performances(MapAnalysis.objects.filter(id__in=map_ids)))
+
+        self.assertEqual([stats['player_id'] for stats in player_stats], sorted(player.id for player in self.players))
+        for stats in player_stats:
+            self.assertEqual(
+                (stats['total_kills'], stats['total_deaths'], stats['total_assists'], stats['total_ntk']),
+                (30, 15, 3, 6)
+            )
+
+
+class DeleteMapAnalysesTests(AnalysisTestCase):
+    def create_series(self):
+        map_ids = [self.create_map() for _ in range(3)]
+        series_analysis = create_series_analysis(map_ids, 'OpTic vs Subliners')
+        create_custom_analysis_from_maps('OpTic maps', map_ids)
+        return map_ids, series_analysis
+
+    def count_delete_queries(self, map_ids):
+        with CaptureQueriesContext(connection) as queries:
+            delete_map_analyses(map_ids)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_maps(self):
+        one_map = self.count_delete_queries(self.create_series()[0][:1])
+        every_map = self.count_delete_queries(self.create_series()[0])
+
+        self.assertEqual(one_map, every_map)
+
+    def test_deletes_series_and_custom_analyses_of_the_maps(self):
+        map_ids, series_analysis = self.create_series()
+
+        result = delete_map_analyses(map_ids[:1])
+
+        self.assertEqual(result, {"status": 'success', "count": 1})
+        self.assertFalse(SeriesAnalysis.objects.filter(id=series_analysis.id).exists())
+        self.assertFalse(CustomAnalysis.objects.exists())
+        self.assertEqual(set(MapAnalysis.objects.values_list('id', flat=True)), set(map_ids[1:]))
+
+    def test_missing_ids_are_reported_and_the_others_deleted(self):
+        map_ids = [self.create_map() for _ in range(2)]
+        missing_id = max(map_ids) + 1000
+
+        with self.assertRaisesMessage(ValidationError, f'Failed to delete map analyses with IDs: [{missing_id}]'):
+            delete_map_analyses([map_ids[0], missing_id])
+
+        self.assertEqual(list(MapAnalysis.objects.values_list('id', flat=True)), [map_ids[1]])
+        self.assertFalse(PlayerMapPerformance.objects.filter(map_analysis_id=map_ids[0]).exists())
@@ -0,0 +1,80 @@
+from analysis.controllers.model_control import create_map_analysis, delete_map_analyses
+from analysis.models import MapAnalysis, PlayerAggregate, PlayerMapPerformance
+from general.models import GameMode, Map, Player, Team, Tournament
+from tests.analysis.test_model_control import AnalysisTestCase
+
+STAT_FIELDS = ['maps_played'] + PlayerAggregate.objects.STAT_FIELDS
+
+
+class PlayerAggregateDeleteTests(AnalysisTestCase):
+    """
+    Deletes map analyses directly and through the cascades from the models they belong to, and checks the player
+    aggregates still match the performances that are left.
+    """
+    def setUp(self):
+        self.other_tournament = Tournament.objects.create(title='Major 2', played_date=self.tournament.played_date)
+        self.other_map = Map.objects.create(name='vondel')
+        self.other_team = Team.objects.create(code='faze', name='Atlanta FaZe')
+
+        self.create_map()
+        self.create_map(game_mode='snd', team_one_won=False)
+        self.create_map_with(tournament=self.other_tournament.id)
+        self.create_map_with(map='Vondel')
+        self.create_map_with(team_two='FAZE')
+        self.assert_aggregates_match()
+
+    def create_map_with(self, **changes):
+        payload = self.build_payload([player.gamertag_dirty for player in self.players])
+        for field, value in changes.items():
+            setattr(payload, field, value)
+        return create_map_analysis(payload)
+
+    def assert_aggregates_match(self):
+        expected = {}
+        for performance in PlayerMapPerformance.objects.select_related('map_analysis'):
+            for scope, scope_id in PlayerAggregate.objects.get_scopes(performance.map_analysis):
+                totals = expected.setdefault((performance.player_id, scope, scope_id), dict.fromkeys(STAT_FIELDS, 0))
+                totals['maps_played'] += 1
+                for field in PlayerAggregate.objects.STAT_FIELDS:
+                    totals[field] += getattr(performance, field)
+
+        aggregates = {
+            (aggregate['player_id'], aggregate['scope'], aggregate['scope_id']): {
+                field: aggregate[field] for field in STAT_FIELDS
+            }
+            for aggregate in PlayerAggregate.objects.values('player_id', 'scope', 'scope_id', *STAT_FIELDS)
+        }
+        self.assertEqual(aggregates, expected)
+
+    def test_cascades(self):
+        deletes = [
+            ("tournament", lambda: self.other_tournament.delete()),
+            ("map", lambda: self.other_map.delete()),
+            ("game mode", lambda: GameMode.objects.filter(code='snd').delete()),
+            ("team", lambda: self.other_team.delete()),
+            ("player", lambda: Player.objects.filter(pk=self.players[0].pk).delete()),
+        ]
+
+        for description, delete in deletes:
+            with self.subTest(description):
+                map_count = MapAnalysis.objects.count()
+                delete()
+
+                self.assertLessEqual(MapAnalysis.objects.count(), map_count)
+                self.assert_aggregates_match()
+
+        self.assertEqual(MapAnalysis.objects.count(), 1)
+
+    def test_map_analysis_deletes(self):
+        map_analysis = MapAnalysis.objects.filter(tournament=self.other_tournament).get()
+        map_analysis.delete()
+        self.assert_aggregates_match()
+
+        MapAnalysis.objects.filter(map=self.other_map).delete()
+        self.assert_aggregates_match()
+
+        delete_map_analyses(list(MapAnalysis.objects.filter(game_mode__code='snd').values_list('id', flat=True)))
+        self.assert_aggregates_match()
+
+        MapAnalysis.objects.all().delete()
+        self.assertFalse(PlayerAggregate.objects.exists())
@@ -0,0 +1,22 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from analysis.controllers.model_control import create_series_analysis
+from analysis.controllers.response_generation import generate_series_analysis_snapshot
+from tests.analysis.test_model_control import AnalysisTestCase
+
+
+class SeriesAnalysisResponseTests(AnalysisTestCase):
+    def count_snapshot_queries(self, team_one_wins):
+        map_ids = [self.create_map(team_one_won=team_one_won) for team_one_won in team_one_wins]
+        series_analysis = create_series_analysis(map_ids, 'OpTic vs Subliners')
+
+        with CaptureQueriesContext(connection) as queries:
+            generate_series_analysis_snapshot(series_analysis.id)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_maps(self):
+        best_of_three = self.count_snapshot_queries([True, True, True])
+        best_of_five = self.count_snapshot_queries([True, False, True, False, True])
+
+        self.assertEqual(best_of_three, best_of_five)
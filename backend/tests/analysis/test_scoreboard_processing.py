@@ -0,0 +1,84 @@
+from contextlib import nullcontext
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from analysis.controllers import scoreboard_processing
+from analysis.controllers.scoreboard_processing import (
+    GameDataField,
+    PlayerDataField,
+    ScoreboardRegion,
+    extract_data_batch,
+    resolve_recognitions
+)
+
+DETECTION = [[[0, 0], [1, 0], [1, 1], [0, 1]], ('hardpoint', 0.98)]
+
+
+def build_crop(field, row=None):
+    region = ScoreboardRegion(field, row, field.value)
+    (x1, y1), (x2, y2) = field.value
+    return region, (int(x1), int(y1)), np.zeros((int(y2 - y1), int(x2 - x1)), dtype=np.uint8)
+
+
+class ResolveRecognitionsTests(SimpleTestCase):
+    def setUp(self):
+        self.crops = [build_crop(GameDataField.GAME_MODE), build_crop(PlayerDataField.NAME, 0)]
+
+    def resolve(self, recognitions, fallback):
+        with mock.patch.object(scoreboard_processing, 'extract_regions', return_value=fallback) as extract_regions:
+            result = resolve_recognitions(None, None, None, self.crops, recognitions)
+        return result, extract_regions
+
+    def texts(self, detections):
+        return [text for _, (text, _) in detections[0]]
+
+    def test_confident_recognitions_skip_DETECTION(self):
+        (game, players), extract_regions = self.resolve([('hardpoint', 0.98), ('shotzzy', 0.95)], ([[]], [[]]))
+
+        extract_regions.assert_not_called()
+        self.assertEqual(self.texts(game), ['hardpoint'])
+        self.assertEqual(self.texts(players), ['shotzzy'])
+
+    def test_weak_recognitions_are_replaced_by_the_fallback(self):
+        fallback_box = [[330, 330], [400, 330], [400, 360], [330, 360]]
+        (game, players), extract_regions = self.resolve(
+            [('hardpoint', 0.98), ('5h0tzy', 0.3)],
+            ([[]], [[[fallback_box, ('shotzzy', 0.2)]]])
+        )
+
+        self.assertEqual([region.field for region in extract_regions.call_args.args[3]], [PlayerDataField.NAME])
+        self.assertEqual(self.texts(game), ['hardpoint'])
+        # The fallback is kept even though it is less confident than the weak read it replaces
+        self.assertEqual(self.texts(players), ['shotzzy'])
+
+    def test_weak_recognitions_are_dropped_when_the_fallback_finds_nothing(self):
+        (game, players), _ = self.resolve([('hardpoint', 0.98), ('~~', 0.1)], ([[]], [[]]))
+
+        self.assertEqual(self.texts(game), ['hardpoint'])
+        self.assertEqual(self.texts(players), [])
+
+
+@override_settings(OCR_EXTRACTION_MODE='regions')
+class ExtractDataBatchTests(SimpleTestCase):
+    def extract(self, result):
+        with mock.patch.object(scoreboard_processing, 'borrow_ocr_engine', return_value=nullcontext()), \
+                mock.patch.object(scoreboard_processing, 'get_scoreboard_layout'), \
+                mock.patch.object(scoreboard_processing, 'extract_regions', return_value=result):
+            return extract_data_batch([None])
+
+    def test_nothing_detected(self):
+        for description, result in [
+            ("no detections", ([[]], [[]])),
+            ("no player detections", ([[DETECTION]], [[]])),
+            ("full frame found nothing", ([[DETECTION]], [None])),
+        ]:
+            with self.subTest(description):
+                with self.assertRaisesMessage(ValueError, 'OCR failed to extract data from the image'):
+                    self.extract(result)
+
+    def test_detections_are_returned(self):
+        result = ([[DETECTION]], [[DETECTION]])
+
+        self.assertEqual(self.extract(result), [result])
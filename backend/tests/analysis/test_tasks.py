@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analysis import tasks
+
+
+def extract_data_batch(scoreboards):
+    if 'bad.png' in scoreboards:
+        raise ValueError("OCR failed to extract data from the image")
+    return [(f'{sb} game', f'{sb} players') for sb in scoreboards]
+
+
+class ProcessScoreboardBatchTests(SimpleTestCase):
+    def setUp(self):
+        patches = {
+            'get_object_with_etag_from_bucket': mock.Mock(side_effect=lambda file_name: (file_name, 'etag')),
+            'hash_scoreboard': mock.Mock(side_effect=lambda scoreboard: scoreboard),
+            'get_cached_scoreboard': mock.Mock(return_value=None),
+            'decode_scoreboard': mock.Mock(side_effect=lambda scoreboard: scoreboard),
+            'extract_data_batch': mock.Mock(side_effect=extract_data_batch),
+            'process_data': mock.Mock(side_effect=lambda game_data, player_data: game_data),
+            'cache_scoreboard': mock.Mock(),
+        }
+        for name, patch in patches.items():
+            self.enterContext(mock.patch.object(tasks, name, patch))
+        self.extract_data_batch = patches['extract_data_batch']
+
+    def test_one_bad_scoreboard_does_not_fail_the_batch(self):
+        results = tasks.process_scoreboard_batch(['one.png', 'bad.png', 'two.png'])
+
+        self.assertEqual(results['one.png'], {"status": "completed", "data": 'one.png game'})
+        self.assertEqual(results['two.png'], {"status": "completed", "data": 'two.png game'})
+        self.assertEqual(results['bad.png']['status'], 'failed')
+        self.assertIn('OCR failed', results['bad.png']['error'])
+
+    def test_healthy_batch_is_extracted_once(self):
+        results = tasks.process_scoreboard_batch(['one.png', 'two.png'])
+
+        self.extract_data_batch.assert_called_once_with(['one.png', 'two.png'])
+        self.assertEqual({result['status'] for result in results.values()}, {'completed'})
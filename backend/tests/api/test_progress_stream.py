@@ -0,0 +1,24 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+STREAM_URL = '/api/new_map_analysis_step_two_stream?task_id=task'
+
+
+async def stream_scoreboard_progress(task_id):
+    yield 'data: {"status": "completed"}\n\n'
+
+
+class ProgressStreamTests(SimpleTestCase):
+    def test_not_streamed_under_wsgi(self):
+        response = self.client.get(STREAM_URL)
+
+        self.assertEqual(response.status_code, 501)
+
+    @mock.patch('backend.api.stream_scoreboard_progress', stream_scoreboard_progress)
+    async def test_streamed_under_asgi(self):
+        response = await self.async_client.get(STREAM_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(b''.join([chunk async for chunk in response]), b'data: {"status": "completed"}\n\n')
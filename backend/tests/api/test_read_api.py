@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+from analysis.controllers.model_control import create_series_analysis
+from tests.analysis.test_model_control import AnalysisTestCase
+
+# Nothing listens on this port, so every cache operation fails to connect
+UNAVAILABLE_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6399/1',
+    }
+}
+
+
+class UnavailableCacheTests(AnalysisTestCase):
+    """
+    The cache only speeds the read API up, every endpoint still answers from the database without it.
+    """
+    def setUp(self):
+        self.map_ids = [self.create_map() for _ in range(3)]
+        self.series_analysis = create_series_analysis(self.map_ids, 'OpTic vs Subliners')
+
+    def test_read_endpoints_without_cache(self):
+        urls = [
+            '/api/general_data',
+            '/api/map_analyses',
+            '/api/series_analyses',
+            '/api/custom_analyses',
+            f'/api/map_analysis?id={self.map_ids[0]}',
+            f'/api/map_analysis?id={self.map_ids[0]}&team=opt',
+            f'/api/series_analysis?id={self.series_analysis.id}',
+            '/api/player_profile?gamertag=player0',
+            '/api/team_win_rates',
+        ]
+
+        with override_settings(CACHES=UNAVAILABLE_CACHES):
+            for url in urls:
+                with self.subTest(url):
+                    response = self.client.get(url)
+
+                    self.assertEqual(response.status_code, 200)
+
+    def test_detail_without_cache_matches_cached_response(self):
+        url = f'/api/map_analysis?id={self.map_ids[0]}'
+        cached = self.client.get(url)
+
+        with override_settings(CACHES=UNAVAILABLE_CACHES):
+            uncached = self.client.get(url)
+
+        self.assertEqual(uncached.json(), cached.json())
+        self.assertTrue(cached.has_header('ETag'))
+        self.assertFalse(uncached.has_header('ETag'))
+
+
+class SnapshotVersionTests(AnalysisTestCase):
+    def test_snapshot_is_rebuilt_after_the_cache_is_flushed(self):
+        map_analysis_id = self.create_map()
+        url = f'/api/map_analysis?id={map_analysis_id}'
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team_one.name = 'OpTic Gaming'
+            self.team_one.save()
+        # The general data version is lost along with everything else, it must not come back as one the stored
+        # snapshot was built for
+        cache.clear()
+
+        self.assertContains(self.client.get(url), 'OpTic Gaming')
@@ -0,0 +1,114 @@
+"""
+Load test comparing how many concurrent requests a single worker of each deployment profile can serve. Start the
+deployments with one worker each, so the results are per worker, e.g.
+
+    gunicorn -c conf/gunicorn/prod.py -w 1 -b 127.0.0.1:8000
+    gunicorn -c conf/gunicorn/prod_asgi.py -w 1 -b 127.0.0.1:8001
+
+and then run
+
+    python utils/load_test.py sync=http://127.0.0.1:8000 asgi=http://127.0.0.1:8001
+
+Each read endpoint is requested without If-None-Match, so every request builds the full response.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+ENDPOINTS = [
+    '/api/general_data',
+    '/api/map_analyses',
+    '/api/series_analyses',
+    '/api/custom_analyses',
+    '/api/team_win_rates',
+]
+CONCURRENCY_LEVELS = [1, 10, 50, 100]
+REQUESTS_PER_LEVEL = 500
+REQUEST_TIMEOUT = 60
+
+
+async def run_level(base_url: str, concurrency: int, total: int) -> Dict[str, float]:
+    """
+    Send a number of requests to the read endpoints, round robin, with at most a number of them in flight at once.
+
+    Args:
+        - base_url (Str): The url the deployment is served on
+        - concurrency (Int): The number of requests in flight at once
+        - total (Int): The number of requests to send
+
+    Returns:
+        - result (Dict): The throughput, the median and 95th percentile latencies, and the number of errors
+    """
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        async def send(path: str) -> None:
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(ENDPOINTS[i % len(ENDPOINTS)]) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'throughput': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'errors': errors
+    }
+
+
+async def run_load_test(targets: List[Tuple[str, str]], total: int) -> None:
+    """
+    Run every concurrency level against every deployment, one after the other so they don't compete for the machine,
+    and print the results side by side.
+
+    Args:
+        - targets (List[Tuple]): (name, base url) of each deployment
+        - total (Int): The number of requests to send per concurrency level
+    """
+    print(f"{'concurrency':>11} {'target':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+
+    for concurrency in CONCURRENCY_LEVELS:
+        for name, base_url in targets:
+            result = await run_level(base_url, concurrency, total)
+            print(
+                f"{concurrency:>11} {name:>8} {result['throughput']:>9.1f} {result['p50']:>9.1f} "
+                f"{result['p95']:>9.1f} {result['errors']:>7}"
+            )
+
+
+def main():
+    """
+    Main entry point for this script.
+    """
+    parser = argparse.ArgumentParser(description='Compare the per worker concurrency of deployment profiles')
+    parser.add_argument('targets', nargs='+', help='name=url of each deployment, e.g. asgi=http://127.0.0.1:8001')
+    parser.add_argument('--requests', type=int, default=REQUESTS_PER_LEVEL, help='requests per concurrency level')
+    args = parser.parse_args()
+
+    targets = [tuple(target.split('=', 1)) if '=' in target else (target, target) for target in args.targets]
+
+    print('Starting load test...')
+    asyncio.run(run_load_test(targets, args.requests))
+    print('Finished load test')
+
+
+if __name__ == '__main__':
+    main()
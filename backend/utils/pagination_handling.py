@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+def encode_cursor(value: datetime, id: int) -> str:
+    """
+    Encode the position of a row in a (datetime field, id) ordering into an opaque cursor.
+
+    Args:
+        value (datetime): The ordering field of the last row on the page
+        id (int): The id of the last row on the page
+
+    Returns:
+        str: A URL safe cursor
+    """
+    position = json.dumps([value.isoformat(), id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Args:
+        cursor (str): The cursor
+
+    Returns:
+        Tuple[datetime, int]: (value, id)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        value, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(value), int(id)
+    except (ValueError, TypeError):
+        raise ValidationError(f"Invalid cursor: {cursor}")
+
+def get_page_limit(limit: Optional[int]) -> int:
+    """
+    Clamp a requested page size to between 1 and settings.PAGINATION_MAX_LIMIT.
+
+    Args:
+        limit (int): The requested page size, or None for the default
+
+    Returns:
+        int: The page size to use
+    """
+    max_limit = getattr(settings, 'PAGINATION_MAX_LIMIT', 100)
+    if limit is None:
+        return getattr(settings, 'PAGINATION_DEFAULT_LIMIT', 25)
+    return max(1, min(limit, max_limit))
+
+def keyset_paginate(
+    queryset: QuerySet,
+    cursor: Optional[str],
+    limit: Optional[int],
+    field: str = 'created'
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of a values() queryset, newest first, using a keyset on (field, id) rather than an offset, so every
+    page costs the same no matter how deep it is. The queryset must select both the field and 'id'.
+
+    Args:
+        queryset (QuerySet): A values() queryset
+        cursor (str): The cursor returned with the previous page, or None for the first page
+        limit (int): The page size, or None for the default
+        field (str): The datetime field to order by
+
+    Returns:
+        Tuple[List[Dict], Optional[str]]: (rows, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    limit = get_page_limit(limit)
+    queryset = queryset.order_by(f'-{field}', '-id')
+
+    if cursor:
+        value, id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': id}))
+
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][field], rows[-1]['id'])
@@ -1,16 +1,41 @@
 """
 In this file we will do all the handling with respect to fetching and uploading items to the S3 bucket.
 """
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 import boto3
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from botocore.config import Config
 from botocore.exceptions import ClientError, ConnectionError
 
+logger = logging.getLogger('gunicorn.error')
+
+EXISTENCE_CACHE_PREFIX = 's3_exists'
+_s3_client = None
+_s3_client_pid: Optional[int] = None
+_s3_client_lock = threading.Lock()
+
+def get_s3_client_config() -> Dict[str, Any]:
+    return getattr(settings, 'S3_CLIENT_CONFIG', {
+        'MAX_POOL_CONNECTIONS': 50,
+        'CONNECT_TIMEOUT': 5,
+        'READ_TIMEOUT': 30,
+        'MAX_RETRY_ATTEMPTS': 5,
+        'RETRY_MODE': 'adaptive',
+        'TCP_KEEPALIVE': True
+    })
+
 def init_s3_client():
     """
-    Initialize the S3 client with error handling.
+    Initialize the S3 client with error handling, configured from the S3_CLIENT_CONFIG setting.
 
     Returns:
         boto3.client: Initialized S3 client
@@ -19,11 +44,36 @@ def init_s3_client():
         Exception: If unable to establish connection with S3
     """
     try:
-        return boto3.client('s3')
+        config = get_s3_client_config()
+        # Clients are thread safe but sessions aren't, so each client gets its own session
+        return boto3.session.Session().client('s3', config=Config(
+            max_pool_connections=config['MAX_POOL_CONNECTIONS'],
+            connect_timeout=config['CONNECT_TIMEOUT'],
+            read_timeout=config['READ_TIMEOUT'],
+            retries={'max_attempts': config['MAX_RETRY_ATTEMPTS'], 'mode': config['RETRY_MODE']},
+            tcp_keepalive=config['TCP_KEEPALIVE']
+        ))
     except Exception as e:
         raise Exception(f"Failed to initialize S3 client: {str(e)}")
 
-s3_client = init_s3_client()
+def get_s3_client():
+    """
+    Lazily creates the S3 client, once per process. It isn't created at import, since gunicorn preloads the app and
+    forked workers would otherwise share its connection pool. Within a process it is shared by every thread.
+
+    Returns:
+        boto3.client: The S3 client of this process
+
+    Raises:
+        Exception: If unable to establish connection with S3
+    """
+    global _s3_client, _s3_client_pid
+    if _s3_client is None or _s3_client_pid != os.getpid():
+        with _s3_client_lock:
+            if _s3_client is None or _s3_client_pid != os.getpid():
+                _s3_client = init_s3_client()
+                _s3_client_pid = os.getpid()
+    return _s3_client
 
 def generate_upload_scoreboard_url(file_name: str) -> Dict[str, any]:
     """
@@ -38,7 +88,7 @@ def generate_upload_scoreboard_url(file_name: str) -> Dict[str, any]:
         - Exception
     """
     try:
-        presigned_post = s3_client.generate_presigned_post(
+        presigned_post = get_s3_client().generate_presigned_post(
             Bucket=settings.AWS_STORAGE_BUCKET_NAME,
             Key=file_name,
             ExpiresIn=3600
@@ -47,9 +97,77 @@ def generate_upload_scoreboard_url(file_name: str) -> Dict[str, any]:
     except (ConnectionError, ClientError, Exception) as e:
         raise Exception(f"Failed to generate upload URL: {str(e)}")
 
+def get_existence_key(file_name: str) -> str:
+    # File names can contain characters that aren't valid in cache keys
+    return f"{EXISTENCE_CACHE_PREFIX}:" + hashlib.sha256(file_name.encode()).hexdigest()
+
+def mark_objects_exist(file_names: List[str]) -> None:
+    """
+    Records that objects exist in the S3 bucket, so view urls can be generated for them without checking first.
+    Screenshots are never deleted from the bucket, so this can't go stale. Failing to record it is only logged, the
+    bucket is then checked instead.
+
+    args:
+        - file_names [List]: The names of the files that exist
+    """
+    try:
+        timeout = getattr(settings, 'S3_EXISTENCE_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+        cache.set_many({get_existence_key(file_name): True for file_name in file_names}, timeout=timeout)
+    except Exception as e:
+        logger.error(f"Error caching the existence of S3 objects: {str(e)}")
+
+def get_known_objects(file_names: List[str]) -> List[str]:
+    """
+    Looks up which objects are already known to exist in the S3 bucket, without a request to S3.
+
+    args:
+        - file_names [List]: The names of the files
+    returns:
+        - known [List]: The names of the files known to exist
+    """
+    try:
+        keys = {get_existence_key(file_name): file_name for file_name in file_names}
+        return [keys[key] for key in cache.get_many(list(keys))]
+    except Exception as e:
+        logger.error(f"Error checking the cached existence of S3 objects: {str(e)}")
+        return []
+
+def object_exists(file_name: str) -> bool:
+    """
+    Checks with S3 whether an object exists in the bucket, recording it when it does.
+
+    args:
+        - file_name [Str]: The name of the file
+    returns:
+        - exists [Bool]: Whether the file exists
+    raises:
+        - ClientError: If we are unable to establish connection with S3
+    """
+    try:
+        get_s3_client().head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name)
+    except ClientError as e:
+        if e.response['Error']['Code'] == "404":
+            return False
+        raise
+
+    mark_objects_exist([file_name])
+    return True
+
+def presign_view_url(file_name: str) -> str:
+    # Presigning is computed locally, it doesn't make a request to S3
+    return get_s3_client().generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+            'Key': file_name
+        },
+        ExpiresIn=3600
+    )
+
 def generate_view_scoreboard_url(file_name: str) -> str:
     """
-    Generates a temporary url that can be used by external client to view images on the S3 bucket.
+    Generates a temporary url that can be used by external client to view images on the S3 bucket. The bucket is only
+    checked for the file if it isn't already known to exist.
 
     args:
         - file_name [Str]: The name of the image file that the client wants to view.
@@ -60,25 +178,48 @@ def generate_view_scoreboard_url(file_name: str) -> str:
         - Exception: If the file does not exist in the s3 bucket or a general error occurs
     """
     try:
-        try:
-            s3_client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name)
-        except ClientError as e:
-            if e.response['Error']['Code'] == "404":
-                raise Exception(f"File {file_name} not found in bucket.")
-            raise
-
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                'Key': file_name
-            },
-            ExpiresIn=3600
-        )
-        return url
+        if not get_known_objects([file_name]) and not object_exists(file_name):
+            raise Exception(f"File {file_name} not found in bucket.")
+
+        return presign_view_url(file_name)
     except (ConnectionError, ClientError, Exception) as e:
         raise Exception(f"Failed to generate view scoreboard URL: {str(e)}")
 
+def generate_view_scoreboard_urls(file_names: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Generates temporary urls to view many images on the S3 bucket at once, e.g. every screenshot of a series. The files
+    that aren't already known to exist are checked in parallel.
+
+    args:
+        - file_names [List]: The names of the image files that the client wants to view.
+    returns:
+        - urls [Dict]: The url of each file, keyed by file name, None for the files that don't exist in the bucket
+    raises:
+        - ValidationError: If no file names, or more than settings.S3_VIEW_URLS_MAX_FILES, are provided
+        - Exception: If we are unable to establish connection with S3 or a general error occurs
+    """
+    try:
+        file_names = list(dict.fromkeys(file_names))
+        if not file_names:
+            raise ValidationError("No file names provided")
+        max_files = getattr(settings, 'S3_VIEW_URLS_MAX_FILES', 100)
+        if len(file_names) > max_files:
+            raise ValidationError(f"At most {max_files} file names can be provided, {len(file_names)} were given")
+
+        known = set(get_known_objects(file_names))
+        unknown = [file_name for file_name in file_names if file_name not in known]
+        if unknown:
+            with ThreadPoolExecutor(max_workers=min(len(unknown), 10)) as executor:
+                known.update(
+                    file_name for file_name, exists in zip(unknown, executor.map(object_exists, unknown)) if exists
+                )
+
+        return {file_name: presign_view_url(file_name) if file_name in known else None for file_name in file_names}
+    except ValidationError:
+        raise
+    except (ConnectionError, ClientError, Exception) as e:
+        raise Exception(f"Failed to generate view scoreboard URLs: {str(e)}")
+
 def get_object_from_bucket(file_name: str) -> bytes:
     """
     Fetches the content from the S3 bucket.
@@ -91,11 +232,27 @@ def get_object_from_bucket(file_name: str) -> bytes:
         - ClientError: If we can't connect to client
         - Exception: if the file does not exist or there was a general error fetching it
     """
+    s3_content, _ = get_object_with_etag_from_bucket(file_name)
+    return s3_content
+
+def get_object_with_etag_from_bucket(file_name: str) -> Tuple[bytes, str]:
+    """
+    Fetches the content from the S3 bucket, along with the object's ETag.
+
+    args:
+        - file_name [Str]: The name of the file to fetch.
+    returns:
+        - s3_content [Str]: The binary data of the file.
+        - etag [Str]: The ETag of the object
+    raises:
+        - ClientError: If we can't connect to client
+        - Exception: if the file does not exist or there was a general error fetching it
+    """
     try:
-        s3_object = s3_client.get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name)
+        s3_object = get_s3_client().get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name)
         s3_content = s3_object['Body'].read()
 
-        return s3_content
+        return s3_content, s3_object['ETag']
     except ClientError as e:
         if e.response['Error']['Code'] == 'NoSuchKey':
             raise Exception(f"File {file_name} not found in bucket")
@@ -103,6 +260,28 @@ def get_object_from_bucket(file_name: str) -> bytes:
     except Exception as e:
         raise Exception(f"Error fetching object: {str(e)}")
 
+def get_object_etag(file_name: str) -> str:
+    """
+    Fetches the ETag of an object in the S3 bucket, without downloading the object itself.
+
+    args:
+        - file_name [Str]: The name of the file.
+    returns:
+        - etag [Str]: The ETag of the object
+    raises:
+        - ClientError: If we can't connect to client
+        - Exception: if the file does not exist or there was a general error fetching it
+    """
+    try:
+        s3_object = get_s3_client().head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name)
+        return s3_object['ETag']
+    except ClientError as e:
+        if e.response['Error']['Code'] == "404":
+            raise Exception(f"File {file_name} not found in bucket")
+        raise
+    except Exception as e:
+        raise Exception(f"Error fetching object metadata: {str(e)}")
+
 def binary_to_np_array(content: bytes) -> np.ndarray:
     """
     Converts binary data to a numpy array.
@@ -14,19 +14,30 @@ const generateCacheKey = (filters) => {
   return JSON.stringify(sortedEntries);
 };
 
+// Helper to turn filters into a query string, leaving out unset filters
+const buildQueryString = (filters) => {
+  const params = new URLSearchParams();
+  Object.entries(filters)
+    .filter(([_, v]) => v !== undefined && v !== null && v !== "")
+    .forEach(([k, v]) => params.append(k, v));
+  return params.toString();
+};
+
 export const getMapAnalyses = async (filters = {}) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/map_analyses`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify(filters),
-      next: {
-        revalidate: CACHE_REVALIDATE_SECONDS,
-        tags: [`analyses-${generateCacheKey(filters)}`],
-      },
-    });
+    const response = await fetch(
+      `${API_BASE_URL}/map_analyses?${buildQueryString(filters)}`,
+      {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        next: {
+          revalidate: CACHE_REVALIDATE_SECONDS,
+          tags: [`analyses-${generateCacheKey(filters)}`],
+        },
+      }
+    );
 
     if (!response.ok) {
       throw new Error(`Failed to fetch map analyses: ${response.status}`);
@@ -40,17 +51,19 @@ export const getMapAnalyses = async (filters = {}) => {
 
 export const getSeriesAnalyses = async (filters = {}) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/series_analyses`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify(filters),
-      next: {
-        revalidate: CACHE_REVALIDATE_SECONDS,
-        tags: [`analyses-${generateCacheKey(filters)}`],
-      },
-    });
+    const response = await fetch(
+      `${API_BASE_URL}/series_analyses?${buildQueryString(filters)}`,
+      {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        next: {
+          revalidate: CACHE_REVALIDATE_SECONDS,
+          tags: [`analyses-${generateCacheKey(filters)}`],
+        },
+      }
+    );
 
     if (!response.ok) {
       throw new Error(`Failed to fetch series analyses: ${response.status}`);
@@ -65,7 +78,7 @@ export const getSeriesAnalyses = async (filters = {}) => {
 export const getCustomAnalyses = async () => {
   try {
     const response = await fetch(`${API_BASE_URL}/custom_analyses`, {
-      method: "POST",
+      method: "GET",
       headers: {
         "Content-Type": "application/json",
       },
@@ -1,21 +1,27 @@
 const API_BASE_URL =
   process.env.NEXT_PUBLIC_API_BASE_URL || "http://localhost:8000/api";
 
+// Helper to turn an analysis id and its filters into a query string, with one players param per player
+const buildAnalysisQueryString = (id, filters) => {
+  const params = new URLSearchParams({ id: parseInt(id) });
+  if (filters.team) {
+    params.append("team", filters.team);
+  }
+  (filters.players || []).forEach((player) => params.append("players", player));
+  return params.toString();
+};
+
 export const getMapAnalysis = async (id, filters = {}) => {
   try {
-    const payload = {
-      id: parseInt(id),
-      team: filters.team || null,
-      players: filters.players || null,
-    };
-
-    const response = await fetch(`${API_BASE_URL}/map_analysis`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify(payload),
-    });
+    const response = await fetch(
+      `${API_BASE_URL}/map_analysis?${buildAnalysisQueryString(id, filters)}`,
+      {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+        },
+      }
+    );
 
     if (!response.ok) {
       throw new Error(`Failed to fetch map analysis: ${response.status}`);
@@ -30,19 +36,15 @@ export const getMapAnalysis = async (id, filters = {}) => {
 
 export const getSeriesAnalysis = async (id, filters = {}) => {
   try {
-    const payload = {
-      id: parseInt(id),
-      team: filters.team || null,
-      players: filters.players || null,
-    };
-
-    const response = await fetch(`${API_BASE_URL}/series_analysis`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify(payload),
-    });
+    const response = await fetch(
+      `${API_BASE_URL}/series_analysis?${buildAnalysisQueryString(id, filters)}`,
+      {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+        },
+      }
+    );
 
     if (!response.ok) {
       throw new Error(`Failed to fetch series analysis: ${response.status}`);
@@ -57,19 +59,15 @@ export const getSeriesAnalysis = async (id, filters = {}) => {
 
 export const getCustomAnalysis = async (id, filters = {}) => {
   try {
-    const payload = {
-      id: parseInt(id),
-      team: filters.team || null,
-      players: filters.players || null,
-    };
-
-    const response = await fetch(`${API_BASE_URL}/custom_analysis`, {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify(payload),
-    });
+    const response = await fetch(
+      `${API_BASE_URL}/custom_analysis?${buildAnalysisQueryString(id, filters)}`,
+      {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+        },
+      }
+    );
 
     if (!response.ok) {
       throw new Error(`Failed to fetch custom analysis: ${response.status}`);
@@ -105,6 +103,31 @@ export const getScoreboardUrl = async (fileName) => {
   }
 };
 
+// Fetches the view urls of many screenshots in one request, keyed by file name (null if the file doesn't exist)
+export const getScoreboardUrls = async (fileNames) => {
+  try {
+    const params = new URLSearchParams();
+    fileNames.forEach((fileName) => params.append("file_names", fileName));
+
+    const response = await fetch(
+      `${API_BASE_URL}/view_scoreboard_urls?${params.toString()}`,
+      {
+        method: "GET",
+        headers: {
+          "Content-Type": "application/json",
+        },
+      }
+    );
+    if (!response.ok) {
+      throw new Error(`Failed to fetch scoreboard URLs: ${response.status}`);
+    }
+    const data = await response.json();
+    return data.urls;
+  } catch (error) {
+    throw new Error(`Failed to fetch scoreboard URLs: ${error.message}`);
+  }
+};
+
 export const deleteMapAnalysis = async (id) => {
   try {
     const response = await fetch(`${API_BASE_URL}/map_analysis`, {
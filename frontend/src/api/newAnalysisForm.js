@@ -106,6 +106,29 @@ export const checkScoreboardProcessingStatus = async (taskId) => {
   }
 };
 
+export const streamScoreboardProcessingStatus = (taskId, onUpdate, onError) => {
+  const eventSource = new EventSource(
+    `${API_BASE_URL}/new_map_analysis_step_two_stream?task_id=${encodeURIComponent(
+      taskId
+    )}`
+  );
+
+  eventSource.onmessage = (event) => {
+    const update = JSON.parse(event.data);
+    if (update.status !== "processing") {
+      eventSource.close();
+    }
+    onUpdate(update);
+  };
+
+  eventSource.onerror = () => {
+    eventSource.close();
+    onError();
+  };
+
+  return eventSource;
+};
+
 export const createMapAnalysis = async (formData) => {
   try {
     const controller = new AbortController();
@@ -6,6 +6,7 @@ import {
   initiateScoreboardProcessing,
   uploadScoreboardToS3,
   checkScoreboardProcessingStatus,
+  streamScoreboardProcessingStatus,
   createMapAnalysis,
 } from "@/api/newAnalysisForm";
 import FormHeader from "@/components/new-analysis-form/FormHeader";
@@ -34,6 +35,7 @@ export default function NewAnalysisForm() {
   const [scoreboardData, setScoreboardData] = useState(null);
   const [isScoreboardUploading, setIsScoreboardUploading] = useState(false);
   const [scoreboardProcessed, setScoreboardProcessed] = useState(false);
+  const [processingStage, setProcessingStage] = useState(null);
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [isRedirecting, setIsRedirecting] = useState(false);
   const router = useRouter();
@@ -64,6 +66,7 @@ export default function NewAnalysisForm() {
     setScoreboardFileName("");
     setScoreboardProcessed(false);
     setScoreboardData(null);
+    setProcessingStage(null);
     setFormStep(0);
     setScoreboardUploadError("");
   }, [form]);
@@ -168,6 +171,13 @@ export default function NewAnalysisForm() {
 
       try {
         const response = await initiateScoreboardProcessing(uniqueFileName);
+        if (response.status === "completed") {
+          // This screenshot has been processed before, the cached result is returned straight away
+          setScoreboardProcessed(true);
+          setScoreboardData(response.data);
+          setFormStep(2);
+          return;
+        }
         taskId = response.task_id;
       } catch (error) {
         setScoreboardUploadError(
@@ -177,27 +187,46 @@ export default function NewAnalysisForm() {
       }
 
       setFormStep(1);
-      const pollInterval = setInterval(async () => {
-        try {
-          const response = await checkScoreboardProcessingStatus(taskId);
-          if (response.status === "completed") {
-            clearInterval(pollInterval);
-            setScoreboardProcessed(true);
-            setScoreboardData(response.data);
-            setFormStep(2);
-          } else if (response.status === "failed") {
+      setProcessingStage(null);
+
+      const handleProcessingUpdate = (response) => {
+        if (response.status === "completed") {
+          setScoreboardProcessed(true);
+          setScoreboardData(response.data);
+          setFormStep(2);
+          return true;
+        } else if (response.status === "failed") {
+          setFormStep(0);
+          setScoreboardUploadError("Processing failed. Please try again.");
+          return true;
+        }
+        setProcessingStage(response.stage);
+        return false;
+      };
+
+      // Progress is pushed over a server-sent events stream, polling is only used if the stream can't be opened
+      const pollProcessingStatus = () => {
+        const pollInterval = setInterval(async () => {
+          try {
+            const response = await checkScoreboardProcessingStatus(taskId);
+            if (handleProcessingUpdate(response)) {
+              clearInterval(pollInterval);
+            }
+          } catch (error) {
             clearInterval(pollInterval);
             setFormStep(0);
             setScoreboardUploadError("Processing failed. Please try again.");
           }
-        } catch (error) {
-          clearInterval(pollInterval);
-          setFormStep(0);
-          setScoreboardUploadError("Processing failed. Please try again.");
-        }
-      }, 2000);
+        }, 2000);
+      };
 
-      return () => clearInterval(pollInterval);
+      const eventSource = streamScoreboardProcessingStatus(
+        taskId,
+        handleProcessingUpdate,
+        pollProcessingStatus
+      );
+
+      return () => eventSource.close();
     } catch (error) {
       setScoreboardUploadError(
         "An unexpected error occurred. Please try again."
@@ -316,7 +345,9 @@ export default function NewAnalysisForm() {
               error={scoreboardUploadError}
             />
           )}
-          {formStep == 1 && !confirmCloseOpen && <ProcessingDisplay />}
+          {formStep == 1 && !confirmCloseOpen && (
+            <ProcessingDisplay stage={processingStage} />
+          )}
           <Form {...form}>
             <form onSubmit={form.handleSubmit(onSubmit)} className="space-y-3">
               {formStep == 2 && !confirmCloseOpen && (
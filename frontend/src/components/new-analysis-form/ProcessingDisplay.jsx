@@ -1,7 +1,14 @@
 import { Alert, AlertTitle, AlertDescription } from "@/components/ui/alert";
 import { Loader } from "lucide-react";
 
-export default function ProcessingDisplay() {
+const stageDescriptions = {
+  download: "Fetching your scoreboard",
+  preprocess: "Preparing the scoreboard",
+  ocr: "Reading the scoreboard",
+  parse: "Pulling out the stats",
+};
+
+export default function ProcessingDisplay({ stage }) {
   return (
     <div className="flex flex-col items-center space-y-4">
       <Alert>
@@ -11,6 +18,11 @@ export default function ProcessingDisplay() {
         </AlertDescription>
       </Alert>
       <Loader className=" h-15 w-15 animate-spin" />
+      {stage && (
+        <p className="text-sm text-muted-foreground">
+          {stageDescriptions[stage]}...
+        </p>
+      )}
     </div>
   );
 }